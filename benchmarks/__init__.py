@@ -0,0 +1,5 @@
+"""
+Offline performance benchmarks for the engine modules.
+
+Run `python -m benchmarks.run --help` for usage.
+"""
@@ -0,0 +1,157 @@
+"""
+Input generators for the benchmark suite.
+
+"Representative" inputs look like real Health Check / AI Assistant traffic.
+"Worst-case" inputs take the slowest path through each function: free-text
+spellings that miss the exact-match tables, every doctor referral firing,
+long answer dicts that match no indicator, unknown prompt categories.
+"""
+
+import atexit
+import csv
+import os
+import random
+import tempfile
+
+from utils.answer_encoding import ANSWER_OPTIONS, STRESS_BANDS
+from utils.decision_engine import analyze_pcos_signals
+from utils.prompt_library import PROMPTS
+
+AGE_GROUPS = ("teenager", "young_adult", "adult")
+CONCERN_CATEGORIES = ("menstrual", "pain", "hormonal", "mood", "weight", "other")
+
+
+def representative_answers(count, seed=0):
+    """Health Check answers drawn from the page's own options."""
+    rng = random.Random(seed)
+    answer_sets = []
+    for _ in range(count):
+        answers = {
+            field: rng.choice(rng.choice(options)[0])
+            for field, options in ANSWER_OPTIONS.items()
+        }
+        answers["stress_level"] = rng.randint(0, 10)
+        answers["age"] = rng.randint(13, 50)
+        answers["family_history"] = rng.choice(["No", "Not sure", "Yes"])
+        answer_sets.append(answers)
+    return answer_sets
+
+
+def worst_case_answers(count, seed=0):
+    """Answers that hit every keyword fallback and score the maximum."""
+    rng = random.Random(seed)
+    answer_sets = []
+    for _ in range(count):
+        answers = {
+            field: options[-1][0][-1]
+            for field, options in ANSWER_OPTIONS.items()
+        }
+        answers.update({
+            "cycle_length": "Absent or very irregular",
+            "missed_periods": rng.choice(["missed more than three", "more often than not"]),
+            "diet_pattern": rng.choice(["mostly processed food", "Processed snacks daily"]),
+            "activity_level": "Sedentary",
+            "weight_change": "Weight gain",
+            "sleep_quality": "Poor/Insomnia",
+            "stress_level": STRESS_BANDS[0][0] + rng.random() * 3,
+            "age": rng.randint(13, 50),
+            "family_history": "Yes",
+        })
+        answer_sets.append(answers)
+    return answer_sets
+
+
+def counterfactual_queries(count, seed=0):
+    """(answers, goal) pairs for counterfactual.find_counterfactuals()."""
+    rng = random.Random(seed)
+    goals = ("lower_risk", "change_type", "either")
+    return [(answers, rng.choice(goals)) for answers in representative_answers(count, seed)]
+
+
+def worst_case_counterfactual_queries(count):
+    """
+    A profile where every modifiable answer can improve but no combination changes
+    the pattern, so the search visits the whole space without pruning.
+    """
+    answers = {
+        "cycle_length": "Regular (25–35 days)",
+        "missed_periods": "Haven't had a period",
+        "period_pain": "No",
+        "sleep_quality": "Disturbed",
+        "mood_changes": "Occasionally",
+        "anxiety": "No",
+        "sugar_cravings": "Occasionally",
+        "weight_change": "Weight gain",
+        "diet_pattern": "High sugar / processed",
+        "activity_level": "Sedentary",
+        "facial_hair": "Mild",
+        "acne": "Severe",
+        "hair_loss": "No",
+        "stress_level": 10,
+    }
+    return [(answers, "change_type")] * count
+
+
+def answer_columns(answer_sets):
+    """Turn a list of answer dicts into a dict of columns for the batch engine."""
+    fields = answer_sets[0].keys()
+    return {field: [answers[field] for answers in answer_sets] for field in fields}
+
+
+def summary_inputs(answer_sets):
+    """(result, user_inputs) pairs for report_generator.generate_summary()."""
+    return [(analyze_pcos_signals(**answers), answers) for answers in answer_sets]
+
+
+def questionnaire_csv(answer_sets):
+    """Write answer dicts to a temporary CSV (as a clinic dump) and return its path."""
+    fields = list(answer_sets[0])
+    with tempfile.NamedTemporaryFile("w", suffix=".csv", newline="", encoding="utf-8", delete=False) as f:
+        writer = csv.DictWriter(f, fieldnames=fields)
+        writer.writeheader()
+        writer.writerows(answer_sets)
+    atexit.register(os.remove, f.name)
+    return f.name
+
+
+def representative_chat_requests(count, seed=0):
+    """(age_group, category, answers) triples answered from the prompt library."""
+    rng = random.Random(seed)
+    requests = []
+    for _ in range(count):
+        age_group = rng.choice(AGE_GROUPS)
+        category = rng.choice(CONCERN_CATEGORIES)
+        answers = {}
+        for question in PROMPTS[age_group][category]:
+            if question["type"] == "slider":
+                answers[question["id"]] = rng.randint(*question["options"])
+            elif question["options"]:
+                answers[question["id"]] = rng.choice(question["options"])
+            else:
+                answers[question["id"]] = "I have been feeling tired and my cycle changed"
+        requests.append((age_group, category, answers))
+    return requests
+
+
+def worst_case_chat_requests(count, answers_per_request=50):
+    """Long answer dicts that match no indicator, so every scan runs to the end."""
+    filler = "Nothing unusual to report about this at the moment, thank you"
+    requests = []
+    for i in range(count):
+        category = CONCERN_CATEGORIES[i % (len(CONCERN_CATEGORIES) - 1)]
+        answers = {f"q_{j}": f"{filler} ({j})" for j in range(answers_per_request)}
+        requests.append(("adult", category, answers))
+    return requests
+
+
+def question_ids():
+    """Every question id in the prompt library, plus a few unknown ones."""
+    return [question["id"] for categories in PROMPTS.values() for questions in categories.values()
+            for question in questions] + ["unknown_1", "t_men_99"]
+
+
+def prompt_lookups(worst_case=False):
+    """(age_group, category) pairs; worst case uses keys that need the fallbacks."""
+    if worst_case:
+        return [("unknown_age", "unknown_category"), ("Adult (31-45)", "misc")] * 10
+    return [(age, category) for age in AGE_GROUPS for category in CONCERN_CATEGORIES]
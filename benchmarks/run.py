@@ -0,0 +1,204 @@
+"""
+Run the benchmark suite, save results as a baseline, or compare against one.
+
+Usage:
+    python -m benchmarks.run                          # run and print
+    python -m benchmarks.run --save                   # write benchmarks/baseline.json
+    python -m benchmarks.run --compare --threshold 10 # flag >10% regressions
+    python -m benchmarks.run --filter generate_summary
+
+Timing reports the best and median per-call time over several repeats.
+Allocation figures come from tracemalloc: the peak memory allocated during a
+single call (worst and mean over the inputs) and the bytes still held after it.
+Comparison exits with status 1 when any benchmark regresses beyond the
+threshold, so it can gate a change from the command line.
+"""
+
+import argparse
+import datetime
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+
+from benchmarks.suite import BENCHMARKS
+
+DEFAULT_BASELINE_PATH = os.path.join(os.path.dirname(__file__), "baseline.json")
+
+# Allocation differences below this many bytes are treated as noise
+ALLOCATION_NOISE_BYTES = 256
+
+
+def time_benchmark(bench, items, repeat=5, min_time=0.2):
+    """
+    Time bench.fn over items.
+
+    Returns:
+        dict: best_us and median_us per call, and the number of calls timed
+    """
+    fn = bench.fn
+    for item in items:
+        fn(item)
+
+    target = min_time / repeat
+    per_call = []
+    calls = 0
+    for _ in range(repeat):
+        passes = 0
+        start = time.perf_counter()
+        while True:
+            for item in items:
+                fn(item)
+            passes += 1
+            elapsed = time.perf_counter() - start
+            if elapsed >= target:
+                break
+        per_call.append(elapsed / (passes * len(items)) * 1e6)
+        calls += passes * len(items)
+
+    return {
+        "best_us": min(per_call),
+        "median_us": statistics.median(per_call),
+        "calls": calls,
+    }
+
+
+def measure_allocations(bench, items):
+    """
+    Measure per-call allocations with tracemalloc.
+
+    Returns:
+        dict: peak_alloc_bytes (worst call), mean_peak_alloc_bytes, retained_bytes_per_call
+    """
+    fn = bench.fn
+    peaks = []
+    tracemalloc.start()
+    try:
+        start_current, _ = tracemalloc.get_traced_memory()
+        for item in items:
+            tracemalloc.reset_peak()
+            before, _ = tracemalloc.get_traced_memory()
+            fn(item)
+            _, peak = tracemalloc.get_traced_memory()
+            peaks.append(peak - before)
+        end_current, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {
+        "peak_alloc_bytes": max(peaks),
+        "mean_peak_alloc_bytes": int(statistics.mean(peaks)),
+        "retained_bytes_per_call": max(0, end_current - start_current) // len(items),
+    }
+
+
+def run_suite(name_filter=None, group=None, repeat=5, min_time=0.2):
+    """Run every matching benchmark and return {name: measurements}."""
+    results = {}
+    for name, bench in BENCHMARKS.items():
+        if name_filter and name_filter not in name:
+            continue
+        if group and bench.group != group:
+            continue
+        items = bench.make_inputs()
+        measurement = time_benchmark(bench, items, repeat=repeat, min_time=min_time)
+        measurement.update(measure_allocations(bench, items))
+        results[name] = measurement
+        print(
+            f"{name:<60} {measurement['median_us']:>11.2f} µs "
+            f"(best {measurement['best_us']:.2f})  "
+            f"peak {measurement['peak_alloc_bytes'] / 1024:>8.1f} KiB",
+            flush=True
+        )
+    return results
+
+
+def compare_results(current, baseline, threshold_pct):
+    """
+    Compare two result sets.
+
+    Returns:
+        list: (name, metric, baseline value, current value, change %) for each regression
+    """
+    regressions = []
+    limit = 1 + threshold_pct / 100
+    for name, measurement in current.items():
+        previous = baseline.get(name)
+        if previous is None:
+            continue
+        checks = (
+            ("median_us", 0),
+            ("peak_alloc_bytes", ALLOCATION_NOISE_BYTES),
+        )
+        for metric, noise in checks:
+            old, new = previous.get(metric), measurement.get(metric)
+            if old is None or new is None:
+                continue
+            if new > old * limit and new - old > noise:
+                change = (new - old) / old * 100 if old else float("inf")
+                regressions.append((name, metric, old, new, change))
+    return regressions
+
+
+def _print_comparison(current, baseline):
+    print()
+    print(f"{'benchmark':<60} {'baseline µs':>12} {'current µs':>12} {'change':>8}")
+    for name, measurement in current.items():
+        previous = baseline.get(name)
+        if previous is None:
+            print(f"{name:<60} {'(new)':>12} {measurement['median_us']:>12.2f}")
+            continue
+        change = (measurement["median_us"] - previous["median_us"]) / previous["median_us"] * 100
+        print(f"{name:<60} {previous['median_us']:>12.2f} {measurement['median_us']:>12.2f} {change:>+7.1f}%")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="PCOS Health AI benchmark suite")
+    parser.add_argument("--save", nargs="?", const=DEFAULT_BASELINE_PATH, default=None,
+                        help="write results as a baseline JSON file")
+    parser.add_argument("--compare", nargs="?", const=DEFAULT_BASELINE_PATH, default=None,
+                        help="compare against a baseline JSON file")
+    parser.add_argument("--threshold", type=float, default=10.0,
+                        help="regression threshold in percent (default: 10)")
+    parser.add_argument("--filter", default=None, help="only run benchmarks whose name contains this")
+    parser.add_argument("--group", default=None, help="only run benchmarks in this group")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--min-time", type=float, default=0.2,
+                        help="seconds spent timing each benchmark")
+    args = parser.parse_args(argv)
+
+    results = run_suite(args.filter, args.group, repeat=args.repeat, min_time=args.min_time)
+
+    if args.save:
+        payload = {
+            "meta": {
+                "created": datetime.datetime.now().isoformat(timespec="seconds"),
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+            },
+            "results": results,
+        }
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump(payload, f, indent=2)
+        print(f"\nSaved {len(results)} results to {args.save}")
+
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            baseline = json.load(f)["results"]
+        _print_comparison(results, baseline)
+        regressions = compare_results(results, baseline, args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) beyond {args.threshold:g}%:")
+            for name, metric, old, new, change in regressions:
+                print(f"  {name} {metric}: {old:.2f} -> {new:.2f} ({change:+.1f}%)")
+            return 1
+        print(f"\nNo regressions beyond {args.threshold:g}%")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
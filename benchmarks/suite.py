@@ -0,0 +1,366 @@
+"""
+Benchmark registry.
+
+Each benchmark is a callable taking one input item plus a factory that builds
+the list of input items. Register new ones with the @benchmark decorator.
+"""
+
+import json
+
+from benchmarks import inputs
+from utils.batch_engine import analyze_pcos_signals_batch
+from utils.chat_engine import (
+    CONCERN_INDICATORS, clear_caches, concern_flags, generate_response
+)
+from utils.clinical_export import build_document, export_documents, serialize_batch, serialize_document
+from utils.counterfactual import find_counterfactuals
+from utils.decision_engine import analyze_pcos_signals
+from utils.html_report import report_to_html, signal_bar_chart_svg, signal_radar_svg
+from utils.pdf_report import generate_pdfs_batch, report_to_pdf
+from utils.prompt_library import get_all_questions_for_category, get_question, get_questions_for_category
+from utils.report_generator import generate_summaries_batch, generate_summary
+from utils.search_index import BENCH_QUERIES, get_search_index
+from utils.sensitivity import analyze_sensitivity
+from utils.summary_export import export_summaries
+
+BENCHMARKS = {}
+
+
+class Benchmark:
+    """A named function and the inputs it is timed on."""
+
+    __slots__ = ("name", "fn", "make_inputs", "group")
+
+    def __init__(self, name, fn, make_inputs, group):
+        self.name = name
+        self.fn = fn
+        self.make_inputs = make_inputs
+        self.group = group
+
+
+def benchmark(name, make_inputs, group="engine"):
+    """Decorator registering fn(item) as benchmark `name` over make_inputs()."""
+    def register(fn):
+        if name in BENCHMARKS:
+            raise ValueError(f"Duplicate benchmark name: {name}")
+        BENCHMARKS[name] = Benchmark(name, fn, make_inputs, group)
+        return fn
+    return register
+
+
+# -----------------------------
+# DECISION ENGINE
+# -----------------------------
+@benchmark("analyze_pcos_signals/representative", lambda: inputs.representative_answers(200))
+def _analyze_representative(answers):
+    analyze_pcos_signals(**answers)
+
+
+@benchmark("analyze_pcos_signals/worst_case", lambda: inputs.worst_case_answers(200))
+def _analyze_worst_case(answers):
+    analyze_pcos_signals(**answers)
+
+
+@benchmark(
+    "analyze_pcos_signals_batch/10k_rows",
+    lambda: [inputs.answer_columns(inputs.representative_answers(10000))],
+    group="batch"
+)
+def _analyze_batch(columns):
+    analyze_pcos_signals_batch(columns)
+
+
+@benchmark("sensitivity.analyze_sensitivity/representative", lambda: inputs.representative_answers(50))
+def _sensitivity_representative(answers):
+    analyze_sensitivity(answers)
+
+
+@benchmark(
+    "counterfactual.find_counterfactuals/representative",
+    lambda: inputs.counterfactual_queries(100)
+)
+def _counterfactual_representative(query):
+    find_counterfactuals(query[0], goal=query[1])
+
+
+@benchmark(
+    "counterfactual.find_counterfactuals/worst_case",
+    lambda: inputs.worst_case_counterfactual_queries(10)
+)
+def _counterfactual_worst_case(query):
+    # Unbounded budget so the benchmark measures the full search, not the cutoff
+    find_counterfactuals(query[0], goal=query[1], time_budget=10.0)
+
+
+# -----------------------------
+# REPORTS
+# -----------------------------
+@benchmark(
+    "generate_summary/representative",
+    lambda: inputs.summary_inputs(inputs.representative_answers(50))
+)
+def _summary_representative(item):
+    # Reports are lazy; reading both renders them (or hits the report LRU on repeats)
+    reports = generate_summary(*item)
+    reports["user_report"], reports["doctor_summary"]
+
+
+@benchmark(
+    "generate_summary/worst_case",
+    lambda: inputs.summary_inputs(inputs.worst_case_answers(50))
+)
+def _summary_worst_case(item):
+    reports = generate_summary(*item)
+    reports["user_report"], reports["doctor_summary"]
+
+
+@benchmark(
+    "generate_summary/representative_hi",
+    lambda: inputs.summary_inputs(inputs.representative_answers(50))
+)
+def _summary_representative_hi(item):
+    # Same as generate_summary/representative in Hindi; should cost the same
+    reports = generate_summary(*item, locale="hi")
+    reports["user_report"], reports["doctor_summary"]
+
+
+@benchmark(
+    "generate_summary/uncached_render",
+    lambda: inputs.summary_inputs(inputs.representative_answers(50))
+)
+def _summary_uncached(item):
+    generate_summaries_batch([item[0]], [item[1]])
+
+
+@benchmark(
+    "generate_summary/uncached_render_hi",
+    lambda: inputs.summary_inputs(inputs.representative_answers(50))
+)
+def _summary_uncached_hi(item):
+    generate_summaries_batch([item[0]], [item[1]], locale="hi")
+
+
+@benchmark(
+    "generate_summaries_batch/1k_reports",
+    lambda: [tuple(zip(*inputs.summary_inputs(inputs.representative_answers(1000))))],
+    group="batch"
+)
+def _summaries_batch(item):
+    generate_summaries_batch(*item)
+
+
+@benchmark(
+    "generate_summaries_batch/1k_reports_hi",
+    lambda: [tuple(zip(*inputs.summary_inputs(inputs.representative_answers(1000))))],
+    group="batch"
+)
+def _summaries_batch_hi(item):
+    generate_summaries_batch(*item, locale="hi")
+
+
+@benchmark(
+    "pdf_report.report_to_pdf/doctor_summary",
+    lambda: [
+        generate_summary(result, answers)["doctor_summary"]
+        for result, answers in inputs.summary_inputs(inputs.worst_case_answers(20))
+    ]
+)
+def _pdf_doctor_summary(text):
+    report_to_pdf(text, "doctor_summary")
+
+
+@benchmark(
+    "pdf_report.generate_pdfs_batch/1k_reports",
+    lambda: [tuple(zip(*inputs.summary_inputs(inputs.representative_answers(1000))))],
+    group="batch"
+)
+def _pdf_batch(item):
+    generate_pdfs_batch(*item)
+
+
+@benchmark(
+    "html_report.report_to_html/doctor_summary",
+    lambda: [
+        (generate_summary(result, answers)["doctor_summary"], result["signals"])
+        for result, answers in inputs.summary_inputs(inputs.worst_case_answers(20))
+    ]
+)
+def _html_doctor_summary(item):
+    report_to_html(item[0], "doctor_summary", item[1])
+
+
+@benchmark(
+    "html_report.signal_charts/representative",
+    lambda: [result["signals"] for result, _ in inputs.summary_inputs(inputs.representative_answers(50))]
+)
+def _html_charts(signals):
+    signal_bar_chart_svg(signals)
+    signal_radar_svg(signals)
+
+
+class _NullSink:
+    """Writable stream that discards output, so exports measure rendering and compression only."""
+
+    def write(self, data):
+        return len(data)
+
+
+@benchmark(
+    "summary_export.export_summaries/zip_1k_patients",
+    lambda: [inputs.questionnaire_csv(inputs.representative_answers(1000))],
+    group="batch"
+)
+def _export_zip(path):
+    export_summaries(path, _NullSink(), archive_format="zip", workers=1)
+
+
+@benchmark(
+    "summary_export.export_summaries/tar_gz_1k_patients",
+    lambda: [inputs.questionnaire_csv(inputs.representative_answers(1000))],
+    group="batch"
+)
+def _export_tar_gz(path):
+    export_summaries(path, _NullSink(), archive_format="tar.gz", workers=1)
+
+
+@benchmark(
+    "clinical_export.serialize_document/summary",
+    lambda: inputs.summary_inputs(inputs.representative_answers(200))
+)
+def _clinical_summary(item):
+    serialize_document(*item, document_format="summary", generated="2024-01-01T00:00:00+00:00", record_id="1")
+
+
+@benchmark(
+    "clinical_export.serialize_document/fhir",
+    lambda: inputs.summary_inputs(inputs.representative_answers(200))
+)
+def _clinical_fhir(item):
+    serialize_document(*item, document_format="fhir", generated="2024-01-01T00:00:00+00:00", record_id="1")
+
+
+@benchmark(
+    "clinical_export.build_document_json_dumps/fhir",
+    lambda: inputs.summary_inputs(inputs.representative_answers(50))
+)
+def _clinical_fhir_dumps(item):
+    # Baseline for serialize_document: build the dict, then walk it with json.dumps
+    document = build_document(*item, document_format="fhir", generated="2024-01-01T00:00:00+00:00", record_id="1")
+    json.dumps(document, ensure_ascii=False, separators=(",", ":"))
+
+
+@benchmark(
+    "clinical_export.serialize_batch/1k_records_fhir",
+    lambda: [tuple(zip(*inputs.summary_inputs(inputs.representative_answers(1000))))],
+    group="batch"
+)
+def _clinical_batch(item):
+    serialize_batch(*item, document_format="fhir")
+
+
+@benchmark(
+    "clinical_export.export_documents/ndjson_1k_patients",
+    lambda: [inputs.questionnaire_csv(inputs.representative_answers(1000))],
+    group="batch"
+)
+def _clinical_export(path):
+    export_documents(path, _NullSink(), document_format="fhir", workers=1)
+
+
+# -----------------------------
+# CHAT ENGINE
+# -----------------------------
+@benchmark(
+    "chat_engine.generate_response/representative",
+    lambda: inputs.representative_chat_requests(200)
+)
+def _chat_representative(request):
+    generate_response(*request)
+
+
+@benchmark(
+    "chat_engine.generate_response/worst_case",
+    lambda: inputs.worst_case_chat_requests(20)
+)
+def _chat_worst_case(request):
+    generate_response(*request)
+
+
+@benchmark(
+    "chat_engine.generate_response/uncached_representative",
+    lambda: inputs.representative_chat_requests(200)
+)
+def _chat_uncached(request):
+    clear_caches()
+    generate_response(*request)
+
+
+@benchmark(
+    "chat_engine.generate_response/uncached_free_text",
+    lambda: [("adult", "other", {"a_other_1": query}) for query in BENCH_QUERIES]
+)
+def _chat_free_text(request):
+    clear_caches()
+    generate_response(*request)
+
+
+@benchmark("search_index.search/free_text", lambda: list(BENCH_QUERIES))
+def _search_free_text(query):
+    get_search_index().search(query)
+
+
+@benchmark(
+    "chat_engine.concern_flags/uncached_50_answers",
+    lambda: inputs.worst_case_chat_requests(20)
+)
+def _flags_uncached_50(request):
+    clear_caches()
+    concern_flags(request[2])
+
+
+@benchmark(
+    "chat_engine.concern_flags/uncached_200_answers",
+    lambda: inputs.worst_case_chat_requests(20, answers_per_request=200)
+)
+def _flags_uncached_200(request):
+    clear_caches()
+    concern_flags(request[2])
+
+
+@benchmark(
+    "chat_engine.nested_keyword_scan/50_answers",
+    lambda: inputs.worst_case_chat_requests(20)
+)
+def _flags_nested_scan(request):
+    # Baseline for concern_flags: every indicator against every answer, lowercasing both each time
+    for indicators in CONCERN_INDICATORS.values():
+        any(
+            any(indicator.lower() in str(answer).lower() for indicator in indicators)
+            for answer in request[2].values()
+        )
+
+
+# -----------------------------
+# PROMPT LIBRARY
+# -----------------------------
+@benchmark("prompt_library.get_questions_for_category/representative", inputs.prompt_lookups)
+def _prompts_representative(lookup):
+    get_questions_for_category(*lookup)
+
+
+@benchmark(
+    "prompt_library.get_questions_for_category/worst_case",
+    lambda: inputs.prompt_lookups(worst_case=True)
+)
+def _prompts_worst_case(lookup):
+    get_questions_for_category(*lookup)
+
+
+@benchmark("prompt_library.get_all_questions_for_category/representative", inputs.prompt_lookups)
+def _prompts_all(lookup):
+    get_all_questions_for_category(*lookup)
+
+
+@benchmark("prompt_library.get_question/by_id", inputs.question_ids)
+def _prompts_by_id(question_id):
+    get_question(question_id)
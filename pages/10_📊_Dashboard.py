@@ -6,7 +6,9 @@ import streamlit as st
 from utils.auth import is_authenticated, get_current_user
 from utils.language_switcher import render_language_switcher
 from utils.community_storage import load_posts
-from utils.ui_components import create_info_card, create_progress_card
+from utils.html_report import signal_bar_chart_svg
+from utils.percentiles import describe_percentiles
+from utils.ui_components import create_info_card
 from datetime import datetime, timedelta
 
 st.set_page_config(
@@ -56,11 +58,15 @@ if 'health_check_result' in st.session_state:
         signals = result['signals']
         st.markdown("### Signal Analysis")
         
-        create_progress_card("Cycle Irregularity", signals.get('cycle', 0), 10, "#D9469F")
-        create_progress_card("Stress Level", signals.get('stress', 0), 10, "#C77A9E")
-        create_progress_card("Metabolic/Insulin", signals.get('insulin', 0), 10, "#9B7EDE")
-        create_progress_card("Androgen Symptoms", signals.get('androgen', 0), 10, "#8B4A6B")
-        create_progress_card("Inflammation", signals.get('inflammation', 0), 10, "#D9469F")
+        # One inline SVG built from cached per-score fragments
+        st.markdown(signal_bar_chart_svg(signals), unsafe_allow_html=True)
+        
+        # The Health Check saved this result to the history; leave it out of the comparison
+        comparisons = describe_percentiles(result, own_record=True)
+        if comparisons:
+            st.markdown("### How You Compare")
+            for sentence in comparisons:
+                st.markdown(f"- {sentence}")
     
     if st.button("View Full Health Check"):
         st.switch_page("pages/2_🔍_Health_Check.py")
@@ -70,7 +70,7 @@ with col2:
             <li>Provide medical diagnosis</li>
             <li>Prescribe medications</li>
             <li>Replace healthcare professionals</li>
-            <li>Store your personal data</li>
+            <li>Store personal details or keep your answers without your consent</li>
             <li>Make medical claims</li>
         </ul>
     </div>
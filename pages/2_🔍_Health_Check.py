@@ -3,8 +3,17 @@ Health Check Page - Core feature for structured signal collection & explainable
 """
 
 import streamlit as st
-from utils.decision_engine import analyze_pcos_signals
+from utils.assessment_history import save_assessment
+from utils.clinical_export import FHIR_CONTENT_TYPE, document_bytes
+from utils.html_report import HTML_CONTENT_TYPE, summary_html
+from utils.pdf_report import PDF_CONTENT_TYPE, summary_pdf
+from utils.percentiles import describe_percentiles
 from utils.report_generator import generate_summary
+from utils.result_store import get_result_cache, save_result
+from utils.scoring_session import ScoringSession
+from utils.sensitivity import analyze_sensitivity
+from utils.shadow_eval import get_shadow_evaluator
+from utils.translations import get_language
 
 st.set_page_config(
     page_title="PCOS Health AI - Health Check",
@@ -15,120 +24,237 @@ st.set_page_config(
 st.title("Health Check")
 st.markdown("### Structured Assessment of Your Health Patterns")
 
-# Step 1: Personal & Cycle Information
-with st.expander("Step 1: Personal & Cycle Information", expanded=True):
-    age = st.slider("Age", 13, 50, 22)
-    
-    cycle_length = st.selectbox(
-        "How regular is your menstrual cycle?",
-        ["Regular (25–35 days)", "Irregular (varies frequently)", "Absent for months", "Absent or very irregular"]
-    )
-    
-    period_pain = st.radio(
-        "Do you experience severe period pain?",
-        ["No", "Sometimes", "Often", "Frequently"]
-    )
-    
-    missed_periods = st.radio(
-        "Have you missed periods in the last 6 months?",
-        ["No", "Occasionally (once or twice)", "Frequently (three or more times)", "Haven't had a period"]
-    )
+# Form fields, in the order they are collected; widget keys are "hc_<field>"
+FORM_FIELDS = (
+    "age",
+    "cycle_length",
+    "period_pain",
+    "missed_periods",
+    "weight_change",
+    "sugar_cravings",
+    "facial_hair",
+    "acne",
+    "hair_loss",
+    "stress_level",
+    "sleep_quality",
+    "mood_changes",
+    "anxiety",
+    "activity_level",
+    "diet_pattern",
+    "family_history"
+)
 
-# Step 2: Metabolic & Physical Signals
-with st.expander("Step 2: Metabolic & Physical Signals"):
-    weight_change = st.selectbox(
-        "Have you experienced unexplained weight changes?",
-        ["No", "Weight gain", "Weight loss", "Fluctuates"]
-    )
-    
-    sugar_cravings = st.radio(
-        "Do you experience strong sugar cravings?",
-        ["No", "Occasionally", "Frequently"]
-    )
-    
-    facial_hair = st.radio(
-        "Do you notice excess facial/body hair growth?",
-        ["No", "Mild", "Noticeable", "Significant"]
-    )
-    
-    acne = st.radio(
-        "Do you experience acne?",
-        ["No", "Mild", "Moderate", "Severe"]
-    )
-    
-    hair_loss = st.radio(
-        "Have you noticed hair thinning or loss?",
-        ["No", "Mild", "Noticeable"]
-    )
+# st.fragment reruns only the questionnaire and preview on each answer change,
+# and only the report downloads when another report or format is chosen
+# (older Streamlit releases without fragments rerun the whole page instead)
+fragment = getattr(st, "fragment", None) or getattr(st, "experimental_fragment", lambda func: func)
 
-# Step 3: Mental & Stress Signals
-with st.expander("Step 3: Mental & Stress Signals"):
-    stress_level = st.slider("Average stress level (last 3 months)", 0, 10, 5)
-    
-    sleep_quality = st.selectbox(
-        "How is your sleep quality?",
-        ["Good", "Disturbed", "Insomnia / very poor", "Poor/Insomnia"]
-    )
-    
-    mood_changes = st.radio(
-        "Do you notice mood swings or emotional burnout?",
-        ["No", "Occasionally", "Frequently"]
-    )
-    
-    anxiety = st.radio(
-        "Do you experience anxiety?",
-        ["No", "Occasionally", "Frequently"]
-    )
 
-# Step 4: Lifestyle Factors
-with st.expander("Step 4: Lifestyle Factors"):
-    activity_level = st.selectbox(
-        "Physical activity level",
-        ["Sedentary", "Lightly active", "Moderately active", "Very active"]
-    )
-    
-    diet_pattern = st.selectbox(
-        "Diet pattern",
-        ["Balanced", "High sugar / processed", "Low-carb / controlled", "Irregular"]
-    )
+def _form_answers():
+    return {field: st.session_state.get(f"hc_{field}") for field in FORM_FIELDS}
+
+
+def _render_live_preview():
+    """Live risk meter, updated incrementally from the answer that changed."""
+    session = st.session_state.get("health_check_scoring_session")
+    if session is None:
+        session = ScoringSession()
+        st.session_state["health_check_scoring_session"] = session
+    changed = session.update_many(_form_answers())
+    preview = session.result()
+
+    st.markdown("#### Live Risk Preview")
+    col1, col2 = st.columns([1, 3])
+    with col1:
+        st.metric("Current estimate", preview['risk_level'])
+    with col2:
+        st.progress(min(preview['risk_score'] / 20, 1.0))
+        if changed:
+            st.caption(f"Updated signals: {', '.join(changed)}")
+        else:
+            st.caption("Updates as you answer. Press Analyze below for your full results.")
+
+
+@fragment
+def questionnaire():
+    # Step 1: Personal & Cycle Information
+    with st.expander("Step 1: Personal & Cycle Information", expanded=True):
+        st.slider("Age", 13, 50, 22, key="hc_age")
+
+        st.selectbox(
+            "How regular is your menstrual cycle?",
+            ["Regular (25–35 days)", "Irregular (varies frequently)", "Absent for months", "Absent or very irregular"],
+            key="hc_cycle_length"
+        )
+
+        st.radio(
+            "Do you experience severe period pain?",
+            ["No", "Sometimes", "Often", "Frequently"],
+            key="hc_period_pain"
+        )
+
+        st.radio(
+            "Have you missed periods in the last 6 months?",
+            ["No", "Occasionally (once or twice)", "Frequently (three or more times)", "Haven't had a period"],
+            key="hc_missed_periods"
+        )
+
+    # Step 2: Metabolic & Physical Signals
+    with st.expander("Step 2: Metabolic & Physical Signals"):
+        st.selectbox(
+            "Have you experienced unexplained weight changes?",
+            ["No", "Weight gain", "Weight loss", "Fluctuates"],
+            key="hc_weight_change"
+        )
 
-# Step 5: Optional Family History
-with st.expander("Step 5: Optional - Family History"):
-    family_history = st.radio(
-        "Is there a history of PCOS/PCOD in your family?",
-        ["No", "Not sure", "Yes"]
+        st.radio(
+            "Do you experience strong sugar cravings?",
+            ["No", "Occasionally", "Frequently"],
+            key="hc_sugar_cravings"
+        )
+
+        st.radio(
+            "Do you notice excess facial/body hair growth?",
+            ["No", "Mild", "Noticeable", "Significant"],
+            key="hc_facial_hair"
+        )
+
+        st.radio(
+            "Do you experience acne?",
+            ["No", "Mild", "Moderate", "Severe"],
+            key="hc_acne"
+        )
+
+        st.radio(
+            "Have you noticed hair thinning or loss?",
+            ["No", "Mild", "Noticeable"],
+            key="hc_hair_loss"
+        )
+
+    # Step 3: Mental & Stress Signals
+    with st.expander("Step 3: Mental & Stress Signals"):
+        st.slider("Average stress level (last 3 months)", 0, 10, 5, key="hc_stress_level")
+
+        st.selectbox(
+            "How is your sleep quality?",
+            ["Good", "Disturbed", "Insomnia / very poor", "Poor/Insomnia"],
+            key="hc_sleep_quality"
+        )
+
+        st.radio(
+            "Do you notice mood swings or emotional burnout?",
+            ["No", "Occasionally", "Frequently"],
+            key="hc_mood_changes"
+        )
+
+        st.radio(
+            "Do you experience anxiety?",
+            ["No", "Occasionally", "Frequently"],
+            key="hc_anxiety"
+        )
+
+    # Step 4: Lifestyle Factors
+    with st.expander("Step 4: Lifestyle Factors"):
+        st.selectbox(
+            "Physical activity level",
+            ["Sedentary", "Lightly active", "Moderately active", "Very active"],
+            key="hc_activity_level"
+        )
+
+        st.selectbox(
+            "Diet pattern",
+            ["Balanced", "High sugar / processed", "Low-carb / controlled", "Irregular"],
+            key="hc_diet_pattern"
+        )
+
+    # Step 5: Optional Family History
+    with st.expander("Step 5: Optional - Family History"):
+        st.radio(
+            "Is there a history of PCOS/PCOD in your family?",
+            ["No", "Not sure", "Yes"],
+            key="hc_family_history"
+        )
+
+    _render_live_preview()
+
+
+# (label, file name stem) per report kind, and the download formats offered for it
+REPORT_CHOICES = {
+    "user_report": ("User Report", "pcos_health_summary"),
+    "doctor_summary": ("Doctor Summary", "pcos_clinical_summary"),
+}
+REPORT_FORMATS = {
+    "user_report": ("Text", "PDF", "HTML"),
+    "doctor_summary": ("Text", "PDF", "HTML", "FHIR JSON"),
+}
+
+
+@fragment
+def _render_report_downloads(reports, result, user_inputs):
+    """Preview and download of the chosen report in the chosen format; nothing else is rendered."""
+    kind = st.radio(
+        "Report",
+        list(REPORT_CHOICES),
+        format_func=lambda kind: REPORT_CHOICES[kind][0],
+        horizontal=True,
+        key="report_kind"
     )
+    label, stem = REPORT_CHOICES[kind]
+    st.text_area("Preview", reports[kind], height=300, key=f"{kind}_preview")
+
+    # Only the selected payload is built; the others cost nothing until chosen
+    fmt = st.radio("Format", REPORT_FORMATS[kind], horizontal=True, key=f"{kind}_format")
+    if fmt == "PDF":
+        data, file_name, mime = summary_pdf(reports, kind), f"{stem}.pdf", PDF_CONTENT_TYPE
+    elif fmt == "HTML":
+        data, file_name, mime = summary_html(reports, kind), f"{stem}.html", HTML_CONTENT_TYPE
+    elif fmt == "FHIR JSON":
+        data, file_name, mime = document_bytes(result, user_inputs), f"{stem}.fhir.json", FHIR_CONTENT_TYPE
+    else:
+        data, file_name, mime = reports.encoded(kind), f"{stem}.txt", "text/plain"
+    st.download_button(f"Download {label} ({fmt})", data, file_name, mime, key=f"download_{kind}")
+
+
+questionnaire()
+
+st.checkbox(
+    "Save my anonymous answers to help improve this tool (optional)",
+    key="hc_share_answers",
+    help="Your answers and result are stored without your name or any contact details, "
+         "so they can be re-checked when the scoring rules improve. Nothing is saved unless you tick this."
+)
 
 # Analysis Button
 if st.button("Analyze My Health Patterns", type="primary", use_container_width=True):
     # Collect all inputs
-    user_inputs = {
-        "age": age,
-        "cycle_length": cycle_length,
-        "period_pain": period_pain,
-        "missed_periods": missed_periods,
-        "weight_change": weight_change,
-        "sugar_cravings": sugar_cravings,
-        "facial_hair": facial_hair,
-        "acne": acne,
-        "hair_loss": hair_loss,
-        "stress_level": stress_level,
-        "sleep_quality": sleep_quality,
-        "mood_changes": mood_changes,
-        "anxiety": anxiety,
-        "activity_level": activity_level,
-        "diet_pattern": diet_pattern,
-        "family_history": family_history
-    }
+    user_inputs = _form_answers()
     
-    # Call decision engine
-    result = analyze_pcos_signals(**user_inputs)
+    # Call decision engine (PCOS_ENGINE_MODE); identical answers reuse the
+    # result already computed under the current rule version
+    result = get_result_cache().analyze(user_inputs)
     
     # Store in session state
     st.session_state['health_check_result'] = result
     st.session_state['user_inputs'] = user_inputs
     st.session_state['doctor_needed'] = result.get('doctor_needed', False)
     
+    # Anonymous scores only; feeds the population percentiles. Repeated clicks
+    # on the same answers are not counted again
+    answers_key = sorted(user_inputs.items())
+    if st.session_state.get('recorded_answers') != answers_key:
+        save_assessment(result)
+        st.session_state['recorded_answers'] = answers_key
+    # Anonymous answers and result, re-scored by the backfill when rules change;
+    # only with the user's consent, and once per distinct set of answers
+    if st.session_state.get('hc_share_answers') and st.session_state.get('shared_answers') != answers_key:
+        save_result(user_inputs, result)
+        st.session_state['shared_answers'] = answers_key
+    
+    # Candidate rules, when configured, are compared off the request path
+    shadow = get_shadow_evaluator()
+    if shadow is not None:
+        shadow.submit(user_inputs, result)
+    
     # Display Results
     st.markdown("---")
     st.markdown("## 📊 Your Health Assessment Results")
@@ -153,6 +279,9 @@ if st.button("Analyze My Health Patterns", type="primary", use_container_width=T
     st.markdown(f"**AI Confidence:** {result['confidence']}%")
     st.progress(result['confidence'] / 100)
     st.caption("Confidence derived from transparent clinical signal weighting, not black-box ML.")
+    if "ml_probability" in result:
+        st.markdown(f"**Model Estimate:** {result['ml_probability']}%")
+        st.caption("Shown alongside, not instead of, the rule-based confidence above.")
     
     # Contributing Factors
     st.markdown("---")
@@ -177,6 +306,41 @@ if st.button("Analyze My Health Patterns", type="primary", use_container_width=T
     else:
         st.markdown("- No dominant contributing factors identified")
     
+    # Population Context
+    # This result was just added to the history; it is not compared with itself
+    comparisons = describe_percentiles(result, own_record=True)
+    if comparisons:
+        st.markdown("### How You Compare")
+        for sentence in comparisons:
+            st.markdown(f"- {sentence}")
+        st.caption("Compared with anonymous scores from earlier assessments on this app.")
+    
+    # What-if Sensitivity
+    sensitivity = analyze_sensitivity(user_inputs)
+    helpful_changes = [
+        row for row in sensitivity
+        if row['score_change'] < 0 or row['type_changed']
+    ]
+    with st.expander("What-if: which single answer change matters most?"):
+        if helpful_changes:
+            st.dataframe(
+                [
+                    {
+                        "Answer": row['label'],
+                        "Change to": row['new_label'],
+                        "Risk score": f"{row['risk_score']} ({row['score_change']:+d})",
+                        "Risk level": row['risk_level'],
+                        "Pattern": row['pcos_type']
+                    }
+                    for row in helpful_changes[:10]
+                ],
+                use_container_width=True,
+                hide_index=True
+            )
+            st.caption("Each row changes one answer and keeps the rest as you entered them.")
+        else:
+            st.write("No single answer change would lower your risk score.")
+    
     # Doctor Consultation
     st.markdown("---")
     st.markdown("### Medical Consultation Guidance")
@@ -222,29 +386,11 @@ if st.button("Analyze My Health Patterns", type="primary", use_container_width=T
     st.markdown("---")
     st.markdown("### Health Summary (For You / Doctor)")
     
-    reports = generate_summary(result, user_inputs)
+    # Rendered on first access and memoized, so reruns reuse the text and bytes;
+    # reports follow the language chosen in the language switcher
+    reports = generate_summary(result, user_inputs, sensitivity=sensitivity, locale=get_language())
     
-    tab1, tab2 = st.tabs(["User Report", "Doctor Summary"])
-    
-    with tab1:
-        st.text_area("Preview", reports['user_report'], height=300, key="user_preview")
-        st.download_button(
-            "Download User Report",
-            reports['user_report'],
-            "pcos_health_summary.txt",
-            "text/plain",
-            key="download_user"
-        )
-    
-    with tab2:
-        st.text_area("Preview", reports['doctor_summary'], height=300, key="doc_preview")
-        st.download_button(
-            "Download Doctor Summary",
-            reports['doctor_summary'],
-            "pcos_clinical_summary.txt",
-            "text/plain",
-            key="download_doc"
-        )
+    _render_report_downloads(reports, result, user_inputs)
 
 # Display existing results if available
 if 'health_check_result' in st.session_state and 'user_inputs' in st.session_state:
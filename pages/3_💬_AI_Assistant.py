@@ -3,7 +3,7 @@ AI Health Assistant - Guided chatbot for clarification & emotional support
 """
 
 import streamlit as st
-from utils.chat_engine import generate_response
+from utils.chat_engine import CATEGORY_LABELS, generate_response, stream_reply, uses_generation_backend
 from utils.prompt_library import get_questions_for_category
 
 st.set_page_config(
@@ -43,14 +43,7 @@ if st.session_state.chat_step == 1:
 elif st.session_state.chat_step == 2:
     st.markdown("### Step 2: What would you like to discuss?")
     
-    categories = {
-        "Menstrual Issues": "menstrual",
-        "Pain & Discomfort": "pain",
-        "Hormonal Changes": "hormonal",
-        "Mood & Mental Health": "mood",
-        "Weight & Metabolism": "weight",
-        "Other Concerns": "other"
-    }
+    categories = {label: category for category, label in CATEGORY_LABELS.items()}
     
     selected_category = st.radio(
         "Category",
@@ -111,7 +104,17 @@ elif st.session_state.chat_step == 4:
         st.session_state.answers
     )
     
-    st.info(response['clarification'])
+    # Free text goes to the generation backend when one is configured; the reply
+    # streams in, and falls back to the rule-based clarification if the backend fails
+    if uses_generation_backend(st.session_state.age_group, st.session_state.concern_category, st.session_state.answers):
+        with st.container(border=True):
+            st.write_stream(stream_reply(
+                st.session_state.age_group,
+                st.session_state.concern_category,
+                st.session_state.answers
+            ))
+    else:
+        st.info(response['clarification'])
     
     if response.get('is_normal') is not None:
         if response['is_normal']:
@@ -119,6 +122,12 @@ elif st.session_state.chat_step == 4:
         else:
             st.warning("⚠️ This may warrant further attention.")
     
+    if response.get('related'):
+        st.markdown("### From Our Guides")
+        for passage in response['related']:
+            with st.expander(f"{passage['title']} ({passage['source']})"):
+                st.markdown(passage['text'])
+    
     st.markdown("### Next Steps")
     for step in response['next_steps']:
         st.markdown(f"- {step}")
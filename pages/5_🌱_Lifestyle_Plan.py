@@ -3,6 +3,7 @@ Lifestyle Plan - Personalized lifestyle guidance based on health check results
 """
 
 import streamlit as st
+from utils.counterfactual import find_counterfactuals
 
 st.set_page_config(
     page_title="PCOS Health AI - Lifestyle Plan",
@@ -126,6 +127,33 @@ else:
     - Regular healthcare check-ups
     """)
 
+# Concrete targets: the fewest lifestyle answer changes that would shift the result
+user_inputs = st.session_state.get('user_inputs')
+if user_inputs:
+    st.markdown("---")
+    st.markdown("### 🎯 Your Most Effective Targets")
+    search = find_counterfactuals(user_inputs)
+    if search['solutions']:
+        best = search['solutions'][0]
+        for change in best['changes']:
+            st.markdown(f"- **{change['label']}:** from *{change['current_answer']}* to *{change['new_label']}*")
+        st.caption(
+            f"With {'this change' if len(best['changes']) == 1 else 'these changes'}, your answers would "
+            f"score as **{best['risk_level']}** ({best['pcos_type']})."
+        )
+        if len(search['solutions']) > 1:
+            with st.expander("Other equally small sets of changes"):
+                for option in search['solutions'][1:]:
+                    changes = ", ".join(
+                        f"{change['label']} → {change['new_label']}" for change in option['changes']
+                    )
+                    st.markdown(f"- {changes} ({option['risk_level']}, {option['pcos_type']})")
+    else:
+        st.write(
+            "Changes to sleep, stress, activity, diet or sugar cravings alone would not shift "
+            "your result. The focus areas above still support your overall health."
+        )
+
 # Disclaimer
 st.markdown("---")
 st.warning("""
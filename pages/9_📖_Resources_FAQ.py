@@ -24,7 +24,7 @@ faq_items = [
     },
     {
         "question": "Is my data stored or shared?",
-        "answer": "No. We do not store any personal data. All information is processed in your browser session only and is not saved or transmitted to any server. Your privacy is our priority."
+        "answer": "We never ask for your name, contact details or anything else that identifies you. Your answers are used in your session only and are not saved unless you tick \"Save my anonymous answers\" on the Health Check; then your answers and result are kept without any identifying details, so they can be re-checked when the scoring rules improve. We also keep anonymous signal scores (without your answers) to show how your results compare with other users. Nothing is shared with third parties."
     },
     {
         "question": "Can this tool diagnose PCOS?",
@@ -0,0 +1,249 @@
+"""
+Canonical answer encoding for the Health Check questionnaire.
+Every answer option maps to a small integer code once, and the signal weights
+for each code live in one table, so scoring needs no string work.
+"""
+
+SIGNAL_NAMES = ("cycle", "stress", "insulin", "androgen", "inflammation")
+
+# -----------------------------
+# ANSWER OPTIONS & WEIGHTS
+# -----------------------------
+# For each field: (spellings, signal weights) per answer, in code order
+# starting at 1. Spellings of the same answer share one code. Code 0 means
+# "not answered / not recognised" and scores UNANSWERED_WEIGHTS.
+ANSWER_OPTIONS = {
+    "cycle_length": (
+        (("Regular (25–35 days)",), {}),
+        (("Irregular (varies frequently)",), {"cycle": 2}),
+        (("Absent for months", "Absent or very irregular"), {"cycle": 3}),
+    ),
+    "missed_periods": (
+        (("No",), {}),
+        (("Occasionally (once or twice)", "Occasionally"), {"cycle": 1}),
+        (("Frequently (three or more times)", "Frequently"), {"cycle": 2}),
+        (("Haven't had a period",), {}),
+    ),
+    "period_pain": (
+        (("No",), {}),
+        (("Sometimes", "Occasionally"), {"inflammation": 1}),
+        (("Often", "Frequently"), {"inflammation": 2}),
+    ),
+    "sleep_quality": (
+        (("Good",), {}),
+        (("Disturbed",), {"stress": 1, "inflammation": 1}),
+        (("Insomnia / very poor", "Poor/Insomnia"), {"stress": 2, "inflammation": 1}),
+    ),
+    "mood_changes": (
+        (("No",), {}),
+        (("Occasionally",), {}),
+        (("Frequently",), {"stress": 2}),
+    ),
+    "anxiety": (
+        (("No",), {}),
+        (("Occasionally",), {"stress": 1}),
+        (("Frequently",), {"stress": 2}),
+    ),
+    "sugar_cravings": (
+        (("No",), {}),
+        (("Occasionally",), {"insulin": 1}),
+        (("Frequently",), {"insulin": 3}),
+    ),
+    "weight_change": (
+        (("No",), {}),
+        (("Weight gain",), {"insulin": 2}),
+        (("Weight loss",), {}),
+        (("Fluctuates",), {"insulin": 2}),
+    ),
+    "diet_pattern": (
+        (("Balanced",), {}),
+        (("High sugar / processed",), {"insulin": 1}),
+        (("Low-carb / controlled",), {}),
+        (("Irregular",), {}),
+    ),
+    "activity_level": (
+        (("Sedentary",), {"insulin": 1}),
+        (("Lightly active",), {}),
+        (("Moderately active",), {}),
+        (("Very active",), {}),
+    ),
+    "facial_hair": (
+        (("No",), {}),
+        (("Mild",), {"androgen": 1}),
+        (("Noticeable", "Significant"), {"androgen": 3}),
+    ),
+    "acne": (
+        (("No",), {}),
+        (("Mild",), {"androgen": 1}),
+        (("Moderate", "Severe"), {"androgen": 2}),
+    ),
+    "hair_loss": (
+        (("No",), {}),
+        (("Mild",), {"androgen": 1}),
+        (("Noticeable",), {"androgen": 2}),
+    ),
+}
+
+# Anything other than "Good" sleep counts towards inflammation
+UNANSWERED_WEIGHTS = {
+    "sleep_quality": {"inflammation": 1},
+}
+
+# Stress slider bands, highest first: (minimum level, signal weights).
+# Code 0 is a non-numeric answer, code 1 is below every band.
+STRESS_BANDS = (
+    (7, {"stress": 4}),
+    (4, {"stress": 2}),
+)
+
+# Order of the code tuple returned by encode_answers()
+ANSWER_FIELDS = (
+    "cycle_length",
+    "missed_periods",
+    "period_pain",
+    "stress_level",
+    "sleep_quality",
+    "mood_changes",
+    "anxiety",
+    "sugar_cravings",
+    "weight_change",
+    "diet_pattern",
+    "activity_level",
+    "facial_hair",
+    "acne",
+    "hair_loss",
+)
+
+
+def _weight_row(weights):
+    return tuple(weights.get(name, 0) for name in SIGNAL_NAMES)
+
+
+def _build_tables():
+    code_lookup = {}
+    field_options = {}
+    field_weights = {}
+
+    for field, answers in ANSWER_OPTIONS.items():
+        code_lookup[field] = {
+            spelling: code
+            for code, (spellings, _) in enumerate(answers, start=1)
+            for spelling in spellings
+        }
+        field_options[field] = (None,) + tuple(spellings[0] for spellings, _ in answers)
+        field_weights[field] = (
+            (_weight_row(UNANSWERED_WEIGHTS.get(field, {})),) +
+            tuple(_weight_row(weights) for _, weights in answers)
+        )
+
+    # Stress codes: 0 non-numeric, 1 below every band, then bands lowest first
+    bands = tuple(reversed(STRESS_BANDS))
+    field_options["stress_level"] = (None, 0) + tuple(minimum for minimum, _ in bands)
+    field_weights["stress_level"] = (
+        (_weight_row({}), _weight_row({})) +
+        tuple(_weight_row(weights) for _, weights in bands)
+    )
+
+    return code_lookup, field_options, field_weights
+
+
+_CODE_LOOKUP, FIELD_OPTIONS, FIELD_WEIGHTS = _build_tables()
+
+# Weight tables in ANSWER_FIELDS order, for the scoring hot path
+_WEIGHT_TABLES = tuple(FIELD_WEIGHTS[field] for field in ANSWER_FIELDS)
+
+CYCLE_LENGTH_INDEX = ANSWER_FIELDS.index("cycle_length")
+PERIODS_ABSENT_CODE = _CODE_LOOKUP["cycle_length"]["Absent for months"]
+
+_MISSED_FREQUENTLY_CODE = _CODE_LOOKUP["missed_periods"]["Frequently"]
+_MISSED_OCCASIONALLY_CODE = _CODE_LOOKUP["missed_periods"]["Occasionally"]
+_HIGH_SUGAR_DIET_CODE = _CODE_LOOKUP["diet_pattern"]["High sugar / processed"]
+
+
+def encode_answer(field, value):
+    """
+    Map one answer to its integer code.
+
+    Args:
+        field: str - Questionnaire field name (one of ANSWER_FIELDS)
+        value: str/int/float/None - The answer as given by the Health Check page
+
+    Returns:
+        int: Answer code (0 = not answered / not recognised)
+    """
+    if field == "stress_level":
+        return encode_stress(value)
+
+    try:
+        code = _CODE_LOOKUP[field].get(value)
+    except TypeError:
+        return 0
+    if code is not None:
+        return code
+    return _encode_free_text(field, value)
+
+
+def encode_stress(level):
+    """Map a 0-10 stress level to its band code."""
+    if not isinstance(level, (int, float)):
+        return 0
+    for offset, (minimum, _) in enumerate(STRESS_BANDS):
+        if level >= minimum:
+            return len(STRESS_BANDS) + 1 - offset
+    return 1
+
+
+def encode_answers(answers):
+    """
+    Encode a full set of answers.
+
+    Args:
+        answers: dict - field name -> answer (missing fields count as unanswered)
+
+    Returns:
+        tuple: Answer codes in ANSWER_FIELDS order
+    """
+    return tuple(encode_answer(field, answers.get(field)) for field in ANSWER_FIELDS)
+
+
+def score_codes(codes):
+    """
+    Sum the signal weights of encoded answers.
+
+    Args:
+        codes: tuple - Answer codes in ANSWER_FIELDS order
+
+    Returns:
+        tuple: (cycle, stress, insulin, androgen, inflammation) signal scores
+    """
+    cycle = stress = insulin = androgen = inflammation = 0
+    for table, code in zip(_WEIGHT_TABLES, codes):
+        row = table[code]
+        cycle += row[0]
+        stress += row[1]
+        insulin += row[2]
+        androgen += row[3]
+        inflammation += row[4]
+    return cycle, stress, insulin, androgen, inflammation
+
+
+def decode_answer(field, code):
+    """Canonical answer for a code (None for unanswered)."""
+    return FIELD_OPTIONS[field][code]
+
+
+def _encode_free_text(field, value):
+    """Keyword fallback for free-text spellings of missed periods and diet."""
+    if not isinstance(value, str) or not value:
+        return 0
+
+    lowered = value.lower()
+    if field == "missed_periods":
+        if "three" in lowered or "more" in lowered:
+            return _MISSED_FREQUENTLY_CODE
+        if "once" in lowered or "twice" in lowered:
+            return _MISSED_OCCASIONALLY_CODE
+    elif field == "diet_pattern":
+        if "High sugar" in value or "processed" in lowered:
+            return _HIGH_SUGAR_DIET_CODE
+    return 0
@@ -0,0 +1,69 @@
+"""
+Assessment history storage - anonymous record of Health Check scores
+
+Only the signal scores and totals are kept (no answers, no user details),
+one JSON object per line so new assessments are appended, not rewritten.
+"""
+
+import json
+import os
+from datetime import datetime
+
+from utils.answer_encoding import SIGNAL_NAMES
+
+HISTORY_FILE = "data/assessment_history.jsonl"
+
+
+def init_history_file():
+    """Initialize history file if it doesn't exist"""
+    os.makedirs(os.path.dirname(HISTORY_FILE), exist_ok=True)
+    if not os.path.exists(HISTORY_FILE):
+        open(HISTORY_FILE, 'a', encoding='utf-8').close()
+
+
+def save_assessment(result_dict):
+    """
+    Append one assessment's scores to the history
+
+    Args:
+        result_dict: Results from decision_engine.analyze_pcos_signals()
+
+    Returns:
+        dict: Stored record
+    """
+    signals = result_dict.get('signals', {})
+    record = {name: int(signals.get(name, 0)) for name in SIGNAL_NAMES}
+    record['total'] = int(result_dict.get('risk_score', sum(record.values())))
+    record['timestamp'] = datetime.now().isoformat()
+
+    init_history_file()
+    with open(HISTORY_FILE, 'a', encoding='utf-8') as f:
+        f.write(json.dumps(record) + "\n")
+
+    return record
+
+
+def read_history(offset=0):
+    """
+    Read stored assessments starting at a byte offset
+
+    Args:
+        offset: Byte offset to start from (0 = whole history)
+
+    Returns:
+        tuple: (list of records, byte offset just past the last complete line)
+    """
+    init_history_file()
+    records = []
+    with open(HISTORY_FILE, 'rb') as f:
+        f.seek(offset)
+        for line in f:
+            if not line.endswith(b"\n"):
+                # Partially written line; picked up on the next read
+                break
+            offset += len(line)
+            try:
+                records.append(json.loads(line))
+            except json.JSONDecodeError:
+                continue
+    return records, offset
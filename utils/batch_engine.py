@@ -0,0 +1,298 @@
+"""
+Vectorized batch scoring for the PCOS decision engine.
+Scores whole columns of questionnaire answers in one NumPy pass and
+produces exactly the same results as decision_engine.analyze_pcos_signals().
+"""
+
+from functools import lru_cache
+
+import numpy as np
+
+from utils.answer_encoding import (
+    ANSWER_FIELDS,
+    CYCLE_LENGTH_INDEX,
+    FIELD_WEIGHTS,
+    PERIODS_ABSENT_CODE,
+    SIGNAL_NAMES,
+    encode_answer,
+)
+from utils.decision_engine import classify_signals, get_ml_model, rules_fingerprint
+
+# Distinct string answers found by equality scans before falling back to a sort
+_MAX_SCANNED_ANSWERS = 8
+
+# Per-field weight tables as (n_codes, n_signals) arrays, in ANSWER_FIELDS order
+_WEIGHT_ARRAYS = tuple(np.array(FIELD_WEIGHTS[field], dtype=np.int64) for field in ANSWER_FIELDS)
+
+REQUIRED_FIELDS = (
+    "cycle_length",
+    "period_pain",
+    "stress_level",
+    "sleep_quality",
+    "mood_changes",
+    "sugar_cravings",
+    "weight_change",
+    "facial_hair",
+)
+
+
+def analyze_pcos_signals_batch(columns):
+    """
+    Score many respondents at once.
+
+    Args:
+        columns: mapping or structured NumPy array - One column per questionnaire
+            field (same names as analyze_pcos_signals arguments). Columns may be
+            NumPy arrays or plain lists; missing optional columns count as unanswered.
+
+    Returns:
+        dict: {
+            "signals": dict[str, ndarray[int]] - Per-signal scores,
+            "risk_score": ndarray[int],
+            "risk_level": ndarray[object],
+            "confidence": ndarray[float],
+            "pcos_type": ndarray[object],
+            "explanation": ndarray[object],
+            "doctor_needed": ndarray[bool],
+            "doctor_reasons": ndarray[object] - Shared tuples of reason strings,
+            "rule_version": str - Same for every row,
+            "ml_probability": ndarray[float] - Only when an ML model is installed
+        }
+    """
+    n_rows = _column_length(columns)
+    signals = np.zeros((len(SIGNAL_NAMES), n_rows), dtype=np.int64)
+    periods_absent = np.zeros(n_rows, dtype=bool)
+
+    model = get_ml_model()
+    codes = np.empty((n_rows, len(ANSWER_FIELDS)), dtype=np.intp) if model is not None else None
+
+    for field_index, field in enumerate(ANSWER_FIELDS):
+        column = _get_column(columns, field, n_rows)
+        if column is None:
+            # Unanswered still scores for fields like sleep quality
+            answer_codes = np.zeros(1, dtype=np.intp)
+            rows = np.zeros(n_rows, dtype=np.intp)
+        else:
+            uniques, rows = _factorize(column)
+            answer_codes = np.array(
+                [encode_answer(field, value) for value in uniques],
+                dtype=np.intp
+            )
+
+        weights = np.array(FIELD_WEIGHTS[field], dtype=np.int64)[answer_codes]
+        for signal_index in np.flatnonzero(weights.any(axis=0)):
+            signals[signal_index] += weights[:, signal_index][rows]
+
+        if field == "cycle_length":
+            periods_absent = (answer_codes == PERIODS_ABSENT_CODE)[rows]
+        if codes is not None:
+            codes[:, field_index] = answer_codes[rows]
+
+    classification = _classify_batch(signals, periods_absent)
+    classification["signals"] = {
+        name: signals[i] for i, name in enumerate(SIGNAL_NAMES)
+    }
+    classification["rule_version"] = rules_fingerprint()
+    if model is not None:
+        from utils.ml_model import encode_features
+        probabilities = model.predict_proba(encode_features(codes))
+        classification["ml_probability"] = np.round(probabilities * 100, 1)
+    return classification
+
+
+def analyze_codes_batch(codes):
+    """
+    Score rows that are already encoded with answer_encoding.encode_answers().
+
+    Args:
+        codes: array-like - (n_rows, n_fields) answer codes in ANSWER_FIELDS order
+
+    Returns:
+        dict: Same layout as analyze_pcos_signals_batch()
+    """
+    codes = np.asarray(codes, dtype=np.intp).reshape(-1, len(ANSWER_FIELDS))
+    signals = np.zeros((len(SIGNAL_NAMES), len(codes)), dtype=np.int64)
+    for field_index, weights in enumerate(_WEIGHT_ARRAYS):
+        signals += weights[codes[:, field_index]].T
+    periods_absent = codes[:, CYCLE_LENGTH_INDEX] == PERIODS_ABSENT_CODE
+
+    classification = _classify_batch(signals, periods_absent)
+    classification["signals"] = {
+        name: signals[i] for i, name in enumerate(SIGNAL_NAMES)
+    }
+    classification["rule_version"] = rules_fingerprint()
+    model = get_ml_model()
+    if model is not None:
+        from utils.ml_model import encode_features
+        probabilities = model.predict_proba(encode_features(codes))
+        classification["ml_probability"] = np.round(probabilities * 100, 1)
+    return classification
+
+
+def batch_result_row(batch_result, index):
+    """
+    Rebuild the analyze_pcos_signals() result dict for one row of a batch result.
+
+    Args:
+        batch_result: dict - Output of analyze_pcos_signals_batch()
+        index: int - Row index
+
+    Returns:
+        dict: Same shape as analyze_pcos_signals() output
+    """
+    row = {
+        "pcos_type": batch_result["pcos_type"][index],
+        "explanation": batch_result["explanation"][index],
+        "risk_score": int(batch_result["risk_score"][index]),
+        "risk_level": batch_result["risk_level"][index],
+        "confidence": float(batch_result["confidence"][index]),
+        "signals": {
+            name: int(values[index])
+            for name, values in batch_result["signals"].items()
+        },
+        "doctor_needed": bool(batch_result["doctor_needed"][index]),
+        "doctor_reasons": list(batch_result["doctor_reasons"][index]),
+        "rule_version": batch_result["rule_version"]
+    }
+    if "ml_probability" in batch_result:
+        row["ml_probability"] = float(batch_result["ml_probability"][index])
+    return row
+
+
+@lru_cache(maxsize=32768)
+def _classify_combination(signals, periods_absent):
+    """classify_signals() for one signal combination, as a shared tuple."""
+    result = classify_signals(*signals, periods_absent=periods_absent)
+    return (
+        result["risk_score"],
+        result["risk_level"],
+        result["confidence"],
+        result["pcos_type"],
+        result["explanation"],
+        result["doctor_needed"],
+        tuple(result["doctor_reasons"])
+    )
+
+
+def _classify_batch(signals, periods_absent):
+    """Classify every distinct signal combination once and broadcast the results."""
+    n_rows = signals.shape[1]
+    if n_rows == 0:
+        empty = np.empty(0, dtype=object)
+        return {
+            "risk_score": np.zeros(0, dtype=np.int64),
+            "risk_level": empty,
+            "confidence": np.zeros(0, dtype=np.float64),
+            "pcos_type": empty,
+            "explanation": empty,
+            "doctor_needed": np.zeros(0, dtype=bool),
+            "doctor_reasons": empty
+        }
+
+    # Pack the five signals and the absence flag into one integer key per row
+    keys = periods_absent.astype(np.int64)
+    for row in signals:
+        low = int(row.min())
+        keys = keys * (int(row.max()) - low + 1) + (row - low)
+
+    _, first_index, inverse = np.unique(keys, return_index=True, return_inverse=True)
+    inverse = inverse.reshape(-1)
+
+    combinations = signals[:, first_index].T.tolist()
+    absent_flags = periods_absent[first_index].tolist()
+    outcomes = [
+        _classify_combination(tuple(combination), absent)
+        for combination, absent in zip(combinations, absent_flags)
+    ]
+    (
+        risk_scores,
+        risk_levels,
+        confidences,
+        pcos_types,
+        explanations,
+        doctor_needed,
+        reasons
+    ) = zip(*outcomes)
+    doctor_reasons = np.empty(len(reasons), dtype=object)
+    for i, outcome_reasons in enumerate(reasons):
+        doctor_reasons[i] = outcome_reasons
+
+    return {
+        "risk_score": np.array(risk_scores, dtype=np.int64)[inverse],
+        "risk_level": np.array(risk_levels, dtype=object)[inverse],
+        "confidence": np.array(confidences, dtype=np.float64)[inverse],
+        "pcos_type": np.array(pcos_types, dtype=object)[inverse],
+        "explanation": np.array(explanations, dtype=object)[inverse],
+        "doctor_needed": np.array(doctor_needed, dtype=bool)[inverse],
+        "doctor_reasons": doctor_reasons[inverse]
+    }
+
+
+def _column_length(columns):
+    """Number of rows in the input, checking every column agrees."""
+    lengths = set()
+    for field in ANSWER_FIELDS:
+        if _has_column(columns, field):
+            lengths.add(len(columns[field]))
+
+    if len(lengths) > 1:
+        raise ValueError(f"Columns have different lengths: {sorted(lengths)}")
+    return lengths.pop() if lengths else 0
+
+
+def _has_column(columns, field):
+    if isinstance(columns, np.ndarray):
+        return columns.dtype.names is not None and field in columns.dtype.names
+    return field in columns
+
+
+def _get_column(columns, field, n_rows):
+    """Fetch one column; missing optional columns mean unanswered."""
+    if _has_column(columns, field):
+        return columns[field]
+    if field in REQUIRED_FIELDS and n_rows:
+        raise ValueError(f"Missing required column: {field}")
+    return None
+
+
+def _factorize(column):
+    """Split a column into its distinct values and a per-row index into them."""
+    if isinstance(column, np.ndarray):
+        if column.dtype.kind in "biuf":
+            uniques, codes = np.unique(column, return_inverse=True)
+            return [value.item() for value in uniques], codes.reshape(-1)
+        if column.dtype.kind == "U":
+            return _factorize_strings(column)
+        column = column.tolist()
+
+    uniques = list(set(column))
+    lookup = {value: code for code, value in enumerate(uniques)}
+    codes = np.fromiter(map(lookup.__getitem__, column), dtype=np.intp, count=len(column))
+    return uniques, codes
+
+
+def _factorize_strings(column):
+    """
+    Factorize a NumPy string column. Questionnaire columns hold only a handful of
+    distinct answers, so one equality scan per answer beats sorting the strings.
+    """
+    n_rows = len(column)
+    codes = np.empty(n_rows, dtype=np.intp)
+    uniques = []
+    pending = np.ones(n_rows, dtype=bool)
+
+    while n_rows and len(uniques) < _MAX_SCANNED_ANSWERS:
+        first = int(pending.argmax())
+        if not pending[first]:
+            return uniques, codes
+        match = column == column[first]
+        codes[match] = len(uniques)
+        uniques.append(column[first].item())
+        pending &= ~match
+
+    rest = np.flatnonzero(pending)
+    if len(rest):
+        rest_uniques, rest_codes = np.unique(column[rest], return_inverse=True)
+        codes[rest] = rest_codes.reshape(-1) + len(uniques)
+        uniques.extend(value.item() for value in rest_uniques)
+    return uniques, codes
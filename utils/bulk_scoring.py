@@ -0,0 +1,399 @@
+"""
+Streaming bulk scoring for partner clinic questionnaire dumps.
+
+Reads CSV or JSONL records in fixed-size chunks, scores each chunk in a worker
+process with the vectorized batch engine (optionally rendering the user and
+doctor summaries), and writes results back out in input order. Only a small
+window of chunks is in flight at once, so memory stays flat regardless of
+file size. After every written chunk a checkpoint records the input and output
+byte offsets, so an interrupted run continues where it stopped with --resume.
+
+CSV input must have a header row using the analyze_pcos_signals() argument
+names and one record per line (quoted fields with embedded newlines are not
+supported).
+
+Usage:
+    python -m utils.bulk_scoring INPUT OUTPUT [--workers N] [--chunk-size N]
+                                 [--summaries] [--resume]
+"""
+
+import argparse
+import csv
+import io
+import itertools
+import json
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from utils.answer_encoding import SIGNAL_NAMES
+from utils.batch_engine import analyze_pcos_signals_batch, batch_result_row
+from utils.report_generator import generate_summaries_batch
+
+DEFAULT_CHUNK_SIZE = 5000
+
+# Chunks queued per worker; bounds memory to roughly workers * this * chunk size
+CHUNKS_IN_FLIGHT_PER_WORKER = 2
+
+RESULT_COLUMNS = (
+    "row",
+    "pcos_type",
+    "risk_level",
+    "risk_score",
+    "confidence",
+) + tuple(f"{name}_signal" for name in SIGNAL_NAMES) + (
+    "doctor_needed",
+    "doctor_reasons",
+    "rule_version",
+)
+
+SUMMARY_COLUMNS = ("user_report", "doctor_summary")
+
+# Serialized outcome columns kept per worker process, keyed by outcome
+MAX_CACHED_FRAGMENTS = 50000
+_FRAGMENT_CACHE = {}
+
+
+# -----------------------------
+# INPUT
+# -----------------------------
+def detect_format(path, fmt=None):
+    if fmt:
+        return fmt
+    lowered = path.lower()
+    if lowered.endswith(".csv"):
+        return "csv"
+    if lowered.endswith((".jsonl", ".ndjson", ".json")):
+        return "jsonl"
+    raise ValueError(f"Cannot tell the format of {path}; pass --input-format/--output-format")
+
+
+def read_header(f, fmt):
+    """Read the CSV header (if any) and return (header, offset after it)."""
+    if fmt != "csv":
+        return None, 0
+    line = f.readline()
+    header = next(csv.reader([line.decode("utf-8-sig")]))
+    return header, len(line)
+
+
+def iter_chunks(f, start_offset, chunk_size, first_row=0):
+    """
+    Yield (first_row, start_offset, end_offset, lines) chunks of raw input lines.
+
+    Args:
+        f: binary file positioned anywhere; it is moved to start_offset
+        start_offset: int - Byte offset of the first record to read
+        chunk_size: int - Records per chunk
+        first_row: int - Row number of the record at start_offset
+    """
+    f.seek(start_offset)
+    offset = start_offset
+    row = first_row
+    while True:
+        lines = []
+        chunk_start = offset
+        for line in f:
+            offset += len(line)
+            if line.strip():
+                lines.append(line)
+                if len(lines) >= chunk_size:
+                    break
+        if not lines:
+            return
+        yield row, chunk_start, offset, lines
+        row += len(lines)
+
+
+def parse_columns(lines, fmt, header):
+    """
+    Parse raw lines into (number of records, columns) without building per-row dicts for CSV.
+
+    Stress values are converted to numbers, as the batch engine expects.
+    """
+    if fmt == "csv":
+        width = len(header)
+        rows = list(csv.reader(io.StringIO(b"".join(lines).decode("utf-8"))))
+        rows = [row[:width] if len(row) >= width else row + [""] * (width - len(row)) for row in rows]
+        columns = {name: list(values) for name, values in zip(header, zip(*rows))}
+        n_rows = len(rows)
+    else:
+        records = [json.loads(line) for line in lines]
+        fields = {}
+        for record in records:
+            fields.update(dict.fromkeys(record))
+        columns = {field: [record.get(field) for record in records] for field in fields}
+        n_rows = len(records)
+
+    if "stress_level" in columns:
+        columns["stress_level"] = [_coerce_stress(value) for value in columns["stress_level"]]
+    return n_rows, columns
+
+
+def _coerce_stress(value):
+    """CSV gives strings; the engine expects a number for the stress slider."""
+    if isinstance(value, str):
+        try:
+            number = float(value)
+        except ValueError:
+            return value
+        return int(number) if number.is_integer() else number
+    return value
+
+
+# -----------------------------
+# WORKER
+# -----------------------------
+def score_chunk(task):
+    """
+    Score one chunk of raw input lines (runs in a worker process).
+
+    Args:
+        task: tuple - (first_row, lines, input_format, header, output_format, summaries)
+
+    Returns:
+        tuple: (number of records, encoded output bytes)
+    """
+    first_row, lines, input_format, header, output_format, summaries = task
+    n_rows, columns = parse_columns(lines, input_format, header)
+
+    batch = analyze_pcos_signals_batch(columns)
+
+    signals = [batch["signals"][name].tolist() for name in SIGNAL_NAMES]
+    outcomes = zip(
+        batch["pcos_type"],
+        batch["risk_level"],
+        batch["risk_score"].tolist(),
+        batch["confidence"].tolist(),
+        *signals,
+        batch["doctor_needed"].tolist(),
+        batch["doctor_reasons"],
+        itertools.repeat(batch["rule_version"])
+    )
+
+    # Distinct outcomes are few, so each is serialized once per worker process
+    fragments = _FRAGMENT_CACHE.setdefault(output_format, {})
+    if len(fragments) > MAX_CACHED_FRAGMENTS:
+        fragments.clear()
+    if summaries:
+        records = (
+            {name: None if values[i] == "" else values[i] for name, values in columns.items()}
+            for i in range(n_rows)
+        )
+        reports = generate_summaries_batch(
+            (batch_result_row(batch, i) for i in range(n_rows)), records
+        )
+    parts = []
+    for i, outcome in enumerate(outcomes):
+        fragment = fragments.get(outcome)
+        if fragment is None:
+            fragment = fragments[outcome] = _outcome_fragment(outcome, output_format)
+        if summaries:
+            parts.append(_row_with_summaries(first_row + i, fragment, reports[i], output_format))
+        elif output_format == "jsonl":
+            parts.append(f'{{"row": {first_row + i}, {fragment}\n')
+        else:
+            parts.append(f"{first_row + i},{fragment}\n")
+
+    return n_rows, "".join(parts).encode("utf-8")
+
+
+def _outcome_fragment(outcome, output_format):
+    """Serialized result columns after "row" for one distinct outcome."""
+    values = dict(zip(RESULT_COLUMNS[1:], outcome))
+    values["doctor_reasons"] = list(values["doctor_reasons"])
+    if output_format == "jsonl":
+        # Drop the opening brace; the row number is prepended per record
+        return json.dumps(values, ensure_ascii=False)[1:]
+    values["doctor_reasons"] = "; ".join(values["doctor_reasons"])
+    return _csv_line(values.values())
+
+
+def _row_with_summaries(row, fragment, reports, output_format):
+    if output_format == "jsonl":
+        summary_json = json.dumps(
+            {column: reports[column] for column in SUMMARY_COLUMNS},
+            ensure_ascii=False
+        )[1:]
+        return f'{{"row": {row}, {fragment[:-1]}, {summary_json}\n'
+    return f"{row},{fragment},{_csv_line(reports[column] for column in SUMMARY_COLUMNS)}\n"
+
+
+def _csv_line(values):
+    buffer = io.StringIO()
+    csv.writer(buffer, lineterminator="").writerow(list(values))
+    return buffer.getvalue()
+
+
+# -----------------------------
+# CHECKPOINTS
+# -----------------------------
+def _checkpoint_path(output_path):
+    return output_path + ".checkpoint.json"
+
+
+def load_checkpoint(output_path):
+    """Saved progress for an output file, or None."""
+    try:
+        with open(_checkpoint_path(output_path), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+
+
+def save_checkpoint(output_path, checkpoint):
+    """Write a checkpoint atomically (after the output it describes is on disk)."""
+    path = _checkpoint_path(output_path)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(checkpoint, f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+# -----------------------------
+# DRIVER
+# -----------------------------
+def ordered_results(fn, tasks, workers):
+    """Run fn over tasks in a process pool, yielding results in submission order with a bounded window."""
+    if workers <= 1:
+        for task in tasks:
+            yield fn(task)
+        return
+
+    window = workers * CHUNKS_IN_FLIGHT_PER_WORKER
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = deque()
+        for task in tasks:
+            pending.append(pool.submit(fn, task))
+            if len(pending) >= window:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def run(input_path, output_path, workers=None, chunk_size=DEFAULT_CHUNK_SIZE,
+        summaries=False, resume=False, input_format=None, output_format=None,
+        progress=None):
+    """
+    Score an input file into an output file.
+
+    Args:
+        input_path: str - CSV or JSONL questionnaire records
+        output_path: str - CSV or JSONL scored output
+        workers: int (optional) - Worker processes (default: CPU count; 1 = in-process)
+        chunk_size: int - Records per chunk
+        summaries: bool - Also render user and doctor summaries per record
+        resume: bool - Continue from the output's checkpoint if there is one
+        input_format: str (optional) - "csv" or "jsonl" (default: from extension)
+        output_format: str (optional) - "csv" or "jsonl" (default: from extension)
+        progress: callable (optional) - Called with (rows done, rows/sec) after each chunk
+
+    Returns:
+        dict: {"rows": total rows written, "seconds": elapsed, "rows_per_sec": throughput}
+    """
+    input_format = detect_format(input_path, input_format)
+    output_format = detect_format(output_path, output_format)
+    workers = workers or os.cpu_count() or 1
+
+    checkpoint = None
+    if resume and os.path.exists(output_path):
+        checkpoint = load_checkpoint(output_path)
+
+    with open(input_path, "rb") as source:
+        header, data_offset = read_header(source, input_format)
+        if checkpoint:
+            input_offset = checkpoint["input_offset"]
+            rows_done = checkpoint["rows"]
+            output_offset = checkpoint["output_offset"]
+        else:
+            input_offset = data_offset
+            rows_done = 0
+            output_offset = 0
+
+        mode = "r+b" if checkpoint else "wb"
+        with open(output_path, mode) as out:
+            # Drop anything written after the last checkpoint
+            out.seek(output_offset)
+            out.truncate()
+            if output_offset == 0 and output_format == "csv":
+                columns = RESULT_COLUMNS + (SUMMARY_COLUMNS if summaries else ())
+                out.write((",".join(columns) + "\n").encode("utf-8"))
+
+            chunks = iter_chunks(source, input_offset, chunk_size, first_row=rows_done)
+            offsets = deque()
+
+            def tasks():
+                for first_row, _, end_offset, lines in chunks:
+                    offsets.append(end_offset)
+                    yield (first_row, lines, input_format, header, output_format, summaries)
+
+            start = time.perf_counter()
+            rows_this_run = 0
+            for n_rows, payload in ordered_results(score_chunk, tasks(), workers):
+                out.write(payload)
+                out.flush()
+                os.fsync(out.fileno())
+                rows_done += n_rows
+                rows_this_run += n_rows
+                save_checkpoint(output_path, {
+                    "input_offset": offsets.popleft(),
+                    "rows": rows_done,
+                    "output_offset": out.tell(),
+                })
+                if progress:
+                    elapsed = time.perf_counter() - start
+                    progress(rows_done, rows_this_run / elapsed if elapsed else 0.0)
+
+    elapsed = time.perf_counter() - start
+    return {
+        "rows": rows_done,
+        "seconds": elapsed,
+        "rows_per_sec": rows_this_run / elapsed if elapsed else 0.0,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Bulk-score PCOS questionnaire records")
+    parser.add_argument("input", help="CSV or JSONL input file")
+    parser.add_argument("output", help="CSV or JSONL output file")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: CPU count)")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE, help="records per chunk")
+    parser.add_argument("--summaries", action="store_true", help="include user and doctor summaries")
+    parser.add_argument("--resume", action="store_true", help="continue from the last checkpoint")
+    parser.add_argument("--input-format", choices=["csv", "jsonl"], default=None)
+    parser.add_argument("--output-format", choices=["csv", "jsonl"], default=None)
+    args = parser.parse_args(argv)
+
+    last_report = [0.0]
+
+    def progress(rows, rate):
+        now = time.monotonic()
+        if now - last_report[0] >= 1.0:
+            last_report[0] = now
+            print(f"{rows} rows scored ({rate:,.0f} rows/sec)", file=sys.stderr)
+
+    stats = run(
+        args.input,
+        args.output,
+        workers=args.workers,
+        chunk_size=args.chunk_size,
+        summaries=args.summaries,
+        resume=args.resume,
+        input_format=args.input_format,
+        output_format=args.output_format,
+        progress=progress
+    )
+    print(
+        f"Done: {stats['rows']} rows in {stats['seconds']:.1f}s "
+        f"({stats['rows_per_sec']:,.0f} rows/sec)",
+        file=sys.stderr
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,93 +1,352 @@
 """
 Guided chatbot engine for clarification and emotional support.
-Rule-based, explainable responses - no black-box ML.
+Rule-based, explainable responses - no black-box ML. Free-text questions can
+optionally be answered by a self-hosted model (see generation_backend), with
+the rule-based reply as the fallback.
 """
 
-from utils.prompt_library import get_questions_for_category
+import logging
+import re
+from functools import lru_cache
+from types import MappingProxyType
+
+from utils.generation_backend import GenerationError, get_generation_backend
+from utils.prompt_library import get_question
+from utils.search_index import PROMPT_SOURCE, index_generation, search
+
+logger = logging.getLogger(__name__)
+
+# Keywords behind each concern flag, matched case-insensitively anywhere in an answer
+CONCERN_INDICATORS = {
+    "irregularity": ("Irregular", "Very irregular", "Absent", "missing", "varies more"),
+    "severe_pain": ("Severe", "disabling", "difficult to function", "Significantly"),
+    "significant_hormonal": ("Noticeable", "Significant", "Severe", "persistent"),
+    "frequent_mood": ("Frequently", "Often", "Poor", "Insomnia"),
+    "significant_weight": ("Noticeable", "Significant", "Frequently", "Very difficult", "weight gain"),
+}
+
+# Numeric answers (the stress slider) at or above this set the "high_stress" flag
+HIGH_STRESS_LEVEL = 7
+
+# Flag sets kept per distinct answer text before the cache is reset
+MAX_CACHED_ANSWERS = 4096
+
+# Responses kept per (age group, category, answers) by generate_response()
+MAX_CACHED_RESPONSES = 1024
+
+# Categories without a registered handler get this category's response
+DEFAULT_CATEGORY = "other"
+
+# Concern categories as the AI Assistant offers them
+CATEGORY_LABELS = {
+    "menstrual": "Menstrual Issues",
+    "pain": "Pain & Discomfort",
+    "hormonal": "Hormonal Changes",
+    "mood": "Mood & Mental Health",
+    "weight": "Weight & Metabolism",
+    "other": "Other Concerns",
+}
+
+# Passages from the educational content shown with a free-text answer
+RELATED_PASSAGES = 3
+
+AGE_GROUP_LABELS = {
+    "teenager": "a teenager (13-18)",
+    "young_adult": "a young adult (19-30)",
+    "adult": "an adult (31-45)",
+}
+
+# Prompt sent to the generation backend; the guide passages keep it grounded in the app's content
+GENERATION_PROMPT = """You are a supportive women's health companion. You give awareness and \
+lifestyle guidance only: never diagnose, never name medications or doses, and suggest seeing a \
+healthcare professional when symptoms are severe, persistent or worrying. Answer in plain, kind \
+language in under 150 words.
+
+The person is {age_group}. Relevant passages from our guides:
+{context}
+
+Their question:
+{question}"""
+
+# category -> handler(age_group, answers, flags), see response_handler()
+RESPONSE_HANDLERS = {}
+
+
+def _keyword_trie_pattern(keywords):
+    """
+    Regex matching any of the keywords, laid out as a trie so that each
+    position is tried against the keywords sharing its first letters only
+    once; a keyword that is a prefix of another matches the longer one first.
+    """
+    trie = {}
+    for keyword in keywords:
+        node = trie
+        for char in keyword:
+            node = node.setdefault(char, {})
+        node[""] = {}
+
+    def build(node):
+        branches = [re.escape(char) + build(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        return f"(?:{body})?" if "" in node else body
+
+    return re.compile(build(trie))
+
+
+def _compile_indicators(indicators):
+    """
+    One pattern over every keyword, and the flags each match stands for.
+
+    A keyword's flags include those of every keyword contained in it
+    ("significantly" also counts as "significant"), so the longest match at
+    a position covers all shorter keywords inside it.
+    """
+    flags_by_keyword = {}
+    for flag, keywords in indicators.items():
+        for keyword in keywords:
+            flags_by_keyword.setdefault(keyword.lower(), set()).add(flag)
+
+    keyword_flags = {
+        keyword: frozenset().union(*(flags for other, flags in flags_by_keyword.items() if other in keyword))
+        for keyword in flags_by_keyword
+    }
+    return _keyword_trie_pattern(keyword_flags), keyword_flags
+
+
+_INDICATOR_PATTERN, _KEYWORD_FLAGS = _compile_indicators(CONCERN_INDICATORS)
+_NO_FLAGS = frozenset()
+_HIGH_STRESS = frozenset(["high_stress"])
+_answer_cache = {}
+
+
+def _scan(text):
+    """Flags raised by one answer text, in a single pass of the keyword pattern."""
+    search = _INDICATOR_PATTERN.search
+    match = search(text)
+    if match is None:
+        return _NO_FLAGS
+    flags = _NO_FLAGS
+    while match is not None:
+        flags = flags | _KEYWORD_FLAGS[match.group()]
+        # Resume one character in, so keywords overlapping this match are found too
+        match = search(text, match.start() + 1)
+    return flags
+
+
+def _answer_flags(text):
+    flags = _answer_cache.get(text)
+    if flags is None:
+        if len(_answer_cache) >= MAX_CACHED_ANSWERS:
+            _answer_cache.clear()
+        flags = _answer_cache[text] = _scan(text.lower())
+    return flags
+
+
+def concern_flags(answers):
+    """
+    Every concern flag raised by a set of answers, in one scan of each answer.
+
+    Args:
+        answers: dict - Dictionary of question_id: answer pairs
+
+    Returns:
+        frozenset: Names from CONCERN_INDICATORS, plus "high_stress" for a
+            numeric answer of HIGH_STRESS_LEVEL or more
+    """
+    flags = _NO_FLAGS
+    for answer in answers.values():
+        if isinstance(answer, (int, float)) and answer >= HIGH_STRESS_LEVEL:
+            flags = flags | _HIGH_STRESS
+        flags = flags | _answer_flags(answer if type(answer) is str else str(answer))
+    return flags
+
+
+def response_handler(category):
+    """
+    Decorator registering handler(age_group, answers, flags) for a concern category.
+
+    The handler returns (clarification, is_normal, next_steps,
+    suggest_health_check), optionally followed by related passages (see
+    search_index.search()); flags are the answers' concern_flags(). Its
+    responses are cached, so it must depend on its arguments only.
+    """
+    def register(handler):
+        if category in RESPONSE_HANDLERS:
+            raise ValueError(f"Duplicate response handler: {category}")
+        RESPONSE_HANDLERS[category] = handler
+        _cached_response.cache_clear()
+        return handler
+    return register
 
 
 def generate_response(age_group, concern_category, answers):
     """
     Generate a clarification and guidance response based on user answers.
     
+    Responses are memoized by (age_group, concern_category, answers) and the
+    search index generation (so related passages follow a reloaded index), so
+    a rerun or a repeated answer pattern is a cache lookup. The returned
+    mapping is shared between callers and read-only.
+    
     Args:
         age_group: str - "teenager", "young_adult", or "adult"
         concern_category: str - "menstrual", "pain", "hormonal", "mood", "weight", "other"
         answers: dict - Dictionary of question_id: answer pairs
     
     Returns:
-        dict: {
+        mapping: {
             "clarification": str - Explanation in plain language,
             "is_normal": bool or None - Whether response suggests normal variation,
-            "next_steps": list[str] - Suggested actions,
-            "suggest_health_check": bool - Whether to recommend full health check
+            "next_steps": tuple[str] - Suggested actions,
+            "suggest_health_check": bool - Whether to recommend full health check,
+            "related": tuple[mapping] - Passages from the educational content
+                ({"title", "text", "source"}) matching free-text answers
         }
     """
-    
-    clarification = ""
-    is_normal = None
-    next_steps = []
-    suggest_health_check = False
-    
-    # Determine response based on category and answers
-    if concern_category == "menstrual":
-        clarification, is_normal, next_steps, suggest_health_check = _handle_menstrual_concerns(
-            age_group, answers
-        )
-    elif concern_category == "pain":
-        clarification, is_normal, next_steps, suggest_health_check = _handle_pain_concerns(
-            age_group, answers
-        )
-    elif concern_category == "hormonal":
-        clarification, is_normal, next_steps, suggest_health_check = _handle_hormonal_concerns(
-            age_group, answers
-        )
-    elif concern_category == "mood":
-        clarification, is_normal, next_steps, suggest_health_check = _handle_mood_concerns(
-            age_group, answers
-        )
-    elif concern_category == "weight":
-        clarification, is_normal, next_steps, suggest_health_check = _handle_weight_concerns(
-            age_group, answers
-        )
-    else:
-        clarification = (
-            "Thank you for sharing your concerns. Your experiences are valid, "
-            "and it's understandable to seek clarification."
-        )
-        next_steps = [
-            "Consider taking our full Health Check for a comprehensive assessment",
-            "Learn more about common conditions in our Education section",
-            "If concerns persist, consider consulting with a healthcare professional"
-        ]
-        suggest_health_check = True
-    
-    return {
+    try:
+        return _cached_response(age_group, concern_category, frozenset(answers.items()), index_generation())
+    except TypeError:
+        # Unhashable answers (e.g. multiselect lists) are answered without the cache
+        return _build_response(age_group, concern_category, answers)
+
+
+@lru_cache(maxsize=MAX_CACHED_RESPONSES)
+def _cached_response(age_group, concern_category, answer_items, search_generation):
+    return _build_response(age_group, concern_category, dict(answer_items))
+
+
+def clear_caches():
+    """Forget every memoized response and answer scan (e.g. to time the uncached path)."""
+    _cached_response.cache_clear()
+    _answer_cache.clear()
+
+
+def _build_response(age_group, concern_category, answers):
+    handler = RESPONSE_HANDLERS.get(concern_category) or RESPONSE_HANDLERS[DEFAULT_CATEGORY]
+    clarification, is_normal, next_steps, suggest_health_check, *related = handler(
+        age_group, answers, concern_flags(answers)
+    )
+    return MappingProxyType({
         "clarification": clarification,
         "is_normal": is_normal,
-        "next_steps": next_steps,
-        "suggest_health_check": suggest_health_check
-    }
+        "next_steps": tuple(next_steps),
+        "suggest_health_check": suggest_health_check,
+        "related": tuple(
+            MappingProxyType({key: passage[key] for key in ("title", "text", "source")})
+            for passage in (related[0] if related else ())
+        )
+    })
+
+
+def free_text(age_group, concern_category, answers):
+    """The answers to free-text questions, joined (empty when there are none)."""
+    texts = []
+    for question_id, answer in answers.items():
+        question = get_question(question_id)
+        if question is not None and question.type == "text" and isinstance(answer, str) and answer.strip():
+            texts.append(answer.strip())
+    return "\n".join(texts)
+
+
+def build_prompt(age_group, concern_category, answers):
+    """
+    Generation backend prompt for the free-text answers, grounded in the
+    passages the rule-based response found for them.
+
+    Returns:
+        str or None: Prompt, or None when there is no free text to answer
+    """
+    question = free_text(age_group, concern_category, answers)
+    if not question:
+        return None
+    related = generate_response(age_group, concern_category, answers)["related"]
+    context = "\n\n".join(f"{passage['title']}:\n{passage['text']}" for passage in related) or "(none)"
+    return GENERATION_PROMPT.format(
+        age_group=AGE_GROUP_LABELS.get(age_group, "an adult"),
+        context=context,
+        question=question,
+    )
+
+
+def uses_generation_backend(age_group, concern_category, answers):
+    """Whether stream_reply() will try the generation backend for these answers."""
+    backend = get_generation_backend()
+    return backend is not None and backend.available and bool(free_text(age_group, concern_category, answers))
+
+
+def stream_reply(age_group, concern_category, answers, backend=None):
+    """
+    The assistant's clarification as a stream of text chunks (for st.write_stream).
 
+    Free text is answered by the generation backend when one is configured.
+    Without a backend or free text, or when the backend fails or is too slow
+    before its first chunk, the rule-based clarification is yielded instead;
+    if it fails part-way, the rule-based clarification follows the partial reply.
 
-def _handle_menstrual_concerns(age_group, answers):
+    Args:
+        age_group: str - "teenager", "young_adult", or "adult"
+        concern_category: str - Concern category, as for generate_response()
+        answers: dict - Dictionary of question_id: answer pairs
+        backend: GenerationBackend (optional) - Default: get_generation_backend()
+
+    Yields:
+        str: Reply text chunks
+    """
+    clarification = generate_response(age_group, concern_category, answers)["clarification"]
+    backend = backend or get_generation_backend()
+    prompt = build_prompt(age_group, concern_category, answers) if backend else None
+    if prompt is None:
+        yield clarification
+        return
+
+    streamed = False
+    try:
+        for chunk in backend.stream(prompt):
+            streamed = True
+            yield chunk
+    except GenerationError as error:
+        logger.info("Falling back to the rule-based reply: %s", error)
+        yield "\n\n" + clarification if streamed else clarification
+
+
+@response_handler("other")
+def _handle_other_concerns(age_group, answers, flags):
+    """Handle concerns outside the guided categories."""
+    clarification = (
+        "Thank you for sharing your concerns. Your experiences are valid, "
+        "and it's understandable to seek clarification."
+    )
+    next_steps = [
+        "Consider taking our full Health Check for a comprehensive assessment",
+        "Learn more about common conditions in our Education section",
+        "If concerns persist, consider consulting with a healthcare professional"
+    ]
+    
+    # Free text is matched against the educational content; a close match with a
+    # guided question points to the category that asks it
+    text = " ".join(answer for answer in answers.values() if isinstance(answer, str))
+    matches = search(text, limit=RELATED_PASSAGES * 2) if text.strip() else []
+    related = [passage for passage in matches if passage["source"] != PROMPT_SOURCE][:RELATED_PASSAGES]
+    if related:
+        clarification += " Here is what our guides say about the topics you mentioned."
+    guided = next((passage.get("category") for passage in matches if passage["source"] == PROMPT_SOURCE), None)
+    if guided in CATEGORY_LABELS and guided != "other":
+        next_steps.insert(0, f'For more specific guidance, choose "{CATEGORY_LABELS[guided]}" and answer a few questions')
+    
+    return clarification, None, next_steps, True, related
+
+
+@response_handler("menstrual")
+def _handle_menstrual_concerns(age_group, answers, flags):
     """Handle menstrual-related concerns."""
     clarification = "Menstrual patterns can vary widely, and what's normal for one person may differ for another."
     is_normal = None
     next_steps = []
     suggest_health_check = False
     
-    # Check for irregularity indicators
-    irregularity_indicators = [
-        "Irregular", "Very irregular", "Absent", "missing", "varies more"
-    ]
-    
-    has_irregularity = any(
-        any(indicator.lower() in str(answer).lower() for indicator in irregularity_indicators)
-        for answer in answers.values()
-    )
-    
-    if has_irregularity:
+    if "irregularity" in flags:
         clarification += (
             " Irregular periods can have many causes, including hormonal changes, "
             "stress, lifestyle factors, or underlying conditions. "
@@ -115,22 +374,15 @@ def _handle_menstrual_concerns(age_group, answers):
     return clarification, is_normal, next_steps, suggest_health_check
 
 
-def _handle_pain_concerns(age_group, answers):
+@response_handler("pain")
+def _handle_pain_concerns(age_group, answers, flags):
     """Handle pain-related concerns."""
     clarification = "Period pain varies greatly between individuals, but severe or disabling pain is not normal."
     is_normal = None
     next_steps = []
     suggest_health_check = False
     
-    # Check for severe pain indicators
-    severe_pain_indicators = ["Severe", "disabling", "difficult to function", "Significantly"]
-    
-    has_severe_pain = any(
-        any(indicator.lower() in str(answer).lower() for indicator in severe_pain_indicators)
-        for answer in answers.values()
-    )
-    
-    if has_severe_pain:
+    if "severe_pain" in flags:
         clarification += (
             " Severe or disabling pain that affects your daily life warrants attention. "
             "This could indicate various conditions and should be evaluated by a healthcare provider."
@@ -157,22 +409,15 @@ def _handle_pain_concerns(age_group, answers):
     return clarification, is_normal, next_steps, suggest_health_check
 
 
-def _handle_hormonal_concerns(age_group, answers):
+@response_handler("hormonal")
+def _handle_hormonal_concerns(age_group, answers, flags):
     """Handle hormonal-related concerns."""
     clarification = "Hormonal changes can affect many aspects of health, including skin, hair, and body composition."
     is_normal = None
     next_steps = []
     suggest_health_check = False
     
-    # Check for significant hormonal indicators
-    significant_indicators = ["Noticeable", "Significant", "Severe", "persistent"]
-    
-    has_significant_symptoms = any(
-        any(indicator.lower() in str(answer).lower() for indicator in significant_indicators)
-        for answer in answers.values()
-    )
-    
-    if has_significant_symptoms:
+    if "significant_hormonal" in flags:
         clarification += (
             " Noticeable changes in hair growth, hair loss, or persistent acne "
             "may indicate hormonal imbalances worth discussing with a healthcare provider."
@@ -199,26 +444,15 @@ def _handle_hormonal_concerns(age_group, answers):
     return clarification, is_normal, next_steps, suggest_health_check
 
 
-def _handle_mood_concerns(age_group, answers):
+@response_handler("mood")
+def _handle_mood_concerns(age_group, answers, flags):
     """Handle mood and mental health concerns."""
     clarification = "Mood changes can be influenced by many factors, including hormonal cycles, stress, and lifestyle."
     is_normal = None
     next_steps = []
     suggest_health_check = False
     
-    # Check for significant mood indicators
-    frequent_indicators = ["Frequently", "Often", "Poor", "Insomnia"]
-    high_stress = any(
-        isinstance(answer, (int, float)) and answer >= 7
-        for answer in answers.values()
-    )
-    
-    has_frequent_mood_issues = any(
-        any(indicator.lower() in str(answer).lower() for indicator in frequent_indicators)
-        for answer in answers.values()
-    ) or high_stress
-    
-    if has_frequent_mood_issues:
+    if "frequent_mood" in flags or "high_stress" in flags:
         clarification += (
             " Frequent mood changes, high stress, or poor sleep can significantly impact "
             "overall health and may be connected to hormonal patterns. "
@@ -246,24 +480,16 @@ def _handle_mood_concerns(age_group, answers):
     return clarification, is_normal, next_steps, suggest_health_check
 
 
-def _handle_weight_concerns(age_group, answers):
+@response_handler("weight")
+def _handle_weight_concerns(age_group, answers, flags):
     """Handle weight and metabolic concerns."""
     clarification = "Weight changes can have many causes, including hormonal patterns, lifestyle, stress, and metabolism."
     is_normal = None
     next_steps = []
     suggest_health_check = False
     
-    # Check for significant weight/metabolic indicators
-    significant_indicators = ["Noticeable", "Significant", "Frequently", "Very difficult"]
-    weight_gain_or_cravings = any(
-        "weight gain" in str(answer).lower() or "Frequently" in str(answer)
-        for answer in answers.values()
-    )
-    
-    if weight_gain_or_cravings or any(
-        any(indicator.lower() in str(answer).lower() for indicator in significant_indicators)
-        for answer in answers.values()
-    ):
+    # Weight gain mentions and frequent cravings count as significant too
+    if "significant_weight" in flags:
         clarification += (
             " Unexplained weight changes or frequent cravings can sometimes be connected "
             "to metabolic or hormonal patterns. A comprehensive assessment may help understand contributing factors."
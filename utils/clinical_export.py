@@ -0,0 +1,597 @@
+"""
+Structured, machine-readable clinical summaries.
+
+Clinic systems get the assessment as a JSON document instead of the
+box-drawn doctor summary, in one of two shapes:
+    "summary" - a flat clinical summary document (schema SCHEMA_NAME)
+    "fhir"    - a FHIR-style Bundle: a QuestionnaireResponse with the
+                answers, one Observation per signal score and one
+                Observation for the overall risk assessment
+
+Each shape is a skeleton built once per process: every key, code, label and
+constant is serialized up front into fixed JSON fragments, leaving only the
+per-record values as slots, and the fragments are compiled into one f-string
+serializer per shape. Values that depend only on the result are encoded once
+per distinct outcome; a record then costs its answers, the C string encoder
+of the json module and one f-string. No dict is built and json.dumps never
+walks the document.
+
+Usage:
+    python -m utils.clinical_export INPUT OUTPUT.ndjson [--format summary|fhir]
+                                    [--workers N] [--chunk-size N] [--id-column COLUMN]
+    (OUTPUT "-" writes to stdout; one document per line)
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+import uuid
+from datetime import datetime, timezone
+from json.encoder import encode_basestring
+
+from utils.answer_encoding import ANSWER_FIELDS, SIGNAL_NAMES
+from utils.batch_engine import analyze_pcos_signals_batch, batch_result_row
+from utils.bulk_scoring import detect_format, iter_chunks, ordered_results, parse_columns, read_header
+from utils.sensitivity import FIELD_LABELS
+
+DOCUMENT_FORMATS = ("summary", "fhir")
+
+SCHEMA_NAME = "pcos-health-ai/clinical-summary"
+SCHEMA_VERSION = "1"
+
+DEFAULT_CHUNK_SIZE = 2000
+
+JSON_CONTENT_TYPE = "application/json"
+FHIR_CONTENT_TYPE = "application/fhir+json"
+
+# Questionnaire fields in the documents, in order
+RESPONSE_FIELDS = ("age",) + ANSWER_FIELDS
+
+_QUESTION_TEXT = {"age": "Age", **FIELD_LABELS}
+
+_SIGNAL_DISPLAY = {
+    "cycle": "Cycle Irregularity",
+    "stress": "Stress & Adrenal Load",
+    "insulin": "Metabolic/Insulin Indicators",
+    "androgen": "Androgen-Related Symptoms",
+    "inflammation": "Inflammation Indicators",
+}
+
+MAX_SIGNAL_SCORE = 10
+
+_SYSTEM = "urn:pcos-health-ai"
+
+# Compact JSON, one document per line
+_SEPARATORS = (",", ":")
+
+DISCLAIMER = (
+    "Generated by a rule-based, explainable screening tool for awareness and discussion support. "
+    "It is not a medical diagnosis."
+)
+
+
+# -----------------------------
+# SKELETONS
+# -----------------------------
+# Slot values that depend only on the result, in the order of _outcome_values()
+_OUTCOME_SLOTS = (
+    "rule_version", "risk_level", "risk_score", "pcos_type", "confidence", "explanation",
+) + tuple(f"signal_{name}" for name in SIGNAL_NAMES) + (
+    "doctor_needed", "doctor_reasons", "doctor_reasons_text",
+)
+
+# Encoded outcome slot values kept per process before the cache is reset
+MAX_CACHED_OUTCOMES = 4096
+
+
+class _Slot:
+    """
+    Placeholder for a per-record value in a skeleton.
+
+    Kinds: "outcome" (a result value, one of _OUTCOME_SLOTS), "meta"
+    (record_id or generated), "response" (an answer, by RESPONSE_FIELDS
+    index) and "answer" (an answer as a FHIR answer array).
+    """
+
+    __slots__ = ("kind", "key")
+
+    def __init__(self, kind, key):
+        self.kind = kind
+        self.key = key
+
+
+def _outcome(name):
+    return _Slot("outcome", _OUTCOME_SLOTS.index(name))
+
+
+def _summary_skeleton():
+    return {
+        "schema": SCHEMA_NAME,
+        "schema_version": SCHEMA_VERSION,
+        "id": _Slot("meta", "record_id"),
+        "generated": _Slot("meta", "generated"),
+        "rule_version": _outcome("rule_version"),
+        "assessment": {
+            "risk_level": _outcome("risk_level"),
+            "risk_score": _outcome("risk_score"),
+            "pcos_type": _outcome("pcos_type"),
+            "confidence": _outcome("confidence"),
+            "explanation": _outcome("explanation"),
+        },
+        "signals": {name: _outcome(f"signal_{name}") for name in SIGNAL_NAMES},
+        "signal_max": MAX_SIGNAL_SCORE,
+        "referral": {
+            "recommended": _outcome("doctor_needed"),
+            "reasons": _outcome("doctor_reasons"),
+        },
+        "responses": {field: _Slot("response", index) for index, field in enumerate(RESPONSE_FIELDS)},
+        "disclaimer": DISCLAIMER,
+    }
+
+
+def _fhir_skeleton():
+    questionnaire = {
+        "resourceType": "QuestionnaireResponse",
+        "status": "completed",
+        "questionnaire": f"{_SYSTEM}:questionnaire:health-check",
+        "authored": _Slot("meta", "generated"),
+        "item": [
+            {"linkId": field, "text": _QUESTION_TEXT[field], "answer": _Slot("answer", index)}
+            for index, field in enumerate(RESPONSE_FIELDS)
+        ],
+    }
+    signals = [
+        {"resource": {
+            "resourceType": "Observation",
+            "status": "final",
+            "code": {"coding": [{"system": f"{_SYSTEM}:signal", "code": name, "display": _SIGNAL_DISPLAY[name]}]},
+            "valueQuantity": {"value": _outcome(f"signal_{name}"), "unit": "score"},
+            "referenceRange": [{"low": {"value": 0}, "high": {"value": MAX_SIGNAL_SCORE}}],
+        }}
+        for name in SIGNAL_NAMES
+    ]
+    assessment = {
+        "resourceType": "Observation",
+        "status": "final",
+        "code": {"coding": [{
+            "system": f"{_SYSTEM}:assessment", "code": "pcos-risk", "display": "PCOS risk assessment",
+        }]},
+        "method": {"text": "Rule-based signal weighting", "coding": [{
+            "system": f"{_SYSTEM}:rule-version", "code": _outcome("rule_version"),
+        }]},
+        "valueCodeableConcept": {"text": _outcome("risk_level")},
+        "component": [
+            {"code": {"text": "Risk score"}, "valueInteger": _outcome("risk_score")},
+            {"code": {"text": "Detected pattern"}, "valueString": _outcome("pcos_type")},
+            {"code": {"text": "Confidence"}, "valueQuantity": {"value": _outcome("confidence"), "unit": "%"}},
+            {"code": {"text": "Medical evaluation advised"}, "valueBoolean": _outcome("doctor_needed")},
+            {"code": {"text": "Evaluation reasons"}, "valueString": _outcome("doctor_reasons_text")},
+        ],
+        "note": [{"text": _outcome("explanation")}, {"text": DISCLAIMER}],
+    }
+    return {
+        "resourceType": "Bundle",
+        "type": "collection",
+        "identifier": {"system": f"{_SYSTEM}:record", "value": _Slot("meta", "record_id")},
+        "timestamp": _Slot("meta", "generated"),
+        "entry": [{"resource": questionnaire}] + signals + [{"resource": assessment}],
+    }
+
+
+class CompiledSkeleton:
+    """
+    A document skeleton compiled once per process: its fixed JSON fragments
+    and a generated serialize(outcome, answers, generated, record_id)
+    function that joins them with the encoded slot values in one f-string.
+    """
+
+    __slots__ = ("document_format", "skeleton", "fragments", "slots", "source", "serialize")
+
+    def __init__(self, document_format, skeleton):
+        self.document_format = document_format
+        self.skeleton = skeleton
+        slots = []
+
+        def marker(obj):
+            if isinstance(obj, _Slot):
+                slots.append(obj)
+                return f"\x00{len(slots) - 1}\x00"
+            raise TypeError(f"Not serializable: {obj!r}")
+
+        # Slots become "\u0000<n>\u0000" strings; split the text around them
+        text = json.dumps(skeleton, ensure_ascii=False, separators=_SEPARATORS, default=marker)
+        parts = text.split('"\\u0000')
+        fragments = [parts[0]]
+        for index, part in enumerate(parts[1:]):
+            number, _, rest = part.partition('\\u0000"')
+            if int(number) != index:
+                raise ValueError("Skeleton slots out of order")
+            fragments.append(rest)
+        self.fragments = tuple(fragments)
+        self.slots = tuple(slots)
+
+        template = [_escape_braces(self.fragments[0])]
+        for slot, fragment in zip(self.slots, self.fragments[1:]):
+            template.append("{" + _SLOT_EXPRESSIONS[slot.kind].format(slot.key) + "}")
+            template.append(_escape_braces(fragment))
+        self.source = (
+            "def serialize(outcome, answers, generated, record_id):\n"
+            f"    return f{''.join(template)!r}\n"
+        )
+        namespace = {"_response": _encode_response, "_answer": _encode_answer}
+        exec(compile(self.source, f"<document skeleton {document_format}>", "exec"), namespace)
+        self.serialize = namespace["serialize"]
+
+    def __repr__(self):
+        return f"CompiledSkeleton(document_format={self.document_format!r}, slots={len(self.slots)})"
+
+
+# Expression for each slot kind in the generated serializer
+_SLOT_EXPRESSIONS = {
+    "outcome": "outcome[{}]",
+    "meta": "{}",
+    "response": "_response(answers[{}])",
+    "answer": "_answer(answers[{}])",
+}
+
+
+def _escape_braces(text):
+    return text.replace("{", "{{").replace("}", "}}")
+
+
+_COMPILED = {}
+
+
+def compiled_skeleton(document_format):
+    """The compiled skeleton of one document format (built on first use)."""
+    compiled = _COMPILED.get(document_format)
+    if compiled is None:
+        if document_format == "summary":
+            skeleton = _summary_skeleton()
+        elif document_format == "fhir":
+            skeleton = _fhir_skeleton()
+        else:
+            raise ValueError(f"Unknown document format: {document_format}")
+        compiled = _COMPILED[document_format] = CompiledSkeleton(document_format, skeleton)
+    return compiled
+
+
+# -----------------------------
+# SLOT VALUES
+# -----------------------------
+def _outcome_values(result):
+    """The result's values for _OUTCOME_SLOTS; hashable, so it also keys the encoded-outcome cache."""
+    signals = result.get("signals", {})
+    reasons = tuple(result.get("doctor_reasons", ()))
+    return (
+        result.get("rule_version"),
+        result.get("risk_level", "Unknown"),
+        result.get("risk_score", 0),
+        result.get("pcos_type", "Unclear"),
+        result.get("confidence", 0),
+        result.get("explanation", ""),
+        *[signals.get(name, 0) for name in SIGNAL_NAMES],
+        bool(result.get("doctor_needed", False)),
+        reasons,
+        "; ".join(map(str, reasons)),
+    )
+
+
+_outcome_cache = {}
+
+
+def _encoded_outcome(values):
+    """Encoded outcome slot values; distinct outcomes are few, so each is encoded once."""
+    try:
+        encoded = _outcome_cache.get(values)
+    except TypeError:
+        return tuple(map(_encode_value, values))
+    if encoded is None:
+        if len(_outcome_cache) >= MAX_CACHED_OUTCOMES:
+            _outcome_cache.clear()
+        encoded = _outcome_cache[values] = tuple(map(_encode_value, values))
+    return encoded
+
+
+def _answer_list(value):
+    """FHIR answer array for one questionnaire answer."""
+    if value is None or value == "":
+        return []
+    if isinstance(value, bool):
+        return [{"valueBoolean": value}]
+    if isinstance(value, int):
+        return [{"valueInteger": value}]
+    if isinstance(value, float):
+        return [{"valueDecimal": value}]
+    return [{"valueString": str(value)}]
+
+
+def _encode_value(value):
+    encoder = _ENCODERS.get(type(value))
+    if encoder is None:
+        return json.dumps(value, ensure_ascii=False, separators=_SEPARATORS, default=str)
+    return encoder(value)
+
+
+def _encode_float(value):
+    # json.dumps spells non-finite floats NaN/Infinity, which strict parsers reject
+    if value != value or value in (float("inf"), float("-inf")):
+        return "null"
+    return float.__repr__(value)
+
+
+def _encode_sequence(values):
+    return "[" + ",".join(map(_encode_value, values)) + "]"
+
+
+def _encode_response(value):
+    """An answer in the summary document; unanswered is null."""
+    if value == "":
+        return "null"
+    return _encode_value(value)
+
+
+def _encode_answer(value):
+    encoder = _ANSWER_ENCODERS.get(type(value))
+    if encoder is None:
+        return _encode_value(_answer_list(value))
+    return encoder(value)
+
+
+_ENCODERS = {
+    str: encode_basestring,
+    int: int.__repr__,
+    float: _encode_float,
+    bool: lambda value: "true" if value else "false",
+    type(None): lambda value: "null",
+    list: _encode_sequence,
+    tuple: _encode_sequence,
+}
+
+_ANSWER_ENCODERS = {
+    str: lambda value: '[{"valueString":' + encode_basestring(value) + "}]" if value else "[]",
+    int: lambda value: '[{"valueInteger":' + int.__repr__(value) + "}]",
+    float: lambda value: '[{"valueDecimal":' + _encode_float(value) + "}]",
+    type(None): lambda value: "[]",
+}
+
+
+# -----------------------------
+# DOCUMENTS
+# -----------------------------
+def generated_timestamp():
+    """ISO 8601 UTC timestamp (second resolution) for the documents of one export."""
+    return datetime.now(timezone.utc).isoformat(timespec="seconds")
+
+
+def serialize_document(result, user_inputs, document_format="summary", generated=None, record_id=None):
+    """
+    One structured clinical summary as JSON text.
+
+    Args:
+        result: dict - Result from decision_engine.analyze_pcos_signals()
+        user_inputs: dict - The answers the result was scored from
+        document_format: str - "summary" or "fhir"
+        generated: str (optional) - Timestamp (default: now, see generated_timestamp())
+        record_id: str (optional) - Record identifier (default: a random UUID)
+
+    Returns:
+        str: JSON document on one line
+    """
+    return compiled_skeleton(document_format).serialize(
+        _encoded_outcome(_outcome_values(result)),
+        tuple(map(user_inputs.get, RESPONSE_FIELDS)),
+        encode_basestring(generated or generated_timestamp()),
+        _encode_value(record_id or uuid.uuid4().hex),
+    )
+
+
+def build_document(result, user_inputs, document_format="summary", generated=None, record_id=None):
+    """
+    The same document as serialize_document(), as Python objects (built by
+    walking the skeleton, so it is slower; meant for display and checks).
+
+    Returns:
+        dict: Structured clinical summary
+    """
+    values = {
+        "outcome": _outcome_values(result),
+        "meta": {"generated": generated or generated_timestamp(), "record_id": record_id or uuid.uuid4().hex},
+        "response": tuple(map(user_inputs.get, RESPONSE_FIELDS)),
+    }
+    values["answer"] = values["response"]
+    return _fill(compiled_skeleton(document_format).skeleton, values)
+
+
+def _fill(node, values):
+    if isinstance(node, _Slot):
+        value = values[node.kind][node.key]
+        if node.kind == "answer":
+            return _answer_list(value)
+        if node.kind == "response" and value == "":
+            return None
+        return list(value) if isinstance(value, tuple) else value
+    if isinstance(node, dict):
+        return {key: _fill(value, values) for key, value in node.items()}
+    if isinstance(node, list):
+        return [_fill(value, values) for value in node]
+    return node
+
+
+def document_bytes(result, user_inputs, document_format="fhir"):
+    """UTF-8 JSON bytes of one document, e.g. for st.download_button."""
+    return serialize_document(result, user_inputs, document_format).encode("utf-8")
+
+
+def serialize_batch(results, user_inputs_list, document_format="summary", record_ids=None, generated=None):
+    """
+    Newline-delimited JSON (NDJSON) for many assessments, one document per line.
+
+    Args:
+        results: iterable of dict - Results from decision_engine.analyze_pcos_signals()
+        user_inputs_list: iterable of dict - The inputs for each result, in the same order
+        document_format: str - "summary" or "fhir"
+        record_ids: iterable of str (optional) - One identifier per record (default: random UUIDs)
+        generated: str (optional) - Timestamp shared by the batch (default: now)
+
+    Returns:
+        str: NDJSON text ending in a newline (empty for no records)
+    """
+    serialize = compiled_skeleton(document_format).serialize
+    generated = encode_basestring(generated or generated_timestamp())
+    if record_ids is None:
+        record_ids = iter(lambda: uuid.uuid4().hex, None)
+
+    lines = [
+        serialize(
+            _encoded_outcome(_outcome_values(result)),
+            tuple(map(user_inputs.get, RESPONSE_FIELDS)),
+            generated,
+            _encode_value(record_id),
+        )
+        for result, user_inputs, record_id in zip(results, user_inputs_list, record_ids)
+    ]
+    lines.append("")
+    return "\n".join(lines)
+
+
+# -----------------------------
+# WORKER
+# -----------------------------
+def export_chunk(task):
+    """
+    Score one chunk of raw input lines and serialize its documents (runs in a worker process).
+
+    Args:
+        task: tuple - (first_row, lines, input_format, header, document_format, id_column, generated)
+
+    Returns:
+        tuple: (number of records, NDJSON bytes)
+    """
+    first_row, lines, input_format, header, document_format, id_column, generated = task
+    n_rows, columns = parse_columns(lines, input_format, header)
+    batch = analyze_pcos_signals_batch(columns)
+
+    records = (
+        {name: None if values[i] == "" else values[i] for name, values in columns.items()}
+        for i in range(n_rows)
+    )
+    ids = columns.get(id_column) if id_column else None
+    record_ids = (
+        str(ids[i]) if ids and ids[i] not in (None, "") else str(first_row + i + 1)
+        for i in range(n_rows)
+    )
+    payload = serialize_batch(
+        (batch_result_row(batch, i) for i in range(n_rows)), records, document_format, record_ids, generated
+    )
+    return n_rows, payload.encode("utf-8")
+
+
+# -----------------------------
+# DRIVER
+# -----------------------------
+def export_documents(input_path, output, document_format="summary", workers=None,
+                     chunk_size=DEFAULT_CHUNK_SIZE, id_column=None, input_format=None,
+                     progress=None):
+    """
+    Write one structured clinical summary per input record as NDJSON.
+
+    Args:
+        input_path: str - CSV or JSONL questionnaire records
+        output: str or binary stream - Output path, or any object with write(bytes)
+        document_format: str - "summary" or "fhir"
+        workers: int (optional) - Worker processes (default: CPU count; 1 = in-process)
+        chunk_size: int - Records per chunk
+        id_column: str (optional) - Input column used as the record id (default: row number)
+        input_format: str (optional) - "csv" or "jsonl" (default: from extension)
+        progress: callable (optional) - Called with (documents done, documents/sec) after each chunk
+
+    Returns:
+        dict: {"documents": total written, "bytes": output size, "seconds": elapsed,
+               "documents_per_sec": throughput}
+    """
+    if document_format not in DOCUMENT_FORMATS:
+        raise ValueError(f"Unknown document format: {document_format}")
+    input_format = detect_format(input_path, input_format)
+    workers = workers or os.cpu_count() or 1
+
+    if isinstance(output, str):
+        with open(output, "wb") as out:
+            return _export(input_path, out, document_format, workers, chunk_size, id_column,
+                           input_format, progress)
+    return _export(input_path, output, document_format, workers, chunk_size, id_column,
+                   input_format, progress)
+
+
+def _export(input_path, out, document_format, workers, chunk_size, id_column, input_format, progress):
+    generated = generated_timestamp()
+    with open(input_path, "rb") as source:
+        header, data_offset = read_header(source, input_format)
+        tasks = (
+            (first_row, lines, input_format, header, document_format, id_column, generated)
+            for first_row, _, _, lines in iter_chunks(source, data_offset, chunk_size)
+        )
+
+        start = time.perf_counter()
+        done = 0
+        written = 0
+        for n_rows, payload in ordered_results(export_chunk, tasks, workers):
+            out.write(payload)
+            done += n_rows
+            written += len(payload)
+            if progress:
+                elapsed = time.perf_counter() - start
+                progress(done, done / elapsed if elapsed else 0.0)
+
+    elapsed = time.perf_counter() - start
+    return {
+        "documents": done,
+        "bytes": written,
+        "seconds": elapsed,
+        "documents_per_sec": done / elapsed if elapsed else 0.0,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Export structured PCOS clinical summaries as NDJSON")
+    parser.add_argument("input", help="CSV or JSONL input file")
+    parser.add_argument("output", help="NDJSON output file, or - for stdout")
+    parser.add_argument("--format", choices=DOCUMENT_FORMATS, default="summary", dest="document_format")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: CPU count)")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE, help="records per chunk")
+    parser.add_argument("--id-column", default=None, help="input column used as the record id")
+    parser.add_argument("--input-format", choices=["csv", "jsonl"], default=None)
+    args = parser.parse_args(argv)
+
+    output = sys.stdout.buffer if args.output == "-" else args.output
+
+    last_report = [0.0]
+
+    def progress(done, rate):
+        now = time.monotonic()
+        if now - last_report[0] >= 1.0:
+            last_report[0] = now
+            print(f"{done} documents exported ({rate:,.0f}/sec)", file=sys.stderr)
+
+    stats = export_documents(
+        args.input,
+        output,
+        document_format=args.document_format,
+        workers=args.workers,
+        chunk_size=args.chunk_size,
+        id_column=args.id_column,
+        input_format=args.input_format,
+        progress=progress
+    )
+    print(
+        f"Done: {stats['documents']} documents, {stats['bytes'] / 1024:,.0f} KiB "
+        f"in {stats['seconds']:.1f}s ({stats['documents_per_sec']:,.0f}/sec)",
+        file=sys.stderr
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,196 @@
+"""
+Counterfactual search over lifestyle-modifiable answers.
+
+Finds the smallest set of modifiable answers (sleep, stress, activity, diet,
+sugar cravings) whose improvement would lower a respondent's risk level or
+move them out of a PCOS subtype pattern. Only improvements are considered: an alternative
+answer qualifies when it lowers at least one signal and raises none, so every
+move makes the signal sums smaller. That monotonicity gives a cheap lower
+bound on the reachable risk score, which prunes whole branches of the search.
+The PCOS pattern is not monotone in the signals (lowering insulin can turn
+another pattern into Lean PCOS), so searches that may be satisfied by a
+pattern change enumerate every combination of a given size instead.
+"""
+
+import itertools
+import time
+
+from utils.answer_encoding import (
+    ANSWER_FIELDS,
+    CYCLE_LENGTH_INDEX,
+    FIELD_OPTIONS,
+    FIELD_WEIGHTS,
+    PERIODS_ABSENT_CODE,
+    encode_answers,
+    score_codes,
+)
+from utils.decision_engine import classify_signals
+from utils.sensitivity import FIELD_LABELS, RISK_LEVEL_ORDER, answer_label
+
+MODIFIABLE_FIELDS = (
+    "sleep_quality",
+    "stress_level",
+    "activity_level",
+    "diet_pattern",
+    "sugar_cravings",
+)
+
+# Default time budget per query, in seconds
+DEFAULT_TIME_BUDGET = 0.05
+
+GOALS = ("lower_risk", "change_type", "either")
+
+# Pattern classify_signals() reports when no subtype matches
+DEFAULT_PATTERN = classify_signals(0, 0, 0, 0, 0)["pcos_type"]
+
+
+def _improvements(field, code):
+    """Alternative codes for a field that raise no signal and lower at least one, best first."""
+    table = FIELD_WEIGHTS[field]
+    current = table[code]
+    options = []
+    for candidate in range(1, len(FIELD_OPTIONS[field])):
+        row = table[candidate]
+        if candidate != code and all(new <= old for new, old in zip(row, current)) and row != current:
+            options.append((sum(row) - sum(current), candidate, row))
+    options.sort()
+    return [(candidate, row) for _, candidate, row in options]
+
+
+def _risk_level_ceiling(total, level_rank):
+    """Highest score below total whose risk level ranks below level_rank (None if there is none)."""
+    ceiling = None
+    for lower_total in range(total):
+        level = classify_signals(lower_total, 0, 0, 0, 0)["risk_level"]
+        if RISK_LEVEL_ORDER.get(level, 0) >= level_rank:
+            break
+        ceiling = lower_total
+    return ceiling
+
+
+def find_counterfactuals(answers, goal="either", fields=MODIFIABLE_FIELDS, limit=3,
+                         time_budget=DEFAULT_TIME_BUDGET):
+    """
+    Smallest sets of modifiable answer improvements that reach the goal.
+
+    Args:
+        answers: dict - Health Check answers (same keys as analyze_pcos_signals arguments)
+        goal: str - "lower_risk" (lower risk level), "change_type" (any different PCOS
+            pattern) or "either" (lower risk level, or moving from a subtype to the default
+            "Low / Unclear" pattern; a change into a subtype never counts as an improvement)
+        fields: tuple - Fields the search may change (default: MODIFIABLE_FIELDS)
+        limit: int - Maximum number of solutions to return
+        time_budget: float - Seconds before the search stops and returns what it has
+
+    Returns:
+        dict: {
+            "solutions": list[dict] - Each with "changes" (list of dicts: field, label,
+                current_answer, new_answer, new_label), "risk_score", "risk_level" and
+                "pcos_type"; fewest changes first, then lowest risk score,
+            "complete": bool - False when the time budget ran out first,
+            "nodes": int - Search nodes visited,
+            "elapsed_ms": float
+        }
+
+    "lower_risk" searches, and "either" searches that start from the default pattern,
+    skip subsets that cannot reach a lower risk level (branch and bound). Other searches
+    are a plain enumeration of combinations, smallest first, within the time budget.
+    """
+    if goal not in GOALS:
+        raise ValueError(f"Unknown counterfactual goal: {goal}")
+    start = time.perf_counter()
+    deadline = start + time_budget
+
+    codes = encode_answers(answers)
+    base_signals = score_codes(codes)
+    periods_absent = codes[CYCLE_LENGTH_INDEX] == PERIODS_ABSENT_CODE
+    baseline = classify_signals(*base_signals, periods_absent=periods_absent)
+    base_type = baseline["pcos_type"]
+
+    wants_lower_risk = goal in ("lower_risk", "either")
+    # "either" only accepts pattern changes towards the default pattern, which
+    # cannot improve on a respondent who is already there
+    wants_new_type = goal == "change_type" or (goal == "either" and base_type != DEFAULT_PATTERN)
+    target_type = DEFAULT_PATTERN if goal == "either" else None
+    base_total = baseline["risk_score"]
+    ceiling = _risk_level_ceiling(base_total, RISK_LEVEL_ORDER.get(baseline["risk_level"], 0))
+    if not wants_new_type and ceiling is None:
+        return _search_result([], True, 0, start)
+
+    # Per field: current weight row and improving alternatives (best reduction first)
+    candidates = []
+    for field in fields:
+        index = ANSWER_FIELDS.index(field)
+        options = _improvements(field, codes[index])
+        if options:
+            current_row = FIELD_WEIGHTS[field][codes[index]]
+            best_reduction = sum(current_row) - sum(options[0][1])
+            candidates.append((field, current_row, options, best_reduction))
+
+    solutions = []
+    nodes = 0
+    complete = True
+
+    for size in range(1, len(candidates) + 1):
+        for subset in itertools.combinations(candidates, size):
+            # Bound: even the largest reduction on every chosen field cannot reach
+            # a lower risk level, and the pattern cannot be the goal either
+            if not wants_new_type:
+                if base_total - sum(entry[3] for entry in subset) > ceiling:
+                    continue
+
+            for choice in itertools.product(*(entry[2] for entry in subset)):
+                nodes += 1
+                if nodes & 63 == 0 and time.perf_counter() > deadline:
+                    complete = False
+                    break
+
+                signals = list(base_signals)
+                for (field, current_row, _, _), (_, row) in zip(subset, choice):
+                    for k in range(len(signals)):
+                        signals[k] += row[k] - current_row[k]
+
+                total = sum(signals)
+                lowers_risk = ceiling is not None and total <= ceiling
+                if not wants_new_type and not lowers_risk:
+                    continue
+                outcome = classify_signals(*signals, periods_absent=periods_absent)
+                new_type = outcome["pcos_type"] != base_type and target_type in (None, outcome["pcos_type"])
+                if (wants_lower_risk and lowers_risk) or (wants_new_type and new_type):
+                    solutions.append(_solution(answers, subset, choice, outcome))
+
+            if not complete:
+                break
+
+        if solutions or not complete:
+            break
+
+    solutions.sort(key=lambda solution: solution["risk_score"])
+    return _search_result(solutions[:limit], complete, nodes, start)
+
+
+def _solution(answers, subset, choice, outcome):
+    return {
+        "changes": [
+            {
+                "field": field,
+                "label": FIELD_LABELS[field],
+                "current_answer": answers.get(field),
+                "new_answer": FIELD_OPTIONS[field][code],
+                "new_label": answer_label(field, code),
+            }
+            for (field, _, _, _), (code, _) in zip(subset, choice)
+        ],
+        "risk_score": outcome["risk_score"],
+        "risk_level": outcome["risk_level"],
+        "pcos_type": outcome["pcos_type"],
+    }
+
+
+def _search_result(solutions, complete, nodes, start):
+    return {
+        "solutions": solutions,
+        "complete": complete,
+        "nodes": nodes,
+        "elapsed_ms": (time.perf_counter() - start) * 1000,
+    }
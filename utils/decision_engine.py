@@ -1,3 +1,32 @@
+import hashlib
+import inspect
+import json
+import logging
+import os
+
+from utils import answer_encoding
+from utils.answer_encoding import (
+    CYCLE_LENGTH_INDEX,
+    PERIODS_ABSENT_CODE,
+    encode_answers,
+    score_codes,
+)
+
+logger = logging.getLogger(__name__)
+
+# Environment variable selecting the scoring engine: "rules" (default), "lookup" or "compiled"
+ENGINE_MODE_ENV = "PCOS_ENGINE_MODE"
+
+# Optional ML model directory (see utils/ml_model.py); no model, no ML output
+ML_MODEL_ENV = "PCOS_ML_MODEL_PATH"
+DEFAULT_ML_MODEL_PATH = "model/pcos_model"
+
+_ML_MODEL_UNLOADED = object()
+_ml_model = _ML_MODEL_UNLOADED
+
+_rules_fingerprint = None
+
+
 def analyze_pcos_signals(
     cycle_length,
     period_pain,
@@ -39,95 +68,191 @@ def analyze_pcos_signals(
         family_history: str (optional) - Family history of PCOS/PCOD
     
     Returns:
-        dict: Analysis results including risk level, PCOS type, signals, and doctor recommendation
+        dict: Analysis results including risk level, PCOS type, signals, doctor recommendation
+            and the rule_version that produced them
     """
 
     # -----------------------------
     # SIGNAL SCORES
     # -----------------------------
-    cycle_signal = 0
-    stress_signal = 0
-    insulin_signal = 0
-    androgen_signal = 0
-    inflammation_signal = 0
-
-    # Cycle irregularity
-    if cycle_length == "Irregular (varies frequently)":
-        cycle_signal += 2
-    elif cycle_length == "Absent for months" or cycle_length == "Absent or very irregular":
-        cycle_signal += 3
-    
-    # Missed periods
-    if missed_periods:
-        if missed_periods == "Frequently" or "three" in missed_periods.lower() or "more" in missed_periods.lower():
-            cycle_signal += 2
-        elif missed_periods == "Occasionally" or "once" in missed_periods.lower() or "twice" in missed_periods.lower():
-            cycle_signal += 1
-
-    # Stress & adrenal
-    if isinstance(stress_level, (int, float)):
-        if stress_level >= 7:
-            stress_signal += 4
-        elif stress_level >= 4:
-            stress_signal += 2
-
-    if sleep_quality == "Disturbed":
-        stress_signal += 1
-    elif sleep_quality == "Insomnia / very poor" or sleep_quality == "Poor/Insomnia":
-        stress_signal += 2
-
-    if mood_changes == "Frequently":
-        stress_signal += 2
-    
-    if anxiety:
-        if anxiety == "Frequently":
-            stress_signal += 2
-        elif anxiety == "Occasionally":
-            stress_signal += 1
-
-    # Insulin resistance
-    if sugar_cravings == "Frequently":
-        insulin_signal += 3
-    elif sugar_cravings == "Occasionally":
-        insulin_signal += 1
-
-    if weight_change in ["Weight gain", "Fluctuates"]:
-        insulin_signal += 2
-    
-    if diet_pattern:
-        if "High sugar" in diet_pattern or "processed" in diet_pattern.lower():
-            insulin_signal += 1
-    
-    if activity_level:
-        if activity_level == "Sedentary":
-            insulin_signal += 1
-
-    # Androgen excess
-    if facial_hair == "Noticeable" or facial_hair == "Significant":
-        androgen_signal += 3
-    elif facial_hair == "Mild":
-        androgen_signal += 1
-    
-    if acne:
-        if acne == "Severe" or acne == "Moderate":
-            androgen_signal += 2
-        elif acne == "Mild":
-            androgen_signal += 1
-    
-    if hair_loss:
-        if hair_loss == "Noticeable":
-            androgen_signal += 2
-        elif hair_loss == "Mild":
-            androgen_signal += 1
-
-    # Inflammation
-    if period_pain == "Often" or period_pain == "Frequently":
-        inflammation_signal += 2
-    elif period_pain == "Sometimes" or period_pain == "Occasionally":
-        inflammation_signal += 1
-
-    if sleep_quality != "Good":
-        inflammation_signal += 1
+    # Answers are encoded once; the per-answer weights live in
+    # answer_encoding.ANSWER_OPTIONS rather than in branches here.
+    codes = encode_answers({
+        "cycle_length": cycle_length,
+        "missed_periods": missed_periods,
+        "period_pain": period_pain,
+        "stress_level": stress_level,
+        "sleep_quality": sleep_quality,
+        "mood_changes": mood_changes,
+        "anxiety": anxiety,
+        "sugar_cravings": sugar_cravings,
+        "weight_change": weight_change,
+        "diet_pattern": diet_pattern,
+        "activity_level": activity_level,
+        "facial_hair": facial_hair,
+        "acne": acne,
+        "hair_loss": hair_loss
+    })
+
+    return analyze_encoded_answers(codes)
+
+
+def analyze_encoded_answers(codes, signals=None):
+    """
+    Score answers that are already encoded with answer_encoding.encode_answers().
+    
+    Args:
+        codes: tuple - Answer codes in answer_encoding.ANSWER_FIELDS order
+        signals: tuple (optional) - Their five signal scores, when the caller keeps
+            them up to date itself (see utils/scoring_session.py)
+    
+    Returns:
+        dict: Same result as analyze_pcos_signals()
+    """
+    (
+        cycle_signal,
+        stress_signal,
+        insulin_signal,
+        androgen_signal,
+        inflammation_signal
+    ) = signals if signals is not None else score_codes(codes)
+
+    periods_absent = codes[CYCLE_LENGTH_INDEX] == PERIODS_ABSENT_CODE
+
+    classification = classify_signals(
+        cycle_signal,
+        stress_signal,
+        insulin_signal,
+        androgen_signal,
+        inflammation_signal,
+        periods_absent
+    )
+
+    result = {
+        "pcos_type": classification["pcos_type"],
+        "explanation": classification["explanation"],
+        "risk_score": classification["risk_score"],
+        "risk_level": classification["risk_level"],
+        "confidence": classification["confidence"],
+        "signals": {
+            "cycle": cycle_signal,
+            "stress": stress_signal,
+            "insulin": insulin_signal,
+            "androgen": androgen_signal,
+            "inflammation": inflammation_signal
+        },
+        "doctor_needed": classification["doctor_needed"],
+        "doctor_reasons": classification["doctor_reasons"],
+        "rule_version": rules_fingerprint()
+    }
+
+    # -----------------------------
+    # ML MODEL HOOK
+    # -----------------------------
+    # Reported alongside the rule-based confidence, never instead of it
+    model = get_ml_model()
+    if model is not None:
+        probability = model.predict_codes(
+            codes,
+            (cycle_signal, stress_signal, insulin_signal, androgen_signal, inflammation_signal)
+        )
+        result["ml_probability"] = round(probability * 100, 1)
+
+    return result
+
+
+def rules_fingerprint():
+    """
+    Rule version of this module's results: a hash of everything between the
+    answers and the result - the whole answer_encoding module (weights, stress
+    bands, free-text keywords, encoding and signal scoring) and the sources of
+    analyze_pcos_signals(), analyze_encoded_answers() and classify_signals().
+    Any change there re-versions the rules, so cached and stored results carrying
+    another version are stale.
+    
+    Returns:
+        str: 16 hex digits
+    """
+    global _rules_fingerprint
+    if _rules_fingerprint is None:
+        payload = json.dumps(
+            {
+                "answer_encoding": inspect.getsource(answer_encoding),
+                "analyze": inspect.getsource(analyze_pcos_signals),
+                "analyze_encoded": inspect.getsource(analyze_encoded_answers),
+                "classify": inspect.getsource(classify_signals),
+            },
+            sort_keys=True,
+            ensure_ascii=False
+        )
+        _rules_fingerprint = hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+    return _rules_fingerprint
+
+
+def current_rule_version(mode=None):
+    """
+    Rule version the configured scoring engine tags its results with.
+    
+    Args:
+        mode: str (optional) - Engine mode, as for get_scoring_engine()
+    
+    Returns:
+        str: rules_fingerprint() for "rules" and "lookup", the spec fingerprint for "compiled"
+    """
+    mode = mode or os.environ.get(ENGINE_MODE_ENV, "rules")
+    if mode == "compiled":
+        from utils.rule_spec import get_active_rules
+        return get_active_rules().fingerprint
+    if mode in ("rules", "lookup"):
+        return rules_fingerprint()
+    raise ValueError(f"Unknown scoring engine mode: {mode}")
+
+
+def get_ml_model():
+    """
+    The process-wide ML model, loaded on first use.
+    
+    Returns:
+        ml_model.PCOSModel or None: None when no model directory is installed
+            (NumPy is only imported once a model is found)
+    """
+    global _ml_model
+    if _ml_model is _ML_MODEL_UNLOADED:
+        path = os.environ.get(ML_MODEL_ENV, DEFAULT_ML_MODEL_PATH)
+        model = None
+        if os.path.isdir(path):
+            from utils.ml_model import ModelError, load_model
+            try:
+                model = load_model(path)
+            except ModelError as e:
+                logger.warning("ML model disabled: %s", e)
+        _ml_model = model
+    return _ml_model
+
+
+def classify_signals(
+    cycle_signal,
+    stress_signal,
+    insulin_signal,
+    androgen_signal,
+    inflammation_signal,
+    periods_absent=False
+):
+    """
+    Turn the five signal scores into a PCOS type, risk level and doctor recommendation.
+    Split out of analyze_pcos_signals so batch scoring can reuse the exact same rules.
+    
+    Args:
+        cycle_signal: int - Cycle irregularity score
+        stress_signal: int - Stress & adrenal score
+        insulin_signal: int - Metabolic/insulin score
+        androgen_signal: int - Androgen-related score
+        inflammation_signal: int - Inflammation score
+        periods_absent: bool - Whether periods have been absent for an extended time
+    
+    Returns:
+        dict: PCOS type, explanation, risk score/level, confidence and doctor recommendation
+    """
 
     # -----------------------------
     # PCOS TYPE DETECTION
@@ -210,7 +335,7 @@ def analyze_pcos_signals(
         doctor_reasons.append("strong metabolic indicators")
     
     # Absent periods for extended time
-    if cycle_length == "Absent for months" or cycle_length == "Absent or very irregular":
+    if periods_absent:
         if not doctor_needed:
             doctor_needed = True
         doctor_reasons.append("prolonged absence of periods")
@@ -221,30 +346,37 @@ def analyze_pcos_signals(
             doctor_needed = True
         doctor_reasons.append("significant androgen-related symptoms")
 
-    # -----------------------------
-    # ML MODEL HOOK (FUTURE USE)
-    # -----------------------------
-    """
-    def ml_predict(features):
-        # Placeholder for future ML model integration
-        # model = joblib.load("model/pcos_model.pkl")
-        # return model.predict_proba(features)
-        pass
-    """
-
     return {
         "pcos_type": pcos_type,
         "explanation": explanation,
         "risk_score": total_risk_score,
         "risk_level": risk_level,
         "confidence": confidence_score,
-        "signals": {
-            "cycle": cycle_signal,
-            "stress": stress_signal,
-            "insulin": insulin_signal,
-            "androgen": androgen_signal,
-            "inflammation": inflammation_signal
-        },
         "doctor_needed": doctor_needed,
         "doctor_reasons": doctor_reasons
     }
+
+
+def get_scoring_engine(mode=None):
+    """
+    Scoring function for the configured engine mode.
+    
+    Args:
+        mode: str (optional) - "rules", "lookup" or "compiled"; defaults to the PCOS_ENGINE_MODE
+            environment variable, then "rules"
+    
+    Returns:
+        callable: Takes the same keyword arguments as analyze_pcos_signals()
+    """
+    mode = mode or os.environ.get(ENGINE_MODE_ENV, "rules")
+    if mode == "rules":
+        return analyze_pcos_signals
+    if mode == "lookup":
+        # Imported lazily: the table module needs NumPy and this module must not
+        from utils.lookup_table import get_lookup_engine
+        return get_lookup_engine().analyze
+    if mode == "compiled":
+        # Rule spec file, compiled and hot-reloaded (see utils/rule_spec.py)
+        from utils.rule_spec import get_active_rules
+        return get_active_rules().analyze
+    raise ValueError(f"Unknown scoring engine mode: {mode}")
@@ -0,0 +1,436 @@
+"""
+Optional text generation backend for the AI Assistant.
+
+Free-text questions can be answered by a self-hosted model server instead of
+only the rule-based handlers. The server takes a POST of
+{"prompt": str, "max_tokens": int, "stream": true} and answers with
+newline-delimited JSON: one {"token": str} object per chunk of text,
+optionally ending with {"done": true}.
+
+Requests go over a small pool of keep-alive connections. Each request has a
+deadline that is checked before every socket read, and a read that stalls
+longer than the read timeout ends it, so a slow server costs a session at
+most about `timeout` seconds. After a failure the
+backend is skipped for RETRY_AFTER seconds. Identical prompts in flight at
+the same time share one request, and finished replies are cached for
+CACHE_TTL seconds. Callers fall back to the rule-based reply on
+GenerationError (see chat_engine.stream_reply()).
+
+Enable by pointing PCOS_GENERATION_URL at the server, e.g.
+http://127.0.0.1:8080/generate.
+
+Usage:
+    python -m utils.generation_backend ask PROMPT [--url URL]
+    python -m utils.generation_backend stub-server [--port N]
+"""
+
+import argparse
+import http.client
+import json
+import logging
+import os
+import queue
+import sys
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit
+
+logger = logging.getLogger(__name__)
+
+# Model server URL; the assistant stays rule-based when unset
+GENERATION_URL_ENV = "PCOS_GENERATION_URL"
+# Seconds a whole request may take (default DEFAULT_TIMEOUT)
+GENERATION_TIMEOUT_ENV = "PCOS_GENERATION_TIMEOUT"
+
+DEFAULT_TIMEOUT = 15.0
+# Longest wait for the connection, the first token or any later token
+DEFAULT_READ_TIMEOUT = 3.0
+DEFAULT_MAX_TOKENS = 400
+DEFAULT_POOL_SIZE = 4
+# Bytes asked for per socket read, and the longest reply line accepted
+READ_SIZE = 16384
+MAX_LINE_BYTES = 65536
+
+# Seconds the backend is skipped after a failed request
+RETRY_AFTER = 30.0
+
+CACHE_TTL = 600.0
+MAX_CACHED_REPLIES = 256
+
+# Errors from a kept-alive connection the server closed while idle; the request is retried once
+_STALE_CONNECTION_ERRORS = (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError)
+
+
+class GenerationError(RuntimeError):
+    """Raised when the backend is unavailable, too slow or returns an invalid reply."""
+
+
+class ReplyCache:
+    """Replies by prompt, dropped after ttl seconds or, least recently used first, beyond max_entries."""
+
+    def __init__(self, ttl=CACHE_TTL, max_entries=MAX_CACHED_REPLIES):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, prompt):
+        with self._lock:
+            entry = self._entries.get(prompt)
+            if entry is None:
+                return None
+            expires, text = entry
+            if expires <= time.monotonic():
+                del self._entries[prompt]
+                return None
+            self._entries.move_to_end(prompt)
+            return text
+
+    def put(self, prompt, text):
+        with self._lock:
+            self._entries[prompt] = (time.monotonic() + self.ttl, text)
+            self._entries.move_to_end(prompt)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+class ConnectionPool:
+    """Idle keep-alive connections to one host, most recently used first."""
+
+    def __init__(self, scheme, host, port, size=DEFAULT_POOL_SIZE):
+        self._connection_class = http.client.HTTPSConnection if scheme == "https" else http.client.HTTPConnection
+        self.host = host
+        self.port = port
+        self._idle = queue.LifoQueue(maxsize=size)
+
+    def acquire(self, timeout):
+        """(connection, reused) - an idle connection, or a new one if none is free."""
+        try:
+            connection = self._idle.get_nowait()
+        except queue.Empty:
+            return self._connection_class(self.host, self.port, timeout=timeout), False
+        connection.timeout = timeout
+        if connection.sock is not None:
+            connection.sock.settimeout(timeout)
+        return connection, True
+
+    def release(self, connection):
+        try:
+            self._idle.put_nowait(connection)
+        except queue.Full:
+            connection.close()
+
+    def close(self):
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                return
+
+
+class GenerationBackend:
+    """Client for a model server (see the module docstring for the protocol)."""
+
+    def __init__(self, url, timeout=DEFAULT_TIMEOUT, read_timeout=DEFAULT_READ_TIMEOUT,
+                 max_tokens=DEFAULT_MAX_TOKENS, pool_size=DEFAULT_POOL_SIZE, cache=None):
+        """
+        Args:
+            url: str - http(s) URL the prompts are POSTed to
+            timeout: float - Seconds a whole request may take
+            read_timeout: float - Seconds to wait for the connection and for each token
+            max_tokens: int - Reply length limit sent to the server
+            pool_size: int - Idle keep-alive connections kept
+            cache: ReplyCache (optional) - Reply cache (default: CACHE_TTL, MAX_CACHED_REPLIES)
+        """
+        parts = urlsplit(url)
+        if parts.scheme not in ("http", "https") or not parts.hostname:
+            raise ValueError(f"Unsupported generation URL: {url}")
+        self.url = url
+        self.timeout = timeout
+        self.read_timeout = read_timeout
+        self.max_tokens = max_tokens
+        self.cache = cache if cache is not None else ReplyCache()
+        self._path = (parts.path or "/") + (f"?{parts.query}" if parts.query else "")
+        self._pool = ConnectionPool(parts.scheme, parts.hostname, parts.port, size=pool_size)
+        self._inflight = {}
+        self._lock = threading.Lock()
+        self._down_until = 0.0
+
+    def __repr__(self):
+        return f"GenerationBackend({self.url!r})"
+
+    @property
+    def available(self):
+        """False while the backend is skipped after a failure."""
+        return time.monotonic() >= self._down_until
+
+    def generate(self, prompt):
+        """The whole reply to a prompt (raises GenerationError)."""
+        return "".join(self.stream(prompt))
+
+    def stream(self, prompt):
+        """
+        Yield the reply to a prompt in chunks as the server sends them.
+
+        A cached reply, or one another caller is already fetching, arrives
+        as a single chunk.
+
+        Raises:
+            GenerationError: If the backend is skipped, fails or misses its deadline
+        """
+        cached = self.cache.get(prompt)
+        if cached is not None:
+            yield cached
+            return
+        if not self.available:
+            raise GenerationError("Generation backend skipped after a recent failure")
+
+        with self._lock:
+            future = self._inflight.get(prompt)
+            leader = future is None
+            if leader:
+                future = self._inflight[prompt] = Future()
+
+        if not leader:
+            try:
+                yield future.result(timeout=self.timeout)
+            except FutureTimeoutError:
+                raise GenerationError("Timed out waiting for an identical request") from None
+            return
+
+        chunks = []
+        try:
+            for chunk in self._request(prompt):
+                chunks.append(chunk)
+                yield chunk
+            text = "".join(chunks)
+        except GeneratorExit:
+            # The consumer stopped early; waiters must not hang
+            future.set_exception(GenerationError("Request abandoned"))
+            raise
+        except Exception as error:
+            # Every failure marks the backend down and reaches callers as GenerationError
+            failure = error if isinstance(error, GenerationError) else GenerationError(
+                f"Request to {self.url} failed: {error!r}"
+            )
+            self._down_until = time.monotonic() + RETRY_AFTER
+            logger.warning("Generation backend %s failed: %s", self.url, failure)
+            future.set_exception(failure)
+            if failure is error:
+                raise
+            raise failure from error
+        except BaseException:
+            future.set_exception(GenerationError("Request abandoned"))
+            raise
+        else:
+            self.cache.put(prompt, text)
+            future.set_result(text)
+        finally:
+            with self._lock:
+                self._inflight.pop(prompt, None)
+
+    def _request(self, prompt):
+        deadline = time.monotonic() + self.timeout
+        body = json.dumps({"prompt": prompt, "max_tokens": self.max_tokens, "stream": True}).encode("utf-8")
+        headers = {"Content-Type": "application/json", "Accept": "application/x-ndjson"}
+
+        connection, response = self._send(body, headers, deadline)
+        finished = False
+        try:
+            for line in self._lines(connection, response, deadline):
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    message = json.loads(line)
+                except ValueError:
+                    raise GenerationError(f"Invalid reply line: {line[:80]!r}") from None
+                if not isinstance(message, dict):
+                    raise GenerationError(f"Invalid reply line: {line[:80]!r}")
+                if message.get("done"):
+                    # Drain the rest so the connection can be reused
+                    for _ in self._lines(connection, response, deadline):
+                        pass
+                    finished = True
+                    return
+                token = message.get("token")
+                if token is not None and not isinstance(token, str):
+                    raise GenerationError(f"Invalid token in reply: {token!r:.80}")
+                if token:
+                    yield token
+            finished = True
+        except (OSError, http.client.HTTPException) as error:
+            raise GenerationError(f"Reading the reply failed: {error}") from error
+        finally:
+            if finished and not response.will_close:
+                self._pool.release(connection)
+            else:
+                connection.close()
+
+    def _lines(self, connection, response, deadline):
+        """
+        Reply lines, read one socket read at a time with the deadline checked before
+        each read (readline() would keep waiting on a server that trickles bytes).
+        """
+        pending = b""
+        while True:
+            self._set_read_timeout(connection, deadline)
+            data = response.read1(READ_SIZE)
+            if not data:
+                if pending:
+                    yield pending
+                return
+            *lines, pending = (pending + data).split(b"\n")
+            if len(pending) > MAX_LINE_BYTES:
+                raise GenerationError(f"Reply line from {self.url} is longer than {MAX_LINE_BYTES} bytes")
+            yield from lines
+
+    def _send(self, body, headers, deadline):
+        for attempt in range(2):
+            connection, reused = self._pool.acquire(self._read_timeout(deadline))
+            try:
+                connection.request("POST", self._path, body=body, headers=headers)
+                response = connection.getresponse()
+            except _STALE_CONNECTION_ERRORS as error:
+                connection.close()
+                if reused and attempt == 0:
+                    continue
+                raise GenerationError(f"Connection to {self.url} failed: {error}") from error
+            except (OSError, http.client.HTTPException) as error:
+                connection.close()
+                raise GenerationError(f"Connection to {self.url} failed: {error}") from error
+
+            if response.status != 200:
+                response.read()
+                connection.close()
+                raise GenerationError(f"{self.url} returned HTTP {response.status}")
+            return connection, response
+        raise GenerationError(f"Connection to {self.url} failed")
+
+    def _read_timeout(self, deadline):
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            raise GenerationError(f"Reply from {self.url} took longer than {self.timeout}s")
+        return min(remaining, self.read_timeout)
+
+    def _set_read_timeout(self, connection, deadline):
+        if connection.sock is not None:
+            connection.sock.settimeout(self._read_timeout(deadline))
+
+    def close(self):
+        self._pool.close()
+
+
+_backend = None
+_backend_loaded = False
+_backend_lock = threading.Lock()
+
+
+def get_generation_backend():
+    """
+    The process-wide generation backend, or None when none is configured.
+
+    An invalid URL or timeout is logged and the assistant stays rule-based.
+    """
+    global _backend, _backend_loaded
+    if _backend_loaded:
+        return _backend
+    with _backend_lock:
+        if not _backend_loaded:
+            url = os.environ.get(GENERATION_URL_ENV)
+            if url:
+                try:
+                    timeout = float(os.environ.get(GENERATION_TIMEOUT_ENV, DEFAULT_TIMEOUT))
+                    _backend = GenerationBackend(url, timeout=timeout)
+                    logger.info("Generation backend %s enabled", url)
+                except ValueError as error:
+                    logger.error("Generation backend %s rejected (%s); assistant stays rule-based", url, error)
+            _backend_loaded = True
+    return _backend
+
+
+# -----------------------------
+# STAND-IN SERVER
+# -----------------------------
+class _StubHandler(BaseHTTPRequestHandler):
+    """Streams the prompt's last line back word by word, for trying the assistant without a model."""
+
+    protocol_version = "HTTP/1.1"
+    token_delay = 0.02
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        try:
+            prompt = json.loads(self.rfile.read(length))["prompt"]
+        except (ValueError, KeyError):
+            self.send_error(400)
+            return
+        words = f"(stand-in reply) You asked: {prompt.strip().splitlines()[-1]}".split(" ")
+
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-ndjson")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        try:
+            for i, word in enumerate(words):
+                self._chunk(json.dumps({"token": word if i == 0 else " " + word}) + "\n")
+                time.sleep(self.token_delay)
+            self._chunk(json.dumps({"done": True}) + "\n")
+            self.wfile.write(b"0\r\n\r\n")
+        except (BrokenPipeError, ConnectionResetError):
+            # The client gave up (deadline or abandoned stream)
+            self.close_connection = True
+
+    def _chunk(self, text):
+        data = text.encode("utf-8")
+        self.wfile.write(f"{len(data):x}\r\n".encode("ascii") + data + b"\r\n")
+        self.wfile.flush()
+
+    def log_message(self, format, *args):
+        pass
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="AI Assistant generation backend")
+    parser.add_argument("command", choices=["ask", "stub-server"])
+    parser.add_argument("prompt", nargs="?", help="ask: prompt to send")
+    parser.add_argument("--url", default=os.environ.get(GENERATION_URL_ENV, "http://127.0.0.1:8080/generate"))
+    parser.add_argument("--port", type=int, default=8080, help="stub-server: port to listen on")
+    parser.add_argument("--timeout", type=float, default=DEFAULT_TIMEOUT)
+    args = parser.parse_args(argv)
+
+    if args.command == "stub-server":
+        server = ThreadingHTTPServer(("127.0.0.1", args.port), _StubHandler)
+        print(f"Stand-in generation server on http://127.0.0.1:{args.port}/generate", file=sys.stderr)
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        return 0
+
+    if not args.prompt:
+        parser.error("ask needs a prompt")
+    backend = GenerationBackend(args.url, timeout=args.timeout)
+    start = time.perf_counter()
+    try:
+        for chunk in backend.stream(args.prompt):
+            print(chunk, end="", flush=True)
+    except GenerationError as error:
+        print(f"\nFailed: {error}", file=sys.stderr)
+        return 1
+    print(f"\n({time.perf_counter() - start:.2f}s)", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
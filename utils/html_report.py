@@ -0,0 +1,305 @@
+"""
+HTML report output with inline SVG signal charts.
+
+Charts are drawn straight from the five signal scores, without a plotting
+library. Every piece that depends on a single score is precomputed once per
+process: one bar-chart row per (signal, score) and one radar vertex per
+(signal, score), on top of fixed chart backgrounds. Drawing a chart is then a
+join of cached fragments, and a report is the cached stylesheet, the charts,
+the report body converted to HTML and the cached disclaimer section.
+"""
+
+import html
+import math
+from functools import lru_cache
+
+from utils.report_generator import (
+    DEFAULT_LOCALE,
+    REPORT_KINDS,
+    generate_summaries_batch,
+    report_footers,
+    report_titles,
+)
+
+HTML_CONTENT_TYPE = "text/html"
+
+# Scores are shown out of 10, as in the text reports
+MAX_SIGNAL_SCORE = 10
+
+# (signal, label, color), in chart order; colors match the Dashboard
+SIGNAL_CHART_ROWS = (
+    ("cycle", "Cycle Irregularity", "#D9469F"),
+    ("stress", "Stress & Adrenal", "#C77A9E"),
+    ("insulin", "Metabolic/Insulin", "#9B7EDE"),
+    ("androgen", "Androgen-Related", "#8B4A6B"),
+    ("inflammation", "Inflammation", "#D9469F"),
+)
+
+STYLESHEET = """<style>
+body { margin: 0; background: #FFF5F8; color: #2D1B3D; font: 15px/1.5 -apple-system, "Segoe UI", Roboto, sans-serif; }
+.report { max-width: 820px; margin: 24px auto; padding: 32px; background: #FFFFFF; border-radius: 12px; }
+.report header { border-bottom: 3px solid #D9469F; margin-bottom: 16px; }
+.report h1 { color: #8B4A6B; font-size: 22px; margin: 0 0 4px; }
+.report h2 { color: #D9469F; font-size: 15px; letter-spacing: 0.04em; border-bottom: 1px solid #E8D5F0; padding-bottom: 4px; margin: 24px 0 8px; }
+.report p { margin: 4px 0; }
+.report ul { margin: 4px 0; padding-left: 22px; }
+.report .generated, .report .note { color: #6B5B7B; font-size: 13px; }
+.report .note { padding-left: 16px; }
+.report .charts { display: flex; flex-wrap: wrap; gap: 16px; align-items: center; }
+.report .charts svg { max-width: 100%; height: auto; }
+.report .disclaimer { margin-top: 24px; padding: 8px 20px 16px; background: #F8E8F0; border-radius: 12px; }
+</style>"""
+
+_THICK_RULE = "═"
+_THIN_RULE = "─"
+
+# -----------------------------
+# BAR CHART
+# -----------------------------
+_BAR_LABEL_WIDTH = 160
+_BAR_TRACK_WIDTH = 280
+_BAR_ROW_HEIGHT = 34
+_BAR_WIDTH = _BAR_LABEL_WIDTH + _BAR_TRACK_WIDTH + 60
+
+_BAR_CHART_OPEN = (
+    f'<svg class="signal-bars" xmlns="http://www.w3.org/2000/svg" width="{_BAR_WIDTH}" '
+    f'height="{_BAR_ROW_HEIGHT * len(SIGNAL_CHART_ROWS)}" viewBox="0 0 {_BAR_WIDTH} '
+    f'{_BAR_ROW_HEIGHT * len(SIGNAL_CHART_ROWS)}" role="img" aria-label="Signal scores">'
+    '<g font-family="sans-serif" font-size="13" fill="#2D1B3D">'
+)
+_BAR_CHART_CLOSE = "</g></svg>"
+
+
+def _bar_row(index, value):
+    _, label, color = SIGNAL_CHART_ROWS[index]
+    y = index * _BAR_ROW_HEIGHT
+    filled = _BAR_TRACK_WIDTH * min(max(value, 0), MAX_SIGNAL_SCORE) / MAX_SIGNAL_SCORE
+    return (
+        f'<text x="0" y="{y + 21}">{html.escape(label)}</text>'
+        f'<rect x="{_BAR_LABEL_WIDTH}" y="{y + 9}" width="{_BAR_TRACK_WIDTH}" height="16" rx="8" fill="#E8D5F0"/>'
+        f'<rect x="{_BAR_LABEL_WIDTH}" y="{y + 9}" width="{filled:.1f}" height="16" rx="8" fill="{color}"/>'
+        f'<text x="{_BAR_LABEL_WIDTH + _BAR_TRACK_WIDTH + 10}" y="{y + 21}">{value}/{MAX_SIGNAL_SCORE}</text>'
+    )
+
+
+# _BAR_ROWS[signal index][score] -> row fragment
+_BAR_ROWS = tuple(
+    tuple(_bar_row(index, value) for value in range(MAX_SIGNAL_SCORE + 1))
+    for index in range(len(SIGNAL_CHART_ROWS))
+)
+
+
+def signal_bar_chart_svg(signals):
+    """
+    Horizontal bar chart of the five signal scores.
+
+    Args:
+        signals: dict - "signals" from an analyze_pcos_signals() result
+
+    Returns:
+        str: Inline <svg> element
+    """
+    parts = [_BAR_CHART_OPEN]
+    for index, (key, _, _) in enumerate(SIGNAL_CHART_ROWS):
+        value = signals.get(key, 0)
+        rows = _BAR_ROWS[index]
+        parts.append(rows[value] if type(value) is int and 0 <= value <= MAX_SIGNAL_SCORE else _bar_row(index, value))
+    parts.append(_BAR_CHART_CLOSE)
+    return "".join(parts)
+
+
+# -----------------------------
+# RADAR CHART
+# -----------------------------
+_RADAR_SIZE = 340
+_RADAR_CENTER = _RADAR_SIZE / 2
+_RADAR_RADIUS = 95
+
+
+def _radar_xy(index, value, radius=_RADAR_RADIUS):
+    angle = -math.pi / 2 + 2 * math.pi * index / len(SIGNAL_CHART_ROWS)
+    scale = radius * min(max(value, 0), MAX_SIGNAL_SCORE) / MAX_SIGNAL_SCORE
+    return _RADAR_CENTER + scale * math.cos(angle), _RADAR_CENTER + scale * math.sin(angle)
+
+
+def _radar_point(index, value):
+    x, y = _radar_xy(index, value)
+    return f"{x:.1f},{y:.1f}"
+
+
+def _radar_background():
+    count = len(SIGNAL_CHART_ROWS)
+    parts = [
+        f'<svg class="signal-radar" xmlns="http://www.w3.org/2000/svg" width="{_RADAR_SIZE}" '
+        f'height="{_RADAR_SIZE}" viewBox="0 0 {_RADAR_SIZE} {_RADAR_SIZE}" role="img" '
+        'aria-label="Signal profile"><g font-family="sans-serif" font-size="11" fill="#2D1B3D">'
+    ]
+    for level in range(2, MAX_SIGNAL_SCORE + 1, 2):
+        points = " ".join(_radar_point(index, level) for index in range(count))
+        parts.append(f'<polygon points="{points}" fill="none" stroke="#E8D5F0"/>')
+    for index, (_, label, _) in enumerate(SIGNAL_CHART_ROWS):
+        x, y = _radar_xy(index, MAX_SIGNAL_SCORE)
+        parts.append(
+            f'<line x1="{_RADAR_CENTER}" y1="{_RADAR_CENTER}" x2="{x:.1f}" y2="{y:.1f}" stroke="#E8D5F0"/>'
+        )
+        x, y = _radar_xy(index, MAX_SIGNAL_SCORE, _RADAR_RADIUS + 22)
+        parts.append(f'<text x="{x:.1f}" y="{y + 4:.1f}" text-anchor="middle">{html.escape(label)}</text>')
+    parts.append('<polygon points="')
+    return "".join(parts)
+
+
+_RADAR_OPEN = _radar_background()
+_RADAR_CLOSE = '" fill="#D9469F" fill-opacity="0.35" stroke="#D9469F" stroke-width="2"/></g></svg>'
+
+# _RADAR_POINTS[signal index][score] -> "x,y"
+_RADAR_POINTS = tuple(
+    tuple(_radar_point(index, value) for value in range(MAX_SIGNAL_SCORE + 1))
+    for index in range(len(SIGNAL_CHART_ROWS))
+)
+
+
+def signal_radar_svg(signals):
+    """
+    Radar (spider) chart of the five signal scores.
+
+    Args:
+        signals: dict - "signals" from an analyze_pcos_signals() result
+
+    Returns:
+        str: Inline <svg> element
+    """
+    points = []
+    for index, (key, _, _) in enumerate(SIGNAL_CHART_ROWS):
+        value = signals.get(key, 0)
+        cached = _RADAR_POINTS[index]
+        points.append(
+            cached[value] if type(value) is int and 0 <= value <= MAX_SIGNAL_SCORE else _radar_point(index, value)
+        )
+    return "".join((_RADAR_OPEN, " ".join(points), _RADAR_CLOSE))
+
+
+# -----------------------------
+# REPORT BODY
+# -----------------------------
+def _text_to_html(lines):
+    """Convert report text lines (headings over rules, bullets, notes) to HTML."""
+    parts = []
+    in_list = False
+    count = len(lines)
+    for i, line in enumerate(lines):
+        stripped = line.strip()
+        if not stripped or line.startswith((_THICK_RULE, _THIN_RULE)):
+            if in_list and not stripped:
+                parts.append("</ul>")
+                in_list = False
+            continue
+        previous = lines[i - 1] if i else ""
+        following = lines[i + 1] if i + 1 < count else ""
+        if in_list and not stripped.startswith("•"):
+            parts.append("</ul>")
+            in_list = False
+
+        text = html.escape(stripped)
+        if following.startswith(_THIN_RULE) or (
+            previous.startswith(_THICK_RULE) and following.startswith(_THICK_RULE)
+        ):
+            parts.append(f"<h2>{text}</h2>")
+        elif stripped.startswith("•"):
+            if not in_list:
+                parts.append("<ul>")
+                in_list = True
+            parts.append(f"<li>{text[1:].lstrip()}</li>")
+        elif line.startswith("  "):
+            parts.append(f'<p class="note">{text}</p>')
+        else:
+            parts.append(f"<p>{text}</p>")
+    if in_list:
+        parts.append("</ul>")
+    return "".join(parts)
+
+
+@lru_cache(maxsize=None)
+def _static_sections(kind, locale):
+    """(document opening, disclaimer section and document close, report footer text) for one report kind."""
+    title = html.escape(report_titles(locale)[kind])
+    opening = (
+        f'<!DOCTYPE html><html lang="{locale}"><head><meta charset="utf-8">'
+        f'<meta name="viewport" content="width=device-width, initial-scale=1">'
+        f"<title>{title}</title>{STYLESHEET}</head>"
+        f'<body><main class="report"><header><h1>{title}</h1>'
+    )
+    footer = report_footers(locale)[kind]
+    footer_lines = footer.strip("\n").split("\n")
+    closing = f'<section class="disclaimer">{_text_to_html(footer_lines)}</section></main></body></html>'
+    return opening, closing, footer
+
+
+def report_to_html(text, kind, signals, locale=DEFAULT_LOCALE):
+    """
+    Render one report (as returned by report_generator) to a standalone HTML page.
+
+    Args:
+        text: str - The user report or doctor summary text
+        kind: str - "user_report" or "doctor_summary"
+        signals: dict - Signal scores for the charts
+        locale: str - Language of the report text (one of report_generator.LOCALES)
+
+    Returns:
+        str: HTML document
+    """
+    if kind not in REPORT_KINDS:
+        raise ValueError(f"Unknown report kind: {kind}")
+    opening, closing, footer = _static_sections(kind, locale)
+
+    has_footer = text.endswith(footer)
+    if has_footer:
+        text = text[:-len(footer)]
+    lines = text.split("\n")
+    # lines[0:4]: rule, title, "Generated: ...", rule
+    generated = html.escape(lines[2]) if len(lines) > 2 else ""
+
+    return "".join((
+        opening,
+        f'<p class="generated">{generated}</p></header>',
+        '<section class="charts">',
+        signal_bar_chart_svg(signals),
+        signal_radar_svg(signals),
+        "</section>",
+        _text_to_html(lines[4:]),
+        closing if has_footer else "</main></body></html>",
+    ))
+
+
+@lru_cache(maxsize=64)
+def _cached_html(text, kind, signal_items, locale):
+    return report_to_html(text, kind, dict(signal_items), locale).encode("utf-8")
+
+
+def summary_html(reports, kind):
+    """
+    UTF-8 HTML bytes for one report of a report_generator.generate_summary() result.
+
+    Memoized on the report text and signals, so Streamlit reruns reuse the document.
+    """
+    signals = reports.result_dict.get("signals", {})
+    return _cached_html(reports[kind], kind, tuple(sorted(signals.items())), reports.locale)
+
+
+def generate_html_batch(results, user_inputs_list, kind="doctor_summary", locale=DEFAULT_LOCALE):
+    """
+    Render one HTML report per result.
+
+    Args:
+        results: sequence of dict - Results from decision_engine.analyze_pcos_signals()
+        user_inputs_list: iterable of dict - The inputs for each result, in the same order
+        kind: str - "user_report" or "doctor_summary"
+        locale: str - Report language (one of report_generator.LOCALES)
+
+    Returns:
+        list[str]: One HTML document per result
+    """
+    reports = generate_summaries_batch(results, user_inputs_list, kinds=(kind,), locale=locale)
+    return [
+        report_to_html(report[kind], kind, result.get("signals", {}), locale)
+        for result, report in zip(results, reports)
+    ]
@@ -0,0 +1,402 @@
+"""
+Precomputed result table for the finite Health Check answer space.
+
+Every Health Check answer is one of a fixed set of options (or a 0-10 slider
+that falls into a stress band), so every possible assessment result can be
+enumerated once. Answers that score the same are folded into one class per
+field, the classes are laid out as a mixed-radix index, and each index points
+at one of roughly twenty thousand distinct outcomes. Scoring is then a sum of 14 offsets
+and two array reads.
+
+Usage:
+    python -m utils.lookup_table build [--path PATH]
+    python -m utils.lookup_table verify [--path PATH] [--sample N]
+    python -m utils.lookup_table bench [--path PATH] [--repeat N]
+"""
+
+import argparse
+import itertools
+import json
+import os
+import random
+import sys
+import time
+import zipfile
+
+import numpy as np
+
+from utils.answer_encoding import (
+    ANSWER_FIELDS,
+    CYCLE_LENGTH_INDEX,
+    FIELD_WEIGHTS,
+    PERIODS_ABSENT_CODE,
+    SIGNAL_NAMES,
+    decode_answer,
+    encode_answers,
+)
+from utils.decision_engine import analyze_pcos_signals, classify_signals, get_ml_model, rules_fingerprint
+
+DEFAULT_TABLE_PATH = "data/pcos_lookup_table.npz"
+
+TABLE_FORMAT_VERSION = 1
+
+
+# -----------------------------
+# ANSWER CLASSES
+# -----------------------------
+def _field_classes(field_index, field):
+    """
+    Group a field's answer codes by what they score.
+
+    Returns:
+        tuple: (class_of_code, class_weights, class_absent)
+    """
+    classes = {}
+    class_of_code = []
+    for code, weights in enumerate(FIELD_WEIGHTS[field]):
+        absent = field_index == CYCLE_LENGTH_INDEX and code == PERIODS_ABSENT_CODE
+        class_of_code.append(classes.setdefault((weights, absent), len(classes)))
+
+    class_weights = [weights for weights, _ in classes]
+    class_absent = [absent for _, absent in classes]
+    return class_of_code, class_weights, class_absent
+
+
+def _answer_space():
+    """Per-field answer classes and the mixed-radix strides that index them."""
+    fields = [_field_classes(i, field) for i, field in enumerate(ANSWER_FIELDS)]
+    radices = [len(class_weights) for _, class_weights, _ in fields]
+
+    strides = []
+    stride = 1
+    for radix in reversed(radices):
+        strides.append(stride)
+        stride *= radix
+    strides.reverse()
+
+    # Offset contributed by each answer code: class index * field stride
+    code_offsets = tuple(
+        tuple(class_index * field_stride for class_index in class_of_code)
+        for (class_of_code, _, _), field_stride in zip(fields, strides)
+    )
+    return fields, radices, code_offsets
+
+
+def table_fingerprint():
+    """Hash of the table format and the rules the table was built from."""
+    return f"{TABLE_FORMAT_VERSION}-{rules_fingerprint()}"
+
+
+# -----------------------------
+# BUILD
+# -----------------------------
+def build_table():
+    """
+    Enumerate the answer space and classify every distinct signal combination.
+
+    Returns:
+        dict: Arrays ready for np.savez (see LookupTableEngine for the layout)
+    """
+    fields, radices, _ = _answer_space()
+    n_entries = int(np.prod(radices))
+
+    # Broadcast each field's class weights along its own axis and sum
+    signals = np.zeros((len(SIGNAL_NAMES),) + tuple(radices), dtype=np.int16)
+    absent = np.zeros(tuple(radices), dtype=bool)
+    for axis, (_, class_weights, class_absent) in enumerate(fields):
+        shape = [1] * len(radices)
+        shape[axis] = radices[axis]
+        weights = np.array(class_weights, dtype=np.int16)
+        for signal_index in range(len(SIGNAL_NAMES)):
+            signals[signal_index] += weights[:, signal_index].reshape(shape)
+        absent |= np.array(class_absent, dtype=bool).reshape(shape)
+
+    signals = signals.reshape(len(SIGNAL_NAMES), n_entries)
+    absent = absent.reshape(n_entries)
+
+    keys = absent.astype(np.int64)
+    for row in signals:
+        keys = keys * (int(row.max()) + 1) + row
+
+    _, first_index, outcome_index = np.unique(keys, return_index=True, return_inverse=True)
+    if len(first_index) > np.iinfo(np.uint16).max:
+        raise ValueError("Too many distinct outcomes for a uint16 table")
+
+    pcos_types = []
+    risk_levels = []
+    reason_sets = []
+    outcome_type = []
+    outcome_risk = []
+    outcome_reasons = []
+    outcome_score = []
+    outcome_confidence = []
+    outcome_doctor = []
+    for row_index in first_index:
+        result = classify_signals(
+            *(int(value) for value in signals[:, row_index]),
+            periods_absent=bool(absent[row_index])
+        )
+        outcome_type.append(_intern(pcos_types, [result["pcos_type"], result["explanation"]]))
+        outcome_risk.append(_intern(risk_levels, result["risk_level"]))
+        outcome_reasons.append(_intern(reason_sets, result["doctor_reasons"]))
+        outcome_score.append(result["risk_score"])
+        outcome_confidence.append(result["confidence"])
+        outcome_doctor.append(result["doctor_needed"])
+
+    return {
+        "table": outcome_index.reshape(-1).astype(np.uint16),
+        "outcome_signals": signals[:, first_index].T.astype(np.uint8),
+        "outcome_score": np.array(outcome_score, dtype=np.uint8),
+        "outcome_confidence": np.array(outcome_confidence, dtype=np.float64),
+        "outcome_type": np.array(outcome_type, dtype=np.uint8),
+        "outcome_risk": np.array(outcome_risk, dtype=np.uint8),
+        "outcome_doctor": np.array(outcome_doctor, dtype=bool),
+        "outcome_reasons": np.array(outcome_reasons, dtype=np.uint8),
+        "radices": np.array(radices, dtype=np.int64),
+        "labels": np.array(json.dumps({
+            "fingerprint": table_fingerprint(),
+            "pcos_types": pcos_types,
+            "risk_levels": risk_levels,
+            "reason_sets": reason_sets,
+        })),
+    }
+
+
+def _intern(values, value):
+    """Index of value in values, appending it the first time it is seen."""
+    if value not in values:
+        values.append(value)
+    return values.index(value)
+
+
+def save_table(arrays, path=DEFAULT_TABLE_PATH):
+    """Write a built table atomically so readers never see a partial file."""
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        np.savez(f, **arrays)
+    os.replace(tmp_path, path)
+
+
+# -----------------------------
+# LOOKUP ENGINE
+# -----------------------------
+class LookupTableEngine:
+    """Constant-time scorer backed by a precomputed outcome table."""
+
+    def __init__(self, arrays):
+        labels = json.loads(str(arrays["labels"]))
+        if labels["fingerprint"] != table_fingerprint():
+            raise ValueError("Lookup table was built from different rules; rebuild it")
+
+        _, radices, code_offsets = _answer_space()
+        if list(arrays["radices"]) != radices:
+            raise ValueError("Lookup table layout does not match the answer encoding")
+
+        self.fingerprint = labels["fingerprint"]
+        self._code_offsets = code_offsets
+        self._table = arrays["table"]
+        self._outcomes = tuple(
+            _outcome_result(arrays, labels, i)
+            for i in range(len(arrays["outcome_type"]))
+        )
+
+    def __len__(self):
+        return len(self._table)
+
+    def lookup_codes(self, codes):
+        """
+        Score encoded answers with a single index computation.
+
+        Args:
+            codes: tuple - Answer codes in answer_encoding.ANSWER_FIELDS order
+
+        Returns:
+            dict: Same result as analyze_pcos_signals()
+        """
+        index = 0
+        for offsets, code in zip(self._code_offsets, codes):
+            index += offsets[code]
+        outcome = self._outcomes[self._table[index]]
+        result = dict(outcome)
+        result["signals"] = dict(outcome["signals"])
+        result["doctor_reasons"] = list(outcome["doctor_reasons"])
+
+        # The table holds the rule outcomes; the optional ML model is scored per call
+        model = get_ml_model()
+        if model is not None:
+            probability = model.predict_codes(codes, tuple(result["signals"].values()))
+            result["ml_probability"] = round(probability * 100, 1)
+        return result
+
+    def analyze(self, **answers):
+        """Drop-in replacement for analyze_pcos_signals()."""
+        return self.lookup_codes(encode_answers(answers))
+
+
+def _outcome_result(arrays, labels, outcome):
+    """Result dict for one outcome row (shared, never handed out directly)."""
+    pcos_type, explanation = labels["pcos_types"][int(arrays["outcome_type"][outcome])]
+    return {
+        "pcos_type": pcos_type,
+        "explanation": explanation,
+        "risk_score": int(arrays["outcome_score"][outcome]),
+        "risk_level": labels["risk_levels"][int(arrays["outcome_risk"][outcome])],
+        "confidence": float(arrays["outcome_confidence"][outcome]),
+        "signals": {
+            name: int(value)
+            for name, value in zip(SIGNAL_NAMES, arrays["outcome_signals"][outcome])
+        },
+        "doctor_needed": bool(arrays["outcome_doctor"][outcome]),
+        "doctor_reasons": tuple(labels["reason_sets"][int(arrays["outcome_reasons"][outcome])]),
+        "rule_version": rules_fingerprint(),
+    }
+
+
+def load_table(path=DEFAULT_TABLE_PATH):
+    """Load a table from disk."""
+    with np.load(path) as data:
+        return LookupTableEngine({name: data[name] for name in data.files})
+
+
+_ENGINE = None
+
+
+def get_lookup_engine(path=DEFAULT_TABLE_PATH):
+    """
+    Process-wide lookup engine. Loads the table from disk, or builds and saves
+    it when missing or built from different rules.
+    """
+    global _ENGINE
+    if _ENGINE is None:
+        try:
+            _ENGINE = load_table(path)
+        except (OSError, ValueError, KeyError, zipfile.BadZipFile):
+            arrays = build_table()
+            save_table(arrays, path)
+            _ENGINE = LookupTableEngine(arrays)
+    return _ENGINE
+
+
+# -----------------------------
+# VERIFICATION & BENCHMARK
+# -----------------------------
+def _class_representatives():
+    """One representative answer code per answer class of every field."""
+    fields, _, _ = _answer_space()
+    representatives = []
+    for class_of_code, class_weights, _ in fields:
+        first_code = {}
+        for code, class_index in enumerate(class_of_code):
+            first_code.setdefault(class_index, code)
+        representatives.append([first_code[i] for i in range(len(class_weights))])
+    return representatives
+
+
+def _decode_codes(codes):
+    return {field: decode_answer(field, code) for field, code in zip(ANSWER_FIELDS, codes)}
+
+
+def verify_table(engine, sample=None, seed=0):
+    """
+    Check the table against analyze_pcos_signals().
+
+    Args:
+        engine: LookupTableEngine
+        sample: int or None - Check this many random answer sets instead of
+            one answer set per table entry
+        seed: int - Random seed for sampling
+
+    Returns:
+        tuple: (checked count, list of mismatching answer dicts)
+    """
+    if sample:
+        rng = random.Random(seed)
+        answer_sets = (
+            tuple(rng.randrange(len(FIELD_WEIGHTS[field])) for field in ANSWER_FIELDS)
+            for _ in range(sample)
+        )
+    else:
+        answer_sets = itertools.product(*_class_representatives())
+
+    checked = 0
+    mismatches = []
+    for codes in answer_sets:
+        answers = _decode_codes(codes)
+        expected = analyze_pcos_signals(**answers)
+        if engine.analyze(**answers) != expected:
+            mismatches.append(answers)
+        checked += 1
+    return checked, mismatches
+
+
+def benchmark(engine, repeat=100000, seed=0):
+    """
+    Time the table path against the rule path on the same random answer sets.
+
+    Returns:
+        dict: Microseconds per call for each path
+    """
+    rng = random.Random(seed)
+    answer_sets = [
+        _decode_codes(tuple(rng.randrange(len(FIELD_WEIGHTS[field])) for field in ANSWER_FIELDS))
+        for _ in range(1000)
+    ]
+    code_sets = [encode_answers(answers) for answers in answer_sets]
+    rounds = max(1, repeat // len(answer_sets))
+
+    def timed(fn, inputs):
+        start = time.perf_counter()
+        for _ in range(rounds):
+            for item in inputs:
+                fn(item)
+        return (time.perf_counter() - start) / (rounds * len(inputs)) * 1e6
+
+    return {
+        "rules_us": timed(lambda answers: analyze_pcos_signals(**answers), answer_sets),
+        "lookup_us": timed(lambda answers: engine.analyze(**answers), answer_sets),
+        "lookup_codes_us": timed(engine.lookup_codes, code_sets),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="PCOS decision lookup table")
+    parser.add_argument("command", choices=["build", "verify", "bench"])
+    parser.add_argument("--path", default=DEFAULT_TABLE_PATH)
+    parser.add_argument("--sample", type=int, default=None,
+                        help="verify: check N random answer sets instead of every entry")
+    parser.add_argument("--repeat", type=int, default=100000,
+                        help="bench: number of scored assessments per path")
+    args = parser.parse_args(argv)
+
+    if args.command == "build":
+        start = time.perf_counter()
+        arrays = build_table()
+        save_table(arrays, args.path)
+        print(
+            f"Built {len(arrays['table'])} entries / {len(arrays['outcome_type'])} outcomes "
+            f"in {time.perf_counter() - start:.2f}s -> {args.path} "
+            f"({os.path.getsize(args.path) / 1024:.0f} KiB)"
+        )
+        return 0
+
+    engine = get_lookup_engine(args.path)
+
+    if args.command == "verify":
+        checked, mismatches = verify_table(engine, sample=args.sample)
+        for answers in mismatches[:10]:
+            print(f"MISMATCH: {answers}")
+        print(f"Checked {checked} answer sets, {len(mismatches)} mismatches")
+        return 1 if mismatches else 0
+
+    timings = benchmark(engine, repeat=args.repeat)
+    for name, value in timings.items():
+        print(f"{name:>16}: {value:.2f} µs/call")
+    print(f"{'speedup':>16}: {timings['rules_us'] / timings['lookup_codes_us']:.1f}x (encoded)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
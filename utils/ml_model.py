@@ -0,0 +1,474 @@
+"""
+Optional ML model for the PCOS decision engine.
+
+A model is a directory holding model.json (kind, feature names, scalar
+parameters) and one .npy file per parameter array. Arrays are memory-mapped,
+loaded once per process, and scored with plain NumPy, so no ML library is
+needed at runtime. Any trainer can export to this format with save_model().
+
+Features are one indicator per (field, answer code) pair in
+answer_encoding.ANSWER_FIELDS order, followed by the five signal scores.
+
+Supported kinds:
+    logistic - p = sigmoid(intercept + X @ coef)
+    stumps   - p = sigmoid(base_score + sum(left if x[feature] <= threshold else right))
+
+Usage:
+    python -m utils.ml_model fit DATA.csv --label COLUMN [--kind logistic|stumps] [--path DIR] [--holdout FRACTION]
+    python -m utils.ml_model bench [--path DIR] [--repeat N]
+"""
+
+import argparse
+import csv
+import json
+import math
+import os
+import sys
+import time
+
+import numpy as np
+
+from utils.answer_encoding import (
+    ANSWER_FIELDS,
+    FIELD_OPTIONS,
+    FIELD_WEIGHTS,
+    SIGNAL_NAMES,
+    encode_answers,
+    score_codes,
+)
+
+DEFAULT_MODEL_PATH = "model/pcos_model"
+MODEL_FILE = "model.json"
+MODEL_KINDS = {
+    "logistic": ("coef",),
+    "stumps": ("feature", "threshold", "left", "right"),
+}
+
+
+def _feature_layout():
+    offsets = []
+    names = []
+    for field in ANSWER_FIELDS:
+        offsets.append(len(names))
+        names.extend(f"{field}={option}" for option in FIELD_OPTIONS[field])
+    signal_offset = len(names)
+    names.extend(f"signal:{name}" for name in SIGNAL_NAMES)
+    return tuple(names), np.array(offsets, dtype=np.intp), signal_offset
+
+
+FEATURE_NAMES, _FIELD_OFFSETS, _SIGNAL_OFFSET = _feature_layout()
+_FIELD_OFFSET_LIST = _FIELD_OFFSETS.tolist()
+_SIGNAL_WEIGHTS = tuple(
+    np.asarray(FIELD_WEIGHTS[field], dtype=np.float64) for field in ANSWER_FIELDS
+)
+
+
+class ModelError(ValueError):
+    """Raised when a model directory is missing, malformed or built for other features."""
+
+
+def encode_features(codes):
+    """
+    Feature matrix for encoded answers.
+
+    Args:
+        codes: tuple or array - One row of answer codes (ANSWER_FIELDS order),
+            or an (n_rows, n_fields) array of them
+
+    Returns:
+        ndarray: (n_features,) for one row, (n_rows, n_features) for many
+    """
+    codes = np.asarray(codes, dtype=np.intp)
+    single = codes.ndim == 1
+    codes = np.atleast_2d(codes)
+
+    n_rows = len(codes)
+    features = np.zeros((n_rows, len(FEATURE_NAMES)), dtype=np.float64)
+    rows = np.arange(n_rows)[:, None]
+    features[rows, _FIELD_OFFSETS + codes] = 1.0
+
+    for j, weights in enumerate(_SIGNAL_WEIGHTS):
+        features[:, _SIGNAL_OFFSET:] += weights[codes[:, j]]
+
+    return features[0] if single else features
+
+
+# Largest possible score per signal, which bounds the single-row signal tables
+_MAX_SIGNALS = tuple(
+    int(sum(weights[:, k].max() for weights in _SIGNAL_WEIGHTS))
+    for k in range(len(SIGNAL_NAMES))
+)
+
+
+def _sigmoid(logit):
+    """Logistic function; math.exp() only sees non-positive arguments, so it cannot overflow."""
+    if logit >= 0:
+        return 1.0 / (1.0 + math.exp(-logit))
+    z = math.exp(logit)
+    return z / (1.0 + z)
+
+
+class PCOSModel:
+    """A loaded model; arrays are read-only memory maps."""
+
+    __slots__ = ("kind", "params", "arrays", "path", "_bias", "_field_tables", "_signal_tables")
+
+    def __init__(self, kind, params, arrays, path=None):
+        self.kind = kind
+        self.params = params
+        self.arrays = arrays
+        self.path = path
+        self._build_single_row_tables()
+
+    def _build_single_row_tables(self):
+        # Both model kinds are additive over features, so each answer code and
+        # each signal value adds a fixed amount to the logit. Those amounts are
+        # evaluated once here; predict_codes() then only sums table entries.
+        n_features = len(FEATURE_NAMES)
+        probes = [np.zeros(n_features)]
+        for offset in range(_SIGNAL_OFFSET):
+            probe = np.zeros(n_features)
+            probe[offset] = 1.0
+            probes.append(probe)
+        for k, maximum in enumerate(_MAX_SIGNALS):
+            for value in range(maximum + 1):
+                probe = np.zeros(n_features)
+                probe[_SIGNAL_OFFSET + k] = value
+                probes.append(probe)
+
+        logits = self._logits(np.array(probes))
+        bias = float(logits[0])
+        deltas = (logits[1:] - bias).tolist()
+
+        self._bias = bias
+        self._field_tables = tuple(
+            tuple(deltas[offset:offset + len(FIELD_OPTIONS[field])])
+            for field, offset in zip(ANSWER_FIELDS, _FIELD_OFFSET_LIST)
+        )
+        tables = []
+        start = _SIGNAL_OFFSET
+        for maximum in _MAX_SIGNALS:
+            tables.append(tuple(deltas[start:start + maximum + 1]))
+            start += maximum + 1
+        self._signal_tables = tuple(tables)
+
+    def predict_proba(self, features):
+        """
+        Probability of the positive class.
+
+        Args:
+            features: ndarray - (n_features,) or (n_rows, n_features)
+
+        Returns:
+            float for one row, ndarray[float] for many
+        """
+        features = np.asarray(features, dtype=np.float64)
+        single = features.ndim == 1
+        logits = self._logits(np.atleast_2d(features))
+        probabilities = 1.0 / (1.0 + np.exp(-logits))
+        return float(probabilities[0]) if single else probabilities
+
+    def predict_codes(self, codes, signals=None):
+        """
+        Probability for one row of answer codes (the per-assessment fast path).
+
+        Args:
+            codes: tuple - Answer codes in ANSWER_FIELDS order
+            signals: tuple (optional) - Their signal scores, if already computed
+
+        Returns:
+            float: Probability of the positive class
+        """
+        if signals is None:
+            signals = score_codes(codes)
+        logit = self._bias
+        for table, code in zip(self._field_tables, codes):
+            logit += table[code]
+        for table, value in zip(self._signal_tables, signals):
+            logit += table[value]
+        return _sigmoid(logit)
+
+    def _logits(self, features):
+        arrays = self.arrays
+        if self.kind == "logistic":
+            return self.params["intercept"] + features @ arrays["coef"]
+        values = features[:, arrays["feature"]]
+        contributions = np.where(values <= arrays["threshold"], arrays["left"], arrays["right"])
+        return self.params["base_score"] + contributions.sum(axis=1)
+
+
+# -----------------------------
+# PERSISTENCE
+# -----------------------------
+def save_model(path, kind, arrays, params, description=""):
+    """
+    Write a model directory.
+
+    Args:
+        path: str - Directory to create or overwrite
+        kind: str - "logistic" or "stumps"
+        arrays: dict - Parameter arrays named as in MODEL_KINDS[kind]
+        params: dict - Scalars: "intercept" (logistic) or "base_score" (stumps)
+        description: str (optional) - Free text stored with the model
+    """
+    if kind not in MODEL_KINDS:
+        raise ModelError(f"Unknown model kind: {kind}")
+    os.makedirs(path, exist_ok=True)
+    for name in MODEL_KINDS[kind]:
+        np.save(os.path.join(path, f"{name}.npy"), np.ascontiguousarray(arrays[name]))
+
+    meta = {
+        "kind": kind,
+        "params": params,
+        "feature_names": list(FEATURE_NAMES),
+        "description": description,
+    }
+    # model.json is written last so a half-written directory is never loaded
+    tmp_path = os.path.join(path, MODEL_FILE + ".tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(meta, f, indent=2)
+    os.replace(tmp_path, os.path.join(path, MODEL_FILE))
+
+
+def load_model(path=DEFAULT_MODEL_PATH):
+    """
+    Memory-map a model directory.
+
+    Raises:
+        ModelError: If the directory is missing, malformed or was trained on different features
+    """
+    try:
+        with open(os.path.join(path, MODEL_FILE), "r", encoding="utf-8") as f:
+            meta = json.load(f)
+    except (OSError, ValueError) as e:
+        raise ModelError(f"Cannot read model at {path}: {e}") from e
+
+    kind = meta.get("kind")
+    if kind not in MODEL_KINDS:
+        raise ModelError(f"Unknown model kind: {kind}")
+    if tuple(meta.get("feature_names", ())) != FEATURE_NAMES:
+        raise ModelError(f"Model at {path} was trained on a different answer encoding")
+
+    arrays = {}
+    for name in MODEL_KINDS[kind]:
+        try:
+            arrays[name] = np.load(os.path.join(path, f"{name}.npy"), mmap_mode="r")
+        except (OSError, ValueError) as e:
+            raise ModelError(f"Cannot read {name}.npy in {path}: {e}") from e
+
+    return PCOSModel(kind, meta.get("params", {}), arrays, path=path)
+
+
+# -----------------------------
+# TRAINING (pure NumPy)
+# -----------------------------
+def fit_logistic(features, labels, l2=1.0, iterations=5000, learning_rate=1.0, tolerance=1e-6):
+    """
+    L2-regularised logistic regression by full-batch gradient descent.
+
+    The descent runs on standardised features with a step of learning_rate / L,
+    where L bounds the curvature of the loss, so it cannot diverge on the
+    unscaled signal columns. The scaling is folded back into coef and intercept,
+    so the model scores raw features. Stops once no parameter moves by more
+    than tolerance in an iteration.
+    """
+    n_rows, n_features = features.shape
+    mean = features.mean(axis=0)
+    scale = features.std(axis=0)
+    scale[scale == 0] = 1.0
+    standardised = (features - mean) / scale
+
+    # Lipschitz constant of the gradient: sigmoid' <= 1/4 times the largest
+    # eigenvalue of the feature covariance, plus the L2 term
+    curvature = np.linalg.eigvalsh(standardised.T @ standardised / n_rows).max() / 4 + l2 / n_rows
+    step = learning_rate / curvature
+
+    coef = np.zeros(n_features)
+    intercept = 0.0
+    for _ in range(iterations):
+        p = 1.0 / (1.0 + np.exp(-(intercept + standardised @ coef)))
+        error = p - labels
+        coef_step = step * (standardised.T @ error / n_rows + l2 * coef / n_rows)
+        intercept_step = step * error.mean()
+        coef -= coef_step
+        intercept -= intercept_step
+        if max(np.abs(coef_step).max(initial=0.0), abs(intercept_step)) < tolerance:
+            break
+
+    coef = coef / scale
+    intercept -= float(mean @ coef)
+    return {"coef": coef}, {"intercept": float(intercept)}
+
+
+def fit_stumps(features, labels, rounds=100, learning_rate=0.3):
+    """Gradient-boosted decision stumps on the logistic loss."""
+    prior = np.clip(labels.mean(), 1e-6, 1 - 1e-6)
+    base_score = float(np.log(prior / (1 - prior)))
+    logits = np.full(len(labels), base_score)
+
+    candidates = []
+    for j in range(features.shape[1]):
+        values = np.unique(features[:, j])
+        candidates.extend((j, t) for t in (values[:-1] + values[1:]) / 2)
+
+    stumps = {"feature": [], "threshold": [], "left": [], "right": []}
+    for _ in range(rounds):
+        p = 1.0 / (1.0 + np.exp(-logits))
+        gradient = labels - p
+        hessian = np.maximum(p * (1 - p), 1e-9)
+
+        best = None
+        for j, threshold in candidates:
+            mask = features[:, j] <= threshold
+            g_left, h_left = gradient[mask].sum(), hessian[mask].sum()
+            g_right, h_right = gradient.sum() - g_left, hessian.sum() - h_left
+            gain = g_left * g_left / h_left + g_right * g_right / h_right
+            if best is None or gain > best[0]:
+                best = (gain, j, threshold, g_left / h_left, g_right / h_right)
+        if best is None:
+            break
+
+        _, j, threshold, left, right = best
+        left, right = left * learning_rate, right * learning_rate
+        logits += np.where(features[:, j] <= threshold, left, right)
+        stumps["feature"].append(j)
+        stumps["threshold"].append(threshold)
+        stumps["left"].append(left)
+        stumps["right"].append(right)
+
+    arrays = {
+        "feature": np.array(stumps["feature"], dtype=np.intp),
+        "threshold": np.array(stumps["threshold"], dtype=np.float64),
+        "left": np.array(stumps["left"], dtype=np.float64),
+        "right": np.array(stumps["right"], dtype=np.float64),
+    }
+    return arrays, {"base_score": base_score}
+
+
+def _read_training_csv(path, label_column):
+    codes = []
+    labels = []
+    with open(path, "r", encoding="utf-8", newline="") as f:
+        for row in csv.DictReader(f):
+            answers = dict(row)
+            stress = answers.get("stress_level")
+            try:
+                answers["stress_level"] = float(stress)
+            except (TypeError, ValueError):
+                pass
+            codes.append(encode_answers(answers))
+            labels.append(float(row[label_column] in ("1", "true", "True", "yes", "Yes")))
+    return np.array(codes, dtype=np.intp), np.array(labels)
+
+
+def evaluate(model, features, labels, bins=10):
+    """
+    Accuracy and calibration of a model on labelled rows.
+
+    Returns:
+        dict: accuracy, brier (mean squared error of the probabilities),
+            calibration_error (row-weighted mean |predicted - observed| over
+            probability bins) and bins (list of (low, high, rows, mean predicted,
+            observed rate) for the non-empty bins)
+    """
+    probabilities = model.predict_proba(features)
+    accuracy = float(((probabilities >= 0.5) == labels.astype(bool)).mean())
+    brier = float(((probabilities - labels) ** 2).mean())
+
+    index = np.minimum((probabilities * bins).astype(np.intp), bins - 1)
+    table = []
+    calibration_error = 0.0
+    for b in range(bins):
+        mask = index == b
+        rows = int(mask.sum())
+        if not rows:
+            continue
+        predicted = float(probabilities[mask].mean())
+        observed = float(labels[mask].mean())
+        calibration_error += rows * abs(predicted - observed)
+        table.append((b / bins, (b + 1) / bins, rows, predicted, observed))
+    return {
+        "accuracy": accuracy,
+        "brier": brier,
+        "calibration_error": calibration_error / len(labels),
+        "bins": table,
+    }
+
+
+def _split(n_rows, holdout, seed=0):
+    """Shuffled (train, held-out) row indices."""
+    order = np.random.default_rng(seed).permutation(n_rows)
+    n_holdout = int(n_rows * holdout)
+    return order[n_holdout:], order[:n_holdout]
+
+
+# -----------------------------
+# CLI
+# -----------------------------
+def benchmark(model, repeat=20000):
+    """Per-call predict_codes() time and per-row batched predict_proba() time, in µs."""
+    codes = encode_answers({})
+    start = time.perf_counter()
+    for _ in range(repeat):
+        model.predict_codes(codes)
+    single_us = (time.perf_counter() - start) / repeat * 1e6
+
+    features = encode_features(np.zeros((repeat, len(ANSWER_FIELDS)), dtype=np.intp))
+    start = time.perf_counter()
+    model.predict_proba(features)
+    batch_us = (time.perf_counter() - start) / repeat * 1e6
+
+    return {"single_us": single_us, "batch_row_us": batch_us}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="PCOS ML model")
+    parser.add_argument("command", choices=["fit", "bench"])
+    parser.add_argument("data", nargs="?", help="fit: CSV of Health Check answers plus a label column")
+    parser.add_argument("--label", default="label", help="fit: label column (1/true/yes = positive)")
+    parser.add_argument("--kind", choices=sorted(MODEL_KINDS), default="logistic")
+    parser.add_argument("--path", default=DEFAULT_MODEL_PATH)
+    parser.add_argument("--repeat", type=int, default=20000)
+    parser.add_argument("--holdout", type=float, default=0.2, help="fit: fraction of rows held out for evaluation")
+    args = parser.parse_args(argv)
+
+    if args.command == "fit":
+        if not args.data:
+            parser.error("fit needs a data file")
+        if not 0 <= args.holdout < 1:
+            parser.error("--holdout must be at least 0 and below 1")
+        codes, labels = _read_training_csv(args.data, args.label)
+        features = encode_features(codes)
+        train, held_out = _split(len(labels), args.holdout)
+        trainer = fit_logistic if args.kind == "logistic" else fit_stumps
+        arrays, params = trainer(features[train], labels[train])
+        save_model(
+            args.path, args.kind, arrays, params,
+            description=f"Trained on {len(train)} rows of {os.path.basename(args.data)}"
+        )
+        model = load_model(args.path)
+        print(f"Saved {args.kind} model to {args.path} (trained on {len(train)} rows)")
+
+        training = evaluate(model, features[train], labels[train])
+        print(f"Training accuracy {training['accuracy']:.1%}")
+        if not len(held_out):
+            print("No held-out rows; use --holdout to measure accuracy on unseen data")
+            return 0
+        result = evaluate(model, features[held_out], labels[held_out])
+        print(
+            f"Held-out accuracy {result['accuracy']:.1%} on {len(held_out)} rows, "
+            f"Brier score {result['brier']:.3f}, calibration error {result['calibration_error']:.1%}"
+        )
+        print("  predicted      rows  mean predicted  observed")
+        for low, high, rows, predicted, observed in result["bins"]:
+            print(f"  {low:.1f}-{high:.1f}  {rows:>8}  {predicted:>14.1%}  {observed:>8.1%}")
+        return 0
+
+    model = load_model(args.path)
+    for name, value in benchmark(model, repeat=args.repeat).items():
+        print(f"{name:>14}: {value:.2f} µs")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
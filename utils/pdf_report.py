@@ -0,0 +1,293 @@
+"""
+Minimal PDF writer for the user report and doctor summary.
+
+Produces PDF 1.4 with the built-in Courier fonts (no embedding, no external
+library), laid out like the text reports. Everything that is the same for
+every document of a report kind is built once per process and reused as
+bytes: catalog, fonts, shared resources, the page header and the disclaimer
+block (as form XObjects). Per document only the page tree, the page content
+streams and the cross-reference table are written.
+
+The built-in fonts cover Windows-1252 only; box-drawing rules are drawn as
+lines and the few other symbols are replaced (see _PDF_CHARS). They have no
+Devanagari glyphs, so reports in Hindi are written as PDF in English.
+"""
+
+import zlib
+from functools import lru_cache
+
+from utils.report_generator import DEFAULT_LOCALE, REPORT_FOOTERS, REPORT_KINDS, generate_summaries_batch
+
+PAGE_WIDTH = 595
+PAGE_HEIGHT = 842
+MARGIN_LEFT = 56
+MARGIN_RIGHT = 56
+BODY_TOP = 770
+BODY_BOTTOM = 60
+FONT_SIZE = 9
+LEADING = 11.5
+
+# Courier glyphs are 0.6 em wide
+LINE_CHARS = int((PAGE_WIDTH - MARGIN_LEFT - MARGIN_RIGHT) / (FONT_SIZE * 0.6))
+
+PDF_CONTENT_TYPE = "application/pdf"
+
+# Report languages the built-in fonts can show
+PDF_LOCALES = ("en",)
+
+REPORT_TITLES = {
+    "user_report": "PCOS Health AI - Personal Health Summary",
+    "doctor_summary": "PCOS Health AI - Clinical Summary for Healthcare Provider",
+}
+
+_THICK_RULE = "═"
+_THIN_RULE = "─"
+
+# Characters outside Windows-1252, and PDF string escapes
+_PDF_CHARS = str.maketrans({
+    "→": "»",
+    "↑": "^",
+    "\\": "\\\\",
+    "(": "\\(",
+    ")": "\\)",
+    "\r": None,
+})
+
+# Fixed object numbers: 1 catalog, 2 page tree, 3-4 fonts, 5 resources,
+# 6 page header, 7 disclaimer block; pages and their contents follow
+_FIRST_PAGE_OBJECT = 8
+
+_PAGE_FOOTER = "PCOS Health AI - for discussion with a healthcare provider, not a diagnosis."
+
+
+def _pdf_text(text):
+    return text.translate(_PDF_CHARS)
+
+
+def _stream_object(number, dictionary, data):
+    data = zlib.compress(data)
+    return b"".join((
+        f"{number} 0 obj\n<< {dictionary} /Filter /FlateDecode /Length {len(data)} >>\nstream\n".encode("ascii"),
+        data,
+        b"\nendstream\nendobj\n",
+    ))
+
+
+# -----------------------------
+# LAYOUT
+# -----------------------------
+def _layout(lines):
+    """
+    Turn report lines into drawing items.
+
+    Returns:
+        list: ("text", text, bold) / ("rule", line width) / ("blank",) items, one line high each
+    """
+    items = []
+    count = len(lines)
+    for i, line in enumerate(lines):
+        if not line.strip():
+            items.append(("blank",))
+        elif line.startswith(_THICK_RULE):
+            items.append(("rule", 1.2))
+        elif line.startswith(_THIN_RULE):
+            items.append(("rule", 0.4))
+        else:
+            previous = lines[i - 1] if i else ""
+            following = lines[i + 1] if i + 1 < count else ""
+            # Headings sit above a thin rule or between two thick ones
+            bold = following.startswith(_THIN_RULE) or (
+                previous.startswith(_THICK_RULE) and following.startswith(_THICK_RULE)
+            )
+            if len(line) <= LINE_CHARS:
+                items.append(("text", line, bold))
+            else:
+                items.extend(("text", part, bold) for part in _wrap(line))
+    return items
+
+
+def _wrap(line):
+    """Split a long line at spaces; continuation lines are indented like the bullets."""
+    parts = []
+    indent = "  " if line.lstrip().startswith("•") else ""
+    while len(line) > LINE_CHARS:
+        cut = line.rfind(" ", 0, LINE_CHARS)
+        if cut <= len(indent):
+            cut = LINE_CHARS
+        parts.append(line[:cut])
+        line = indent + line[cut:].lstrip()
+    parts.append(line)
+    return parts
+
+
+def _draw(items, top):
+    """Content stream operators for items laid out downwards from y=top."""
+    ops = []
+    y = top
+    for item in items:
+        y -= LEADING
+        if item[0] == "text":
+            font = "F2" if item[2] else "F1"
+            ops.append(f"BT /{font} {FONT_SIZE} Tf {MARGIN_LEFT} {y:.2f} Td ({_pdf_text(item[1])}) Tj ET\n")
+        elif item[0] == "rule":
+            rule_y = y + FONT_SIZE / 3
+            ops.append(f"{item[1]} w {MARGIN_LEFT} {rule_y:.2f} m {PAGE_WIDTH - MARGIN_RIGHT} {rule_y:.2f} l S\n")
+    return ops
+
+
+# -----------------------------
+# STATIC OBJECTS
+# -----------------------------
+@lru_cache(maxsize=None)
+def _static_objects(kind):
+    """
+    Objects shared by every document of one report kind.
+
+    Returns:
+        tuple: (bytes from the file header through the last static object,
+                {object number: byte offset}, disclaimer block height)
+    """
+    footer_items = _layout(REPORT_FOOTERS[kind].strip("\n").split("\n"))
+    footer_height = len(footer_items) * LEADING
+    footer_ops = "".join(_draw(footer_items, footer_height)).encode("cp1252", "replace")
+
+    header_ops = (
+        f"BT /F2 11 Tf {MARGIN_LEFT} 806 Td ({_pdf_text(REPORT_TITLES[kind])}) Tj ET\n"
+        f"1.2 w {MARGIN_LEFT} 796 m {PAGE_WIDTH - MARGIN_RIGHT} 796 l S\n"
+    ).encode("cp1252", "replace")
+
+    font_resources = "/Resources << /Font << /F1 3 0 R /F2 4 0 R >> >>"
+    objects = (
+        (1, b"1 0 obj\n<< /Type /Catalog /Pages 2 0 R >>\nendobj\n"),
+        (3, b"3 0 obj\n<< /Type /Font /Subtype /Type1 /BaseFont /Courier /Encoding /WinAnsiEncoding >>\nendobj\n"),
+        (4, b"4 0 obj\n<< /Type /Font /Subtype /Type1 /BaseFont /Courier-Bold /Encoding /WinAnsiEncoding >>\nendobj\n"),
+        (5, b"5 0 obj\n<< /Font << /F1 3 0 R /F2 4 0 R >> /XObject << /Hd 6 0 R /Ds 7 0 R >> >>\nendobj\n"),
+        (6, _stream_object(
+            6, f"/Type /XObject /Subtype /Form /BBox [0 0 {PAGE_WIDTH} {PAGE_HEIGHT}] {font_resources}",
+            header_ops
+        )),
+        (7, _stream_object(
+            7, f"/Type /XObject /Subtype /Form /BBox [0 -4 {PAGE_WIDTH} {footer_height:.2f}] {font_resources}",
+            footer_ops
+        )),
+    )
+
+    parts = [b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n"]
+    offsets = {}
+    position = len(parts[0])
+    for number, data in objects:
+        offsets[number] = position
+        parts.append(data)
+        position += len(data)
+    return b"".join(parts), offsets, footer_height
+
+
+# -----------------------------
+# DOCUMENTS
+# -----------------------------
+def report_to_pdf(text, kind):
+    """
+    Render one report (as returned by report_generator) to PDF.
+
+    Args:
+        text: str - The user report or doctor summary text
+        kind: str - "user_report" or "doctor_summary"
+
+    Returns:
+        bytes: PDF document
+    """
+    if kind not in REPORT_KINDS:
+        raise ValueError(f"Unknown report kind: {kind}")
+    static, offsets, footer_height = _static_objects(kind)
+
+    footer = REPORT_FOOTERS[kind]
+    if text.endswith(footer):
+        text = text[:-len(footer)]
+        draw_footer = True
+    else:
+        draw_footer = False
+    # The first two lines (rule and title) are the page header
+    items = _layout(text.split("\n")[2:])
+
+    pages = [[]]
+    y = BODY_TOP
+    for item in items:
+        if y - LEADING < BODY_BOTTOM:
+            pages.append([])
+            y = BODY_TOP
+        pages[-1].extend(_draw((item,), y))
+        y -= LEADING
+    if draw_footer:
+        if y - footer_height < BODY_BOTTOM:
+            pages.append([])
+            y = BODY_TOP
+        pages[-1].append(f"q 1 0 0 1 0 {y - footer_height:.2f} cm /Ds Do Q\n")
+
+    page_count = len(pages)
+    parts = [static]
+    position = len(static)
+    offsets = dict(offsets)
+    kids = []
+    for index, ops in enumerate(pages):
+        page_number = _FIRST_PAGE_OBJECT + 2 * index
+        kids.append(f"{page_number} 0 R")
+        ops.append(
+            f"/Hd Do BT /F1 7.5 Tf {MARGIN_LEFT} 36 Td "
+            f"({_PAGE_FOOTER} Page {index + 1} of {page_count}) Tj ET\n"
+        )
+        page = (
+            f"{page_number} 0 obj\n<< /Type /Page /Parent 2 0 R /MediaBox [0 0 {PAGE_WIDTH} {PAGE_HEIGHT}] "
+            f"/Resources 5 0 R /Contents {page_number + 1} 0 R >>\nendobj\n"
+        ).encode("ascii")
+        content = _stream_object(page_number + 1, "", "".join(ops).encode("cp1252", "replace"))
+        offsets[page_number] = position
+        offsets[page_number + 1] = position + len(page)
+        parts += (page, content)
+        position += len(page) + len(content)
+
+    page_tree = f"2 0 obj\n<< /Type /Pages /Kids [{' '.join(kids)}] /Count {page_count} >>\nendobj\n".encode("ascii")
+    offsets[2] = position
+    parts.append(page_tree)
+    position += len(page_tree)
+
+    size = _FIRST_PAGE_OBJECT + 2 * page_count
+    xref = ["xref\n0 %d\n0000000000 65535 f \n" % size]
+    xref += [f"{offsets[number]:010d} 00000 n \n" for number in range(1, size)]
+    xref.append(f"trailer\n<< /Size {size} /Root 1 0 R >>\nstartxref\n{position}\n%%EOF\n")
+    parts.append("".join(xref).encode("ascii"))
+    return b"".join(parts)
+
+
+@lru_cache(maxsize=64)
+def _cached_pdf(text, kind):
+    return report_to_pdf(text, kind)
+
+
+def summary_pdf(reports, kind):
+    """
+    PDF bytes for one report of a report_generator.generate_summary() result.
+
+    Memoized on the report text, so Streamlit reruns reuse the document.
+    Reports in a language outside PDF_LOCALES are written in English.
+    """
+    if reports.locale not in PDF_LOCALES:
+        reports = reports.with_locale(DEFAULT_LOCALE)
+    return _cached_pdf(reports[kind], kind)
+
+
+def generate_pdfs_batch(results, user_inputs_list, kind="doctor_summary"):
+    """
+    Render one PDF per result.
+
+    Args:
+        results: iterable of dict - Results from decision_engine.analyze_pcos_signals()
+        user_inputs_list: iterable of dict - The inputs for each result, in the same order
+        kind: str - "user_report" or "doctor_summary"
+
+    Returns:
+        list[bytes]: One PDF document per result
+    """
+    return [
+        report_to_pdf(report[kind], kind)
+        for report in generate_summaries_batch(results, user_inputs_list, kinds=(kind,))
+    ]
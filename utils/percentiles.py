@@ -0,0 +1,233 @@
+"""
+Population percentiles for signal scores and the total risk score.
+
+Every score is a small non-negative integer, so the distribution of each metric
+is kept as a histogram in a compact array plus a cumulative "scored lower"
+array derived from it. A percentile lookup is one array read; adding an
+assessment bumps one histogram cell per metric. The index is saved with the
+byte offset of the assessment history it has consumed, so on startup only the
+assessments appended since the last save are read. The saved copy is only a
+startup shortcut, so it is rewritten at most every SAVE_INTERVAL seconds.
+"""
+
+import json
+import os
+import tempfile
+import threading
+import time
+from array import array
+
+from utils.answer_encoding import SIGNAL_NAMES
+from utils.assessment_history import HISTORY_FILE, read_history
+
+INDEX_FILE = "data/percentile_index.json"
+
+METRICS = SIGNAL_NAMES + ("total",)
+
+# How each metric is named in "higher than X% of users" sentences
+METRIC_LABELS = {
+    "cycle": "cycle irregularity signal",
+    "stress": "stress signal",
+    "insulin": "metabolic signal",
+    "androgen": "androgen signal",
+    "inflammation": "inflammation signal",
+    "total": "overall risk score",
+}
+
+# Below this many stored assessments, percentiles are not shown
+MIN_POPULATION = 20
+
+# Seconds between rewrites of INDEX_FILE while new assessments keep arriving
+SAVE_INTERVAL = 60.0
+
+
+class PercentileIndex:
+    """Per-metric score histograms with O(1) percentile lookups."""
+
+    __slots__ = ("counts", "count", "history_offset", "_below", "_lock")
+
+    def __init__(self, counts=None, count=0, history_offset=0):
+        self.counts = {
+            metric: array("q", (counts or {}).get(metric, ()))
+            for metric in METRICS
+        }
+        self.count = count
+        self.history_offset = history_offset
+        self._below = {}
+        self._lock = threading.Lock()
+
+    def add(self, record):
+        """Add one assessment record (a dict with a score per metric)."""
+        with self._lock:
+            self._add(record)
+
+    def _add(self, record):
+        for metric in METRICS:
+            value = max(int(record.get(metric, 0)), 0)
+            histogram = self.counts[metric]
+            if value >= len(histogram):
+                histogram.extend([0] * (value + 1 - len(histogram)))
+            histogram[value] += 1
+        self.count += 1
+        self._below.clear()
+
+    def percentile(self, metric, value, own_record=False):
+        """
+        Share of stored assessments that scored strictly lower.
+
+        Args:
+            metric: str - A signal name or "total"
+            value: int - The score to place
+            own_record: bool - The score being placed is itself stored in the index;
+                it is left out of the population
+
+        Returns:
+            float: Percentage 0-100 (0.0 when the index is empty)
+        """
+        value = int(value)
+        # The own record scored exactly value, so it is never among the lower ones
+        population = self.count - 1 if own_record else self.count
+        if population <= 0 or value <= 0:
+            return 0.0
+        below = self._below.get(metric)
+        if below is None:
+            below = self._cumulative(metric)
+        if value >= len(below):
+            return 100.0 * min(below[-1], population) / population
+        return 100.0 * below[value] / population
+
+    def percentiles(self, result_dict, own_record=False):
+        """Percentile of every metric for one analyze_pcos_signals() result (see percentile())."""
+        signals = result_dict.get("signals", {})
+        values = dict(signals, total=result_dict.get("risk_score", 0))
+        return {metric: self.percentile(metric, values.get(metric, 0), own_record) for metric in METRICS}
+
+    def _cumulative(self, metric):
+        # below[v] = assessments scoring < v, for v in 0..len(histogram)
+        with self._lock:
+            below = array("q", [0])
+            running = 0
+            for cell in self.counts[metric]:
+                running += cell
+                below.append(running)
+            self._below[metric] = below
+        return below
+
+    def to_dict(self):
+        with self._lock:
+            return {
+                "count": self.count,
+                "history_offset": self.history_offset,
+                "counts": {metric: list(histogram) for metric, histogram in self.counts.items()},
+            }
+
+    def catch_up(self):
+        """
+        Add assessments appended to the history since the last update.
+
+        Returns:
+            int: Number of assessments added
+        """
+        try:
+            size = os.path.getsize(HISTORY_FILE)
+        except OSError:
+            return 0
+        with self._lock:
+            if size == self.history_offset:
+                return 0
+            if size < self.history_offset:
+                # History was truncated or replaced; start over
+                self.counts = {metric: array("q") for metric in METRICS}
+                self.count = 0
+                self.history_offset = 0
+                self._below.clear()
+            records, offset = read_history(self.history_offset)
+            for record in records:
+                self._add(record)
+            self.history_offset = offset
+        return len(records)
+
+
+def save_index(index, path=INDEX_FILE):
+    """
+    Write the index atomically (readers never see a half-written file). Each
+    writer uses its own temporary file, so concurrent processes cannot clash.
+    """
+    directory = os.path.dirname(path) or "."
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(prefix=os.path.basename(path) + ".", suffix=".tmp", dir=directory)
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(index.to_dict(), f)
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+def load_index(path=INDEX_FILE):
+    """Load a saved index, or an empty one if there is none."""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return PercentileIndex()
+    return PercentileIndex(
+        counts=data.get("counts"),
+        count=data.get("count", 0),
+        history_offset=data.get("history_offset", 0),
+    )
+
+
+_index = None
+_index_lock = threading.Lock()
+_saved_offset = None
+_next_save = 0.0
+
+
+def get_percentile_index():
+    """
+    The process-wide index, brought up to date with the assessment history.
+    INDEX_FILE is rewritten only when it is behind, and then at most every
+    SAVE_INTERVAL seconds.
+
+    Returns:
+        PercentileIndex
+    """
+    global _index, _saved_offset, _next_save
+    with _index_lock:
+        if _index is None:
+            _index = load_index()
+            _saved_offset = _index.history_offset
+        _index.catch_up()
+        now = time.monotonic()
+        if _index.history_offset != _saved_offset and now >= _next_save:
+            save_index(_index)
+            _saved_offset = _index.history_offset
+            _next_save = now + SAVE_INTERVAL
+    return _index
+
+
+def describe_percentiles(result_dict, index=None, own_record=False):
+    """
+    "Higher than X% of users" sentences for one result.
+
+    Args:
+        result_dict: dict - analyze_pcos_signals() result
+        index: PercentileIndex (optional) - Defaults to get_percentile_index()
+        own_record: bool - The result has already been saved to the history,
+            so it is left out of the population it is compared with
+
+    Returns:
+        list[str]: One sentence per metric, empty until MIN_POPULATION other assessments are stored
+    """
+    index = index or get_percentile_index()
+    if index.count - (1 if own_record else 0) < MIN_POPULATION:
+        return []
+    return [
+        f"Your {METRIC_LABELS[metric]} is higher than {value:.0f}% of users"
+        for metric, value in index.percentiles(result_dict, own_record).items()
+    ]
@@ -1,9 +1,19 @@
 """
 Standardized question sets for guided chatbot flow.
 All questions are safe, non-judgmental, and clinically inspired.
+
+The question sets are written below as plain dicts and compiled once at
+import into shared, read-only structures: Question records (slotted, but
+readable like the dicts, e.g. q['text'] or q.get('type')), one tuple per
+(age group, category), and an index by question id. Texts and option lists
+repeated across age groups are stored once.
 """
 
-PROMPTS = {
+import sys
+from collections.abc import Mapping
+from types import MappingProxyType
+
+_QUESTION_SETS = {
     "teenager": {
         "menstrual": [
             {
@@ -406,6 +416,80 @@ PROMPTS = {
 }
 
 
+
+class Question(Mapping):
+    """One read-only question; a Mapping with the keys of the source dicts."""
+
+    __slots__ = ("id", "text", "type", "options", "category")
+
+    def __init__(self, id, text, type, options, category):
+        for name, value in zip(self.__slots__, (id, text, type, options, category)):
+            object.__setattr__(self, name, value)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("Question records are read-only")
+
+    def __getitem__(self, key):
+        if key not in self.__slots__:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def get(self, key, default=None):
+        return getattr(self, key) if key in self.__slots__ else default
+
+    def __iter__(self):
+        return iter(self.__slots__)
+
+    def __len__(self):
+        return len(self.__slots__)
+
+    def __repr__(self):
+        return f"Question({self.id!r}, {self.text!r})"
+
+
+def _compile_library(question_sets):
+    """
+    Question records by age group and category, and by id; equal texts and
+    option lists share one object.
+
+    Returns:
+        tuple: (prompts, by_id)
+    """
+    options_pool = {}
+    by_id = {}
+    prompts = {}
+    for age_group, categories in question_sets.items():
+        compiled = {}
+        for category, questions in categories.items():
+            records = []
+            for question in questions:
+                options = tuple(sys.intern(o) if isinstance(o, str) else o for o in question.get("options", ()))
+                record = Question(
+                    sys.intern(question["id"]),
+                    sys.intern(question["text"]),
+                    sys.intern(question.get("type", "text")),
+                    options_pool.setdefault(options, options),
+                    sys.intern(question.get("category", category)),
+                )
+                if record.id in by_id:
+                    raise ValueError(f"Duplicate question id: {record.id}")
+                by_id[record.id] = record
+                records.append(record)
+            compiled[category] = tuple(records)
+        prompts[age_group] = MappingProxyType(compiled)
+    return MappingProxyType(prompts), MappingProxyType(by_id)
+
+
+# age group -> category -> tuple of Question, and question id -> Question
+PROMPTS, QUESTIONS_BY_ID = _compile_library(_QUESTION_SETS)
+del _QUESTION_SETS
+
+
+def get_question(question_id):
+    """The question with this id, or None."""
+    return QUESTIONS_BY_ID.get(question_id)
+
+
 def get_questions_for_category(age_group, concern_category, limit=5):
     """
     Get questions for a specific age group and concern category.
@@ -416,15 +500,14 @@ def get_questions_for_category(age_group, concern_category, limit=5):
         limit: int - Maximum number of questions to return (default: 5)
     
     Returns:
-        list: List of question dictionaries
+        tuple: Question records (shared; read them like dicts)
     """
-    age_key = age_group if age_group in PROMPTS else "teenager"
-    category_key = concern_category if concern_category in PROMPTS[age_key] else "other"
-    
-    questions = PROMPTS.get(age_key, {}).get(category_key, [])
-    return questions[:limit]
+    categories = PROMPTS.get(age_group) or PROMPTS["teenager"]
+    questions = categories.get(concern_category) or categories["other"]
+    return questions if len(questions) <= limit else questions[:limit]
 
 
 def get_all_questions_for_category(age_group, concern_category):
     """Get all questions for a category (no limit)."""
-    return get_questions_for_category(age_group, concern_category, limit=100)
+    categories = PROMPTS.get(age_group) or PROMPTS["teenager"]
+    return categories.get(concern_category) or categories["other"]
@@ -1,99 +1,110 @@
 """
 Report generator for user and doctor summaries.
 Formats results in clear, non-diagnostic language.
+
+Each report is assembled from a few sections. Boxes, headings and disclaimers
+are fixed strings built once per process; the sections that depend only on
+the result (assessment, signals, contributing factors, recommendation) are
+rendered once per distinct outcome and reused; only the response summary and
+the optional sensitivity section are formatted for every report.
+generate_summary() renders each report lazily, when it is first read, and
+keeps finished reports in a small LRU so Streamlit reruns reuse them.
+
+Reports are available in every language of LOCALES. A locale's templates,
+response renderers and number/date formatting are compiled from its text
+table (English below, others in utils/report_locales.py) the first time the
+locale is used, so rendering in Hindi costs the same as rendering in English.
 """
 
+import time
+from collections.abc import Mapping
 from datetime import datetime
+from functools import lru_cache
+from itertools import repeat
 
+from utils.report_locales import REPORT_TEXT
 
-def generate_summary(result_dict, user_inputs):
-    """
-    Generate user and doctor summaries from health check results.
-    
-    Args:
-        result_dict: dict - Results from decision_engine.analyze_pcos_signals()
-        user_inputs: dict - Original user inputs
-    
-    Returns:
-        dict: {
-            "user_report": str - User-friendly summary,
-            "doctor_summary": str - Doctor-ready summary
-        }
-    """
-    
-    user_report = _generate_user_report(result_dict, user_inputs)
-    doctor_summary = _generate_doctor_summary(result_dict, user_inputs)
-    
-    return {
-        "user_report": user_report,
-        "doctor_summary": doctor_summary
-    }
-
-
-def _generate_user_report(result_dict, user_inputs):
-    """Generate user-friendly report."""
-    risk_level = result_dict.get("risk_level", "Unknown")
-    pcos_type = result_dict.get("pcos_type", "Unclear")
-    confidence = result_dict.get("confidence", 0)
-    signals = result_dict.get("signals", {})
-    doctor_needed = result_dict.get("doctor_needed", False)
-    doctor_reasons = result_dict.get("doctor_reasons", [])
-    
-    report = f"""
-═══════════════════════════════════════════════════════════════
-PCOS Health AI – Personal Health Summary
-Generated: {datetime.now().strftime("%B %d, %Y at %I:%M %p")}
-═══════════════════════════════════════════════════════════════
+REPORT_KINDS = ("user_report", "doctor_summary")
+
+LOCALES = ("en", "hi")
+DEFAULT_LOCALE = "en"
+
+# Rendered outcome sections kept per process and locale before the cache is reset
+MAX_CACHED_SECTIONS = 4096
+
+# Finished reports kept by the SummaryReports LRU
+MAX_CACHED_REPORTS = 256
+
+_USER_RESPONSE_FIELDS = ("age", "cycle_length", "period_pain", "stress_level", "sleep_quality", "activity_level")
+
+_DOCTOR_RESPONSE_FIELDS = (
+    "age", "cycle_length", "period_pain", "stress_level", "sleep_quality", "mood_changes",
+    "sugar_cravings", "weight_change", "facial_hair", "activity_level", "diet_pattern",
+)
+
+# Response fields shown out of 10
+_SCALE_FIELDS = ("stress_level",)
+
+# Integers below this are localized once per locale (ages, scores, confidence)
+_SMALL_NUMBERS = 128
+
+_RULE = "═" * 63
+_LINE = "─" * 63
+
+_SIGNAL_KEYS = ("cycle", "stress", "insulin", "androgen", "inflammation")
 
+# (signal, threshold, factor) for the CONTRIBUTING FACTORS section
+_CONTRIBUTING_FACTORS = (
+    ("cycle", 3, "Significant menstrual irregularity"),
+    ("insulin", 4, "Strong metabolic/insulin-related signals"),
+    ("stress", 6, "High stress and adrenal load"),
+    ("androgen", 3, "Noticeable androgen-related symptoms"),
+    ("inflammation", 3, "Pain and inflammation indicators"),
+)
+
+# (label, signal, threshold, elevated text, normal text) for CLINICAL SIGNALS
+_CLINICAL_SIGNALS = (
+    ("Cycle Irregularity", "cycle", 3, "↑ Elevated", "→ Within normal range"),
+    ("Stress & Adrenal Load", "stress", 6, "↑ Elevated", "→ Within manageable range"),
+    ("Metabolic/Insulin Indicators", "insulin", 4, "↑ Elevated", "→ No strong indicators"),
+    ("Androgen-Related Symptoms", "androgen", 3, "↑ Present", "→ Minimal"),
+    ("Inflammation Indicators", "inflammation", 3, "↑ Present", "→ Minimal"),
+)
+
+
+# -----------------------------
+# USER REPORT TEMPLATES
+# -----------------------------
+_USER_TITLE = "PCOS Health AI – Personal Health Summary"
+
+_USER_OUTCOME = f"""
 OVERALL ASSESSMENT
-───────────────────────────────────────────────────────────────
-Risk Level: {risk_level}
-Detected Pattern: {pcos_type}
-AI Confidence: {confidence}%
+{_LINE}
+Risk Level: {{risk_level}}
+Detected Pattern: {{pcos_type}}
+AI Confidence: {{confidence}}%
 
 YOUR HEALTH SIGNALS
-───────────────────────────────────────────────────────────────
-Cycle Irregularity Score: {signals.get('cycle', 0)}/10
-Stress & Adrenal Score: {signals.get('stress', 0)}/10
-Metabolic/Insulin Score: {signals.get('insulin', 0)}/10
-Androgen-Related Score: {signals.get('androgen', 0)}/10
-Inflammation Score: {signals.get('inflammation', 0)}/10
+{_LINE}
+Cycle Irregularity Score: {{cycle}}/10
+Stress & Adrenal Score: {{stress}}/10
+Metabolic/Insulin Score: {{insulin}}/10
+Androgen-Related Score: {{androgen}}/10
+Inflammation Score: {{inflammation}}/10
 
 EXPLANATION
-───────────────────────────────────────────────────────────────
-{result_dict.get('explanation', 'No specific pattern detected.')}
+{_LINE}
+{{explanation}}
 
 CONTRIBUTING FACTORS
-───────────────────────────────────────────────────────────────
-"""
-    
-    contributing_factors = []
-    if signals.get('cycle', 0) >= 3:
-        contributing_factors.append("Significant menstrual irregularity")
-    if signals.get('insulin', 0) >= 4:
-        contributing_factors.append("Strong metabolic/insulin-related signals")
-    if signals.get('stress', 0) >= 6:
-        contributing_factors.append("High stress and adrenal load")
-    if signals.get('androgen', 0) >= 3:
-        contributing_factors.append("Noticeable androgen-related symptoms")
-    if signals.get('inflammation', 0) >= 3:
-        contributing_factors.append("Pain and inflammation indicators")
-    
-    if contributing_factors:
-        for factor in contributing_factors:
-            report += f"• {factor}\n"
-    else:
-        report += "• No dominant contributing factors identified\n"
-    
-    report += f"""
+{_LINE}
+{{factors}}
 RECOMMENDATION
-───────────────────────────────────────────────────────────────
-"""
-    
-    if doctor_needed:
-        reasons_text = ", ".join(doctor_reasons) if doctor_reasons else "pattern assessment"
-        report += f"""
-Medical consultation is recommended based on: {reasons_text}
+{_LINE}
+{{recommendation}}"""
+
+_USER_REFERRAL = """
+Medical consultation is recommended based on: {reasons}
 
 Professional medical evaluation is advised for:
 • Confirmation and comprehensive assessment
@@ -101,8 +112,8 @@ Professional medical evaluation is advised for:
 • Personalized treatment plan
 • Ongoing monitoring and support
 """
-    else:
-        report += """
+
+_USER_LIFESTYLE = """
 Lifestyle-focused management and monitoring may be appropriate at this stage.
 
 Consider:
@@ -111,20 +122,18 @@ Consider:
 • Reassessing in 2-3 months or if symptoms change
 • Consulting a healthcare provider if symptoms worsen
 """
-    
-    report += f"""
+
+_USER_RESPONSES_HEADING = f"""
 YOUR RESPONSES (SUMMARY)
-───────────────────────────────────────────────────────────────
-Age: {user_inputs.get('age', 'Not provided')}
-Cycle Regularity: {user_inputs.get('cycle_length', 'Not provided')}
-Period Pain: {user_inputs.get('period_pain', 'Not provided')}
-Stress Level: {user_inputs.get('stress_level', 'Not provided')}/10
-Sleep Quality: {user_inputs.get('sleep_quality', 'Not provided')}
-Activity Level: {user_inputs.get('activity_level', 'Not provided')}
-
-═══════════════════════════════════════════════════════════════
+{_LINE}
+"""
+
+_USER_RESPONSE_LABELS = ("Age", "Cycle Regularity", "Period Pain", "Stress Level", "Sleep Quality", "Activity Level")
+
+_USER_FOOTER = f"""
+{_RULE}
 IMPORTANT DISCLAIMER
-═══════════════════════════════════════════════════════════════
+{_RULE}
 This summary is generated for awareness and support only.
 It is NOT a medical diagnosis.
 
@@ -138,7 +147,7 @@ This tool does NOT:
 • Diagnose medical conditions
 • Prescribe treatments
 • Replace healthcare professionals
-• Store your personal data
+• Store your answers without your consent
 
 Always consult qualified healthcare professionals for:
 • Medical diagnosis
@@ -148,78 +157,41 @@ Always consult qualified healthcare professionals for:
 
 For urgent health concerns, contact emergency services immediately.
 
-═══════════════════════════════════════════════════════════════
+{_RULE}
 Generated by PCOS Health AI
 A Safe, Explainable Women's Health Companion
-═══════════════════════════════════════════════════════════════
-"""
-    
-    return report.strip()
+{_RULE}"""
 
 
-def _generate_doctor_summary(result_dict, user_inputs):
-    """Generate doctor-ready clinical summary."""
-    risk_level = result_dict.get("risk_level", "Unknown")
-    pcos_type = result_dict.get("pcos_type", "Unclear")
-    confidence = result_dict.get("confidence", 0)
-    signals = result_dict.get("signals", {})
-    doctor_needed = result_dict.get("doctor_needed", False)
-    doctor_reasons = result_dict.get("doctor_reasons", [])
-    
-    summary = f"""
-═══════════════════════════════════════════════════════════════
-PCOS Health AI – Clinical Summary for Healthcare Provider
-Generated: {datetime.now().strftime("%B %d, %Y at %I:%M %p")}
-═══════════════════════════════════════════════════════════════
+# -----------------------------
+# DOCTOR SUMMARY TEMPLATES
+# -----------------------------
+_DOCTOR_TITLE = "PCOS Health AI – Clinical Summary for Healthcare Provider"
 
+_DOCTOR_OUTCOME = f"""
 PATIENT PRESENTATION
-───────────────────────────────────────────────────────────────
-Patient presents with a {risk_level.lower()} PCOS risk profile.
+{_LINE}
+Patient presents with a {{risk_level}} PCOS risk profile.
 
 DETECTED PATTERN
-───────────────────────────────────────────────────────────────
-AI-detected pattern: {pcos_type}
-Confidence score: {confidence}% (based on transparent signal weighting)
+{_LINE}
+AI-detected pattern: {{pcos_type}}
+Confidence score: {{confidence}}% (based on transparent signal weighting)
 
 CLINICAL SIGNALS
-───────────────────────────────────────────────────────────────
-Cycle Irregularity: {signals.get('cycle', 0)}/10
-  {'↑ Elevated' if signals.get('cycle', 0) >= 3 else '→ Within normal range'}
-  
-Stress & Adrenal Load: {signals.get('stress', 0)}/10
-  {'↑ Elevated' if signals.get('stress', 0) >= 6 else '→ Within manageable range'}
-  
-Metabolic/Insulin Indicators: {signals.get('insulin', 0)}/10
-  {'↑ Elevated' if signals.get('insulin', 0) >= 4 else '→ No strong indicators'}
-  
-Androgen-Related Symptoms: {signals.get('androgen', 0)}/10
-  {'↑ Present' if signals.get('androgen', 0) >= 3 else '→ Minimal'}
-  
-Inflammation Indicators: {signals.get('inflammation', 0)}/10
-  {'↑ Present' if signals.get('inflammation', 0) >= 3 else '→ Minimal'}
-
+{_LINE}
+{{signals}}
 REPORTED SYMPTOMS
-───────────────────────────────────────────────────────────────
-Age: {user_inputs.get('age', 'Not reported')}
-Menstrual Pattern: {user_inputs.get('cycle_length', 'Not reported')}
-Period Pain: {user_inputs.get('period_pain', 'Not reported')}
-Stress Level: {user_inputs.get('stress_level', 'Not reported')}/10
-Sleep Quality: {user_inputs.get('sleep_quality', 'Not reported')}
-Mood Changes: {user_inputs.get('mood_changes', 'Not reported')}
-Sugar Cravings: {user_inputs.get('sugar_cravings', 'Not reported')}
-Weight Changes: {user_inputs.get('weight_change', 'Not reported')}
-Hair Growth: {user_inputs.get('facial_hair', 'Not reported')}
-Activity Level: {user_inputs.get('activity_level', 'Not reported')}
-Diet Pattern: {user_inputs.get('diet_pattern', 'Not reported')}
+{_LINE}
+"""
 
+_DOCTOR_RECOMMENDATION = f"""
 CLINICAL RECOMMENDATION
-───────────────────────────────────────────────────────────────
-"""
-    
-    if doctor_needed:
-        reasons_text = "; ".join(doctor_reasons) if doctor_reasons else "pattern assessment"
-        summary += f"""
-Medical evaluation is advised based on: {reasons_text}
+{_LINE}
+{{recommendation}}"""
+
+_DOCTOR_REFERRAL = """
+Medical evaluation is advised based on: {reasons}
 
 Suggested evaluation may include:
 • Comprehensive history and physical examination
@@ -228,8 +200,8 @@ Suggested evaluation may include:
 • Additional testing as clinically indicated
 • Consideration of PCOS diagnostic criteria (Rotterdam criteria)
 """
-    else:
-        summary += """
+
+_DOCTOR_LIFESTYLE = """
 Lifestyle-focused monitoring may be appropriate with reassessment if symptoms evolve.
 
 Consider:
@@ -238,10 +210,15 @@ Consider:
 • Reassessment in 2-3 months or if symptoms change
 • Patient education about PCOS/PCOD if applicable
 """
-    
-    summary += f"""
+
+_DOCTOR_RESPONSE_LABELS = (
+    "Age", "Menstrual Pattern", "Period Pain", "Stress Level", "Sleep Quality", "Mood Changes",
+    "Sugar Cravings", "Weight Changes", "Hair Growth", "Activity Level", "Diet Pattern",
+)
+
+_DOCTOR_FOOTER = f"""
 NOTES ON TOOL METHODOLOGY
-───────────────────────────────────────────────────────────────
+{_LINE}
 This summary was generated using a rule-based, explainable AI system.
 All scoring is transparent and based on clinical signal weighting.
 
@@ -250,9 +227,9 @@ All scoring is transparent and based on clinical signal weighting.
 • Confidence scores reflect signal strength, not diagnostic certainty
 • This tool is for awareness and discussion support only
 
-═══════════════════════════════════════════════════════════════
+{_RULE}
 DISCLAIMER FOR HEALTHCARE PROVIDERS
-═══════════════════════════════════════════════════════════════
+{_RULE}
 This summary is generated for informational purposes and discussion support.
 It is NOT a medical diagnosis and should be used as one data point among many
 in your clinical evaluation.
@@ -268,10 +245,565 @@ Clinical decision-making should always be based on:
 • Appropriate diagnostic testing
 • Professional clinical judgment
 
-═══════════════════════════════════════════════════════════════
+{_RULE}
 Generated by PCOS Health AI
 A Safe, Explainable Women's Health Companion
-═══════════════════════════════════════════════════════════════
+{_RULE}"""
+
+_SENSITIVITY_HEADING = f"""
+ANSWER SENSITIVITY (SINGLE-ANSWER WHAT-IF)
+{_LINE}
 """
-    
-    return summary.strip()
+
+# Fixed closing section of each report kind; other output formats draw it once and reuse it
+REPORT_FOOTERS = {"user_report": _USER_FOOTER, "doctor_summary": _DOCTOR_FOOTER}
+
+# English text table; utils/report_locales.py has one with the same keys per other locale
+_ENGLISH_TEXT = {
+    "user_title": _USER_TITLE,
+    "doctor_title": _DOCTOR_TITLE,
+    "generated_label": "Generated",
+
+    "digits": "0123456789",
+    "months": (
+        "January", "February", "March", "April", "May", "June",
+        "July", "August", "September", "October", "November", "December",
+    ),
+    "am_pm": ("AM", "PM"),
+    "date_format": "{month} {day:02d}, {year} at {hour:02d}:{minute:02d} {period}",
+
+    "user_outcome": _USER_OUTCOME,
+    "user_referral": _USER_REFERRAL,
+    "user_lifestyle": _USER_LIFESTYLE,
+    "user_responses_heading": _USER_RESPONSES_HEADING,
+    "user_footer": _USER_FOOTER,
+    "doctor_outcome": _DOCTOR_OUTCOME,
+    "doctor_recommendation": _DOCTOR_RECOMMENDATION,
+    "doctor_referral": _DOCTOR_REFERRAL,
+    "doctor_lifestyle": _DOCTOR_LIFESTYLE,
+    "doctor_footer": _DOCTOR_FOOTER,
+
+    "sensitivity_heading": _SENSITIVITY_HEADING,
+    "sensitivity_none": "No single answer change would lower the risk score or change the pattern.\n",
+    "sensitivity_row": "• {label}: {current} → {new_label}: score {base_score} → {risk_score} ({score_change}), "
+                       "{risk_level}, {pcos_type}\n",
+
+    "contributing_factors": tuple(factor for _, _, factor in _CONTRIBUTING_FACTORS),
+    "no_factors": "• No dominant contributing factors identified\n",
+    "default_reason": "pattern assessment",
+    "clinical_signals": tuple((label, elevated, normal) for label, _, _, elevated, normal in _CLINICAL_SIGNALS),
+
+    "user_response_labels": _USER_RESPONSE_LABELS,
+    "doctor_response_labels": _DOCTOR_RESPONSE_LABELS,
+    "not_provided": "Not provided",
+    "not_reported": "Not reported",
+
+    "values": {},
+}
+
+
+# -----------------------------
+# LOCALE COMPILATION
+# -----------------------------
+class CompiledLocale:
+    """
+    Everything needed to render reports in one language, built once per
+    process by compiled_locale(). It also holds that locale's caches of
+    rendered outcome sections and the current page headers.
+    """
+
+    __slots__ = (
+        "locale", "text", "out_of", "source", "user_title", "doctor_title",
+        "user_header", "doctor_header", "user_outcome", "user_referral", "user_lifestyle",
+        "doctor_outcome", "doctor_recommendation", "doctor_referral", "doctor_lifestyle",
+        "user_footer", "doctor_footer", "sensitivity_heading", "sensitivity_none", "sensitivity_row",
+        "contributing_factors", "no_factors", "default_reason", "clinical_signals",
+        "not_provided", "not_reported", "render_user_responses", "render_doctor_responses",
+        "_digits", "_months", "_am_pm", "_date_format", "outcomes", "headers",
+    )
+
+    def __init__(self, locale, table):
+        self.locale = locale
+        self._digits = str.maketrans("0123456789", table["digits"])
+        self._months = table["months"]
+        self._am_pm = table["am_pm"]
+        self._date_format = table["date_format"]
+
+        if table["values"] or table["digits"] != "0123456789":
+            translations = _Translations(table["values"], self._digits)
+            self.text = _localizer(translations)
+            namespace = {"_t": translations.__getitem__, "_s": self.text}
+        else:
+            # English: answers and numbers are shown as given
+            self.text = str
+            namespace = {}
+        self.out_of = "/" + self.text(10)
+
+        self.user_title = table["user_title"]
+        self.doctor_title = table["doctor_title"]
+        self.user_header = _header_template(table["user_title"], table["generated_label"])
+        self.doctor_header = _header_template(table["doctor_title"], table["generated_label"])
+        for name in (
+            "user_outcome", "user_referral", "user_lifestyle", "user_footer",
+            "doctor_outcome", "doctor_recommendation", "doctor_referral", "doctor_lifestyle", "doctor_footer",
+            "sensitivity_heading", "sensitivity_none", "sensitivity_row",
+            "no_factors", "default_reason", "not_provided", "not_reported",
+        ):
+            setattr(self, name, table[name])
+
+        self.contributing_factors = tuple(
+            (signal, threshold, factor)
+            for (signal, threshold, _), factor in zip(_CONTRIBUTING_FACTORS, table["contributing_factors"])
+        )
+        self.clinical_signals = tuple(
+            (label, signal, threshold, elevated, normal)
+            for (_, signal, threshold, _, _), (label, elevated, normal)
+            in zip(_CLINICAL_SIGNALS, table["clinical_signals"])
+        )
+
+        user_source = _response_renderer_source(
+            "render_user_responses", _USER_RESPONSE_FIELDS, table["user_response_labels"],
+            table["user_responses_heading"], table["user_footer"], self
+        )
+        doctor_source = _response_renderer_source(
+            "render_doctor_responses", _DOCTOR_RESPONSE_FIELDS, table["doctor_response_labels"],
+            None, None, self
+        )
+        self.source = user_source + doctor_source
+        exec(compile(self.source, f"<report locale {locale}>", "exec"), namespace)
+        self.render_user_responses = namespace["render_user_responses"]
+        self.render_doctor_responses = namespace["render_doctor_responses"]
+
+        self.outcomes = {}
+        self.headers = (None, None, None)
+
+    def __repr__(self):
+        return f"CompiledLocale(locale={self.locale!r})"
+
+    def format_stamp(self, now):
+        """Report timestamp in this locale's date format and digits."""
+        moment = datetime.fromtimestamp(now)
+        return self._date_format.format(
+            day=moment.day,
+            month=self._months[moment.month - 1],
+            year=moment.year,
+            hour=moment.hour % 12 or 12,
+            minute=moment.minute,
+            period=self._am_pm[moment.hour >= 12],
+        ).translate(self._digits)
+
+
+@lru_cache(maxsize=None)
+def compiled_locale(locale=DEFAULT_LOCALE):
+    """
+    Compile one locale's report templates (once per process).
+
+    Raises:
+        ValueError: If the locale is not one of LOCALES
+    """
+    if locale not in LOCALES:
+        raise ValueError(f"Unsupported report locale: {locale}")
+    return CompiledLocale(locale, _ENGLISH_TEXT if locale == "en" else REPORT_TEXT[locale])
+
+
+def report_footers(locale=DEFAULT_LOCALE):
+    """Fixed closing section of each report kind in one locale (see REPORT_FOOTERS)."""
+    compiled = compiled_locale(locale)
+    return {"user_report": compiled.user_footer, "doctor_summary": compiled.doctor_footer}
+
+
+def report_titles(locale=DEFAULT_LOCALE):
+    """Title line of each report kind in one locale."""
+    compiled = compiled_locale(locale)
+    return {"user_report": compiled.user_title, "doctor_summary": compiled.doctor_title}
+
+
+class _Translations(dict):
+    """
+    Translated answers and engine text; any other value is shown with the
+    locale's digits. Small integers are prefilled, so numbers equal to one
+    of them (5.0, True) are shown like it.
+    """
+
+    __slots__ = ("digits",)
+
+    def __init__(self, values, digits):
+        super().__init__(values)
+        self.update((number, str(number).translate(digits)) for number in range(_SMALL_NUMBERS))
+        self.digits = digits
+
+    def __missing__(self, value):
+        return str(value).translate(self.digits)
+
+
+def _localizer(translations):
+    """Display text for any value, including unhashable ones."""
+    digits = translations.digits
+
+    def localize(value):
+        try:
+            return translations[value]
+        except TypeError:
+            return str(value).translate(digits)
+
+    return localize
+
+
+def _header_template(title, generated_label):
+    return f"{_RULE}\n{title}\n{generated_label}: {{generated}}\n{_RULE}\n"
+
+
+def _response_renderer_source(name, fields, labels, heading, footer, compiled):
+    """
+    Source of a function rendering one report's response lines as a single
+    f-string; an f-string is several times faster than str.format on text
+    containing box-drawing or Devanagari characters. With heading and footer
+    the function returns the report's whole closing part.
+
+    Localized answers are looked up with _t, a C-level dict lookup; an
+    unhashable answer makes it raise TypeError, and the lines are then
+    rendered again with the slower _s.
+    """
+    localize = compiled.text is not str
+
+    def template(text_function):
+        lines = []
+        for index, (field, label) in enumerate(zip(fields, labels)):
+            value = f"{{{text_function}(v{index})}}" if localize else f"{{v{index}}}"
+            suffix = compiled.out_of if field in _SCALE_FIELDS else ""
+            lines.append(f"{_escape_braces(label)}: {value}{_escape_braces(suffix)}\n")
+        body = "".join(lines)
+        if heading is not None:
+            body = _escape_braces(heading) + body + _escape_braces(footer)
+        return "f" + repr(body)
+
+    unpack = ", ".join(f"v{index}" for index in range(len(fields)))
+    source = [
+        f"def {name}(responses):",
+        f"    {unpack}, = responses",
+    ]
+    if localize:
+        source += [
+            "    try:",
+            f"        return {template('_t')}",
+            "    except TypeError:",
+            f"        return {template('_s')}",
+        ]
+    else:
+        source.append(f"    return {template(None)}")
+    return "\n".join(source) + "\n"
+
+
+def _escape_braces(text):
+    return text.replace("{", "{{").replace("}", "}}")
+
+
+def generate_summary(result_dict, user_inputs, sensitivity=None, locale=DEFAULT_LOCALE):
+    """
+    Generate user and doctor summaries from health check results.
+
+    Reports are rendered on first access and memoized (see SummaryReports),
+    so a rerun with the same result and answers reuses the earlier text.
+
+    Args:
+        result_dict: dict - Results from decision_engine.analyze_pcos_signals()
+        user_inputs: dict - Original user inputs
+        sensitivity: list (optional) - Rows from sensitivity.analyze_sensitivity(),
+            summarised in the doctor summary
+        locale: str - Report language (one of LOCALES)
+
+    Returns:
+        SummaryReports: Mapping {
+            "user_report": str - User-friendly summary,
+            "doctor_summary": str - Doctor-ready summary
+        }
+
+    Raises:
+        ValueError: If the locale is not one of LOCALES
+    """
+    return SummaryReports(result_dict, user_inputs, sensitivity, locale)
+
+
+class SummaryReports(Mapping):
+    """
+    The reports for one result, each rendered only when first accessed.
+
+    Rendered text is kept in a process-wide LRU keyed by everything that
+    appears in the report: report kind, locale, timestamp, the result's
+    outcome, the answers shown and the sensitivity section.
+    """
+
+    __slots__ = ("result_dict", "user_inputs", "sensitivity", "locale", "_compiled", "_generated", "_outcome_key")
+
+    def __init__(self, result_dict, user_inputs, sensitivity=None, locale=DEFAULT_LOCALE):
+        self.result_dict = result_dict
+        self.user_inputs = user_inputs
+        self.sensitivity = sensitivity
+        self.locale = locale
+        self._compiled = compiled_locale(locale)
+        self._generated = _generated_stamp(locale)
+        self._outcome_key = _outcome_key(result_dict)
+
+    def __getitem__(self, kind):
+        return self._entry(kind)[0]
+
+    def __iter__(self):
+        return iter(REPORT_KINDS)
+
+    def __len__(self):
+        return len(REPORT_KINDS)
+
+    def encoded(self, kind):
+        """UTF-8 bytes of one report (cached with the text), e.g. for st.download_button."""
+        entry = self._entry(kind)
+        if entry[1] is None:
+            entry[1] = entry[0].encode("utf-8")
+        return entry[1]
+
+    def with_locale(self, locale):
+        """The same reports in another language."""
+        if locale == self.locale:
+            return self
+        return SummaryReports(self.result_dict, self.user_inputs, self.sensitivity, locale)
+
+    def _entry(self, kind):
+        compiled = self._compiled
+        if kind == "user_report":
+            fields, default = _USER_RESPONSE_FIELDS, compiled.not_provided
+            sensitivity_section = ""
+        elif kind == "doctor_summary":
+            fields, default = _DOCTOR_RESPONSE_FIELDS, compiled.not_reported
+            sensitivity_section = (
+                _format_sensitivity(self.result_dict, self.sensitivity, compiled) if self.sensitivity else ""
+            )
+        else:
+            raise KeyError(kind)
+
+        key = (
+            kind,
+            self.locale,
+            self._generated,
+            self._outcome_key,
+            tuple(map(self.user_inputs.get, fields, repeat(default))),
+            sensitivity_section,
+        )
+        try:
+            return _cached_report(*key)
+        except TypeError:
+            # Unhashable answer values; render without caching
+            return _cached_report.__wrapped__(*key)
+
+
+@lru_cache(maxsize=MAX_CACHED_REPORTS)
+def _cached_report(kind, locale, generated, outcome_key, responses, sensitivity_section):
+    """[text, encoded bytes or None] for one report; a pure function of its arguments."""
+    compiled = compiled_locale(locale)
+    outcome = _outcome_sections(compiled, outcome_key)
+    if kind == "user_report":
+        return [_render_user_report(compiled, generated, outcome, responses), None]
+    return [_render_doctor_summary(compiled, generated, outcome, responses, sensitivity_section), None]
+
+
+def generate_summaries_batch(results, user_inputs_list, sensitivities=None, kinds=REPORT_KINDS,
+                             locale=DEFAULT_LOCALE):
+    """
+    Generate summaries for many assessments at once.
+
+    All reports in a batch share one "Generated" timestamp, and the sections
+    that depend only on the result are rendered once per distinct outcome.
+
+    Args:
+        results: iterable of dict - Results from decision_engine.analyze_pcos_signals()
+        user_inputs_list: iterable of dict - The inputs for each result, in the same order
+        sensitivities: iterable of list (optional) - analyze_sensitivity() rows per result
+        kinds: tuple - Report kinds to render ("user_report", "doctor_summary")
+        locale: str - Report language (one of LOCALES)
+
+    Returns:
+        list[dict]: One dict per result with the requested report kinds
+    """
+    unknown = set(kinds) - set(REPORT_KINDS)
+    if unknown:
+        raise ValueError(f"Unknown report kind(s): {', '.join(sorted(unknown))}")
+    want_user = "user_report" in kinds
+    want_doctor = "doctor_summary" in kinds
+
+    compiled = compiled_locale(locale)
+    generated = _generated_stamp(locale)
+    if sensitivities is None:
+        sensitivities = iter(lambda: None, 0)
+
+    reports = []
+    for result_dict, user_inputs, sensitivity in zip(results, user_inputs_list, sensitivities):
+        outcome = _outcome_sections(compiled, _outcome_key(result_dict))
+        report = {}
+        if want_user:
+            report["user_report"] = _render_user_report(
+                compiled, generated, outcome,
+                tuple(map(user_inputs.get, _USER_RESPONSE_FIELDS, repeat(compiled.not_provided)))
+            )
+        if want_doctor:
+            report["doctor_summary"] = _render_doctor_summary(
+                compiled, generated, outcome,
+                tuple(map(user_inputs.get, _DOCTOR_RESPONSE_FIELDS, repeat(compiled.not_reported))),
+                _format_sensitivity(result_dict, sensitivity, compiled) if sensitivity else ""
+            )
+        reports.append(report)
+    return reports
+
+
+# -----------------------------
+# RENDERING
+# -----------------------------
+_stamps = {}
+
+
+def _generated_stamp(locale=DEFAULT_LOCALE):
+    """Report timestamp; it has minute resolution, so it is formatted once per minute and locale."""
+    now = time.time()
+    minute = int(now // 60)
+    cached_minute, text = _stamps.get(locale, (None, ""))
+    if minute != cached_minute:
+        text = compiled_locale(locale).format_stamp(now)
+        _stamps[locale] = (minute, text)
+    return text
+
+
+def _headers(compiled, generated):
+    """(user header, doctor header) for one timestamp."""
+    headers = compiled.headers
+    if headers[0] != generated:
+        headers = compiled.headers = (
+            generated,
+            compiled.user_header.format(generated=generated),
+            compiled.doctor_header.format(generated=generated),
+        )
+    return headers
+
+
+def _outcome_key(result_dict):
+    """Everything in a result that the outcome sections depend on, as a hashable tuple."""
+    signals = result_dict.get("signals", {})
+    return (
+        result_dict.get("risk_level", "Unknown"),
+        result_dict.get("pcos_type", "Unclear"),
+        result_dict.get("confidence", 0),
+        (
+            signals.get("cycle", 0),
+            signals.get("stress", 0),
+            signals.get("insulin", 0),
+            signals.get("androgen", 0),
+            signals.get("inflammation", 0),
+        ),
+        result_dict.get("explanation", "No specific pattern detected."),
+        result_dict.get("doctor_needed", False),
+        tuple(result_dict.get("doctor_reasons", [])),
+    )
+
+
+def _outcome_sections(compiled, key):
+    """
+    Result-dependent sections, rendered once per distinct outcome and locale.
+
+    Returns:
+        tuple: (user outcome, doctor outcome, doctor recommendation)
+    """
+    cache = compiled.outcomes
+    sections = cache.get(key)
+    if sections is None:
+        if len(cache) >= MAX_CACHED_SECTIONS:
+            cache.clear()
+        sections = cache[key] = _render_outcome(compiled, *key)
+    return sections
+
+
+def _render_outcome(compiled, risk_level, pcos_type, confidence, values, explanation, doctor_needed,
+                    doctor_reasons):
+    signals = dict(zip(_SIGNAL_KEYS, values))
+    text = compiled.text
+
+    factors = "".join(
+        f"• {factor}\n"
+        for signal, threshold, factor in compiled.contributing_factors
+        if signals[signal] >= threshold
+    ) or compiled.no_factors
+
+    if doctor_needed:
+        reasons = [text(reason) for reason in doctor_reasons]
+        user_recommendation = compiled.user_referral.format(
+            reasons=", ".join(reasons) if reasons else compiled.default_reason
+        )
+        doctor_recommendation = compiled.doctor_referral.format(
+            reasons="; ".join(reasons) if reasons else compiled.default_reason
+        )
+    else:
+        user_recommendation = compiled.user_lifestyle
+        doctor_recommendation = compiled.doctor_lifestyle
+
+    clinical_signals = "  \n".join(
+        f"{label}: {text(signals[signal])}{compiled.out_of}\n"
+        f"  {elevated if signals[signal] >= threshold else normal}\n"
+        for label, signal, threshold, elevated, normal in compiled.clinical_signals
+    )
+
+    user_outcome = compiled.user_outcome.format(
+        risk_level=text(risk_level),
+        pcos_type=text(pcos_type),
+        confidence=text(confidence),
+        explanation=text(explanation),
+        factors=factors,
+        recommendation=user_recommendation,
+        **{signal: text(value) for signal, value in signals.items()}
+    )
+    doctor_outcome = compiled.doctor_outcome.format(
+        risk_level=text(risk_level).lower(),
+        pcos_type=text(pcos_type),
+        confidence=text(confidence),
+        signals=clinical_signals,
+    )
+    return user_outcome, doctor_outcome, compiled.doctor_recommendation.format(recommendation=doctor_recommendation)
+
+
+def _render_user_report(compiled, generated, outcome, responses):
+    """Generate user-friendly report (responses: values of _USER_RESPONSE_FIELDS)."""
+    return "".join((_headers(compiled, generated)[1], outcome[0], compiled.render_user_responses(responses)))
+
+
+def _render_doctor_summary(compiled, generated, outcome, responses, sensitivity_section=""):
+    """Generate doctor-ready clinical summary (responses: values of _DOCTOR_RESPONSE_FIELDS)."""
+    return "".join((
+        _headers(compiled, generated)[2],
+        outcome[1],
+        compiled.render_doctor_responses(responses),
+        outcome[2],
+        sensitivity_section,
+        compiled.doctor_footer,
+    ))
+
+
+def _format_sensitivity(result_dict, sensitivity, compiled, limit=5):
+    """What-if section: the single answer changes that most reduce risk or change the pattern."""
+    rows = [
+        row for row in sensitivity
+        if row["score_change"] < 0 or row["type_changed"]
+    ][:limit]
+
+    section = compiled.sensitivity_heading
+    if not rows:
+        return section + compiled.sensitivity_none
+
+    text = compiled.text
+    base_score = text(result_dict.get("risk_score", 0))
+    for row in rows:
+        current = row["current_answer"] if row["current_answer"] is not None else compiled.not_reported
+        section += compiled.sensitivity_row.format(
+            label=text(row["label"]),
+            current=text(current),
+            new_label=text(row["new_label"]),
+            base_score=base_score,
+            risk_score=text(row["risk_score"]),
+            score_change=text(f"{row['score_change']:+d}"),
+            risk_level=text(row["risk_level"]),
+            pcos_type=text(row["pcos_type"]),
+        )
+    return section
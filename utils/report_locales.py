@@ -0,0 +1,322 @@
+"""
+Report text for the languages other than English.
+
+report_generator compiles each locale's templates from its table here once
+per process (the English text lives with the templates in report_generator).
+Tables have the same keys as report_generator._ENGLISH_TEXT; tuples are in
+the same order as the English ones. Answers, pattern names and other engine
+text missing from "values" are shown as given, with the locale's digits.
+"""
+
+_RULE = "═" * 63
+_LINE = "─" * 63
+
+
+# -----------------------------
+# HINDI
+# -----------------------------
+HINDI = {
+    "user_title": "PCOS Health AI – व्यक्तिगत स्वास्थ्य सारांश",
+    "doctor_title": "PCOS Health AI – स्वास्थ्य विशेषज्ञ के लिए क्लिनिकल सारांश",
+    "generated_label": "तैयार किया गया",
+
+    "digits": "०१२३४५६७८९",
+    "months": (
+        "जनवरी", "फ़रवरी", "मार्च", "अप्रैल", "मई", "जून",
+        "जुलाई", "अगस्त", "सितंबर", "अक्टूबर", "नवंबर", "दिसंबर",
+    ),
+    "am_pm": ("पूर्वाह्न", "अपराह्न"),
+    "date_format": "{day} {month} {year}, {hour:02d}:{minute:02d} {period}",
+
+    "user_outcome": f"""
+समग्र आकलन
+{_LINE}
+जोखिम स्तर: {{risk_level}}
+पहचाना गया पैटर्न: {{pcos_type}}
+AI विश्वास स्तर: {{confidence}}%
+
+आपके स्वास्थ्य संकेत
+{_LINE}
+मासिक चक्र अनियमितता स्कोर: {{cycle}}/१०
+तनाव और एड्रिनल स्कोर: {{stress}}/१०
+मेटाबोलिक/इंसुलिन स्कोर: {{insulin}}/१०
+एंड्रोजन-संबंधी स्कोर: {{androgen}}/१०
+सूजन स्कोर: {{inflammation}}/१०
+
+व्याख्या
+{_LINE}
+{{explanation}}
+
+योगदान देने वाले कारक
+{_LINE}
+{{factors}}
+सुझाव
+{_LINE}
+{{recommendation}}""",
+
+    "user_referral": """
+इन कारणों से डॉक्टर से परामर्श की सलाह दी जाती है: {reasons}
+
+पेशेवर चिकित्सा जाँच की सलाह दी जाती है:
+• पुष्टि और विस्तृत आकलन के लिए
+• उचित जाँचों के लिए
+• व्यक्तिगत उपचार योजना के लिए
+• नियमित निगरानी और सहायता के लिए
+""",
+
+    "user_lifestyle": """
+इस चरण में जीवनशैली-केंद्रित प्रबंधन और निगरानी उपयुक्त हो सकती है।
+
+विचार करें:
+• लक्षणों और पैटर्न को ट्रैक करते रहें
+• जीवनशैली कारकों पर ध्यान दें (नींद, तनाव, पोषण, गतिविधि)
+• २-३ महीनों में या लक्षण बदलने पर दोबारा आकलन करें
+• लक्षण बढ़ने पर स्वास्थ्य विशेषज्ञ से परामर्श करें
+""",
+
+    "user_responses_heading": f"""
+आपके उत्तर (सारांश)
+{_LINE}
+""",
+
+    "user_footer": f"""
+{_RULE}
+महत्वपूर्ण अस्वीकरण
+{_RULE}
+यह सारांश केवल जागरूकता और सहायता के लिए तैयार किया गया है।
+यह चिकित्सा निदान नहीं है।
+
+यह टूल इसके लिए बनाया गया है:
+• अपने शरीर के संकेतों को समझने में मदद
+• भ्रम और चिंता कम करना
+• डॉक्टर से कब मिलना है, इसमें मार्गदर्शन
+• व्यवस्थित जानकारी देना
+
+यह टूल यह नहीं करता:
+• बीमारियों का निदान
+• उपचार लिखना
+• स्वास्थ्य विशेषज्ञों की जगह लेना
+• आपकी सहमति के बिना आपके उत्तर संग्रहीत करना
+
+इनके लिए हमेशा योग्य स्वास्थ्य विशेषज्ञों से परामर्श करें:
+• चिकित्सा निदान
+• उपचार संबंधी सलाह
+• तत्काल स्वास्थ्य समस्याएँ
+• निरंतर चिकित्सा देखभाल
+
+तत्काल स्वास्थ्य समस्या होने पर तुरंत आपातकालीन सेवाओं से संपर्क करें।
+
+{_RULE}
+PCOS Health AI द्वारा तैयार
+एक सुरक्षित, समझने योग्य महिला स्वास्थ्य साथी
+{_RULE}""",
+
+    "doctor_outcome": f"""
+रोगी की स्थिति
+{_LINE}
+रोगी में {{risk_level}} वाली PCOS प्रोफ़ाइल दिखती है।
+
+पहचाना गया पैटर्न
+{_LINE}
+AI द्वारा पहचाना गया पैटर्न: {{pcos_type}}
+विश्वास स्कोर: {{confidence}}% (पारदर्शी संकेत भार पर आधारित)
+
+क्लिनिकल संकेत
+{_LINE}
+{{signals}}
+बताए गए लक्षण
+{_LINE}
+""",
+
+    "doctor_recommendation": f"""
+क्लिनिकल सुझाव
+{_LINE}
+{{recommendation}}""",
+
+    "doctor_referral": """
+इन कारणों से चिकित्सा जाँच की सलाह दी जाती है: {reasons}
+
+सुझाई गई जाँच में शामिल हो सकते हैं:
+• विस्तृत इतिहास और शारीरिक परीक्षण
+• हार्मोनल आकलन (LH, FSH, टेस्टोस्टेरोन, DHEA-S आदि)
+• मेटाबोलिक आकलन (फास्टिंग इंसुलिन, HbA1c, आवश्यकता होने पर ग्लूकोज़ टॉलरेंस)
+• क्लिनिकल आवश्यकता के अनुसार अन्य जाँचें
+• PCOS निदान मानदंडों (रॉटरडैम मानदंड) पर विचार
+""",
+
+    "doctor_lifestyle": """
+जीवनशैली-केंद्रित निगरानी उपयुक्त हो सकती है, लक्षण बदलने पर दोबारा आकलन के साथ।
+
+विचार करें:
+• लक्षणों की ट्रैकिंग और निगरानी
+• जीवनशैली में बदलाव (नींद, तनाव प्रबंधन, पोषण, गतिविधि)
+• २-३ महीनों में या लक्षण बदलने पर दोबारा आकलन
+• लागू होने पर रोगी को PCOS/PCOD के बारे में जानकारी
+""",
+
+    "doctor_footer": f"""
+टूल की कार्यप्रणाली पर टिप्पणी
+{_LINE}
+यह सारांश नियम-आधारित, समझने योग्य AI प्रणाली से तैयार किया गया है।
+सभी स्कोर पारदर्शी हैं और क्लिनिकल संकेत भार पर आधारित हैं।
+
+• किसी ब्लैक-बॉक्स मशीन लर्निंग मॉडल का उपयोग नहीं किया गया
+• हर निर्णय विशिष्ट इनपुट संकेतों तक ट्रेस किया जा सकता है
+• विश्वास स्कोर संकेतों की तीव्रता दर्शाते हैं, निदान की निश्चितता नहीं
+• यह टूल केवल जागरूकता और चर्चा में सहायता के लिए है
+
+{_RULE}
+स्वास्थ्य विशेषज्ञों के लिए अस्वीकरण
+{_RULE}
+यह सारांश जानकारी और चर्चा में सहायता के लिए तैयार किया गया है।
+यह चिकित्सा निदान नहीं है और इसे आपके क्लिनिकल मूल्यांकन में
+कई आँकड़ों में से एक के रूप में उपयोग किया जाना चाहिए।
+
+यह टूल इसके लिए बनाया गया है:
+• रोगियों को उनके लक्षण समझने में मदद
+• रोगी और डॉक्टर के बीच बातचीत को आसान बनाना
+• लक्षणों का व्यवस्थित दस्तावेज़ उपलब्ध कराना
+
+क्लिनिकल निर्णय हमेशा इन पर आधारित होने चाहिए:
+• विस्तृत चिकित्सा इतिहास
+• शारीरिक परीक्षण
+• उचित नैदानिक जाँच
+• पेशेवर क्लिनिकल विवेक
+
+{_RULE}
+PCOS Health AI द्वारा तैयार
+एक सुरक्षित, समझने योग्य महिला स्वास्थ्य साथी
+{_RULE}""",
+
+    "sensitivity_heading": f"""
+उत्तर संवेदनशीलता (एक उत्तर बदलने पर क्या होगा)
+{_LINE}
+""",
+    "sensitivity_none": "किसी एक उत्तर को बदलने से जोखिम स्कोर कम नहीं होगा और पैटर्न नहीं बदलेगा।\n",
+    "sensitivity_row": "• {label}: {current} → {new_label}: स्कोर {base_score} → {risk_score} ({score_change}), "
+                       "{risk_level}, {pcos_type}\n",
+
+    "contributing_factors": (
+        "मासिक चक्र में उल्लेखनीय अनियमितता",
+        "मेटाबोलिक/इंसुलिन से जुड़े स्पष्ट संकेत",
+        "अधिक तनाव और एड्रिनल भार",
+        "एंड्रोजन से जुड़े स्पष्ट लक्षण",
+        "दर्द और सूजन के संकेत",
+    ),
+    "no_factors": "• कोई प्रमुख योगदान कारक नहीं मिला\n",
+    "default_reason": "पैटर्न आकलन",
+
+    "clinical_signals": (
+        ("मासिक चक्र अनियमितता", "↑ बढ़ा हुआ", "→ सामान्य सीमा में"),
+        ("तनाव और एड्रिनल भार", "↑ बढ़ा हुआ", "→ नियंत्रण योग्य सीमा में"),
+        ("मेटाबोलिक/इंसुलिन संकेत", "↑ बढ़ा हुआ", "→ कोई स्पष्ट संकेत नहीं"),
+        ("एंड्रोजन-संबंधी लक्षण", "↑ मौजूद", "→ न्यूनतम"),
+        ("सूजन के संकेत", "↑ मौजूद", "→ न्यूनतम"),
+    ),
+
+    "user_response_labels": (
+        "आयु", "मासिक चक्र की नियमितता", "मासिक धर्म में दर्द", "तनाव स्तर", "नींद की गुणवत्ता", "गतिविधि स्तर",
+    ),
+    "doctor_response_labels": (
+        "आयु", "मासिक चक्र पैटर्न", "मासिक धर्म में दर्द", "तनाव स्तर", "नींद की गुणवत्ता", "मूड में बदलाव",
+        "मीठा खाने की इच्छा", "वज़न में बदलाव", "बालों की वृद्धि", "गतिविधि स्तर", "आहार पैटर्न",
+    ),
+    "not_provided": "नहीं बताया गया",
+    "not_reported": "नहीं बताया गया",
+
+    # Engine and questionnaire text shown in the reports
+    "values": {
+        # Risk levels and patterns
+        "Low Risk": "कम जोखिम",
+        "Moderate Risk": "मध्यम जोखिम",
+        "High Risk": "उच्च जोखिम",
+        "Unknown": "अज्ञात",
+        "Low / Unclear PCOS Pattern": "कम / अस्पष्ट PCOS पैटर्न",
+        "Adrenal PCOS (Stress-driven)": "एड्रिनल PCOS (तनाव-जनित)",
+        "Insulin-Resistant PCOS": "इंसुलिन-प्रतिरोधी PCOS",
+        "Lean PCOS": "लीन PCOS",
+        "Inflammatory PCOS": "सूजन-संबंधी PCOS",
+        "Unclear": "अस्पष्ट",
+
+        # Explanations
+        "Your current responses do not strongly match a specific PCOS subtype.":
+            "आपके वर्तमान उत्तर किसी विशेष PCOS प्रकार से स्पष्ट रूप से मेल नहीं खाते।",
+        "Your symptoms indicate chronic stress and adrenal overload. "
+        "This PCOS type is often overlooked in standard diagnosis.":
+            "आपके लक्षण लंबे समय के तनाव और एड्रिनल अधिभार की ओर संकेत करते हैं। "
+            "सामान्य जाँच में PCOS का यह प्रकार अक्सर नज़रअंदाज़ हो जाता है।",
+        "Your responses suggest metabolic stress and insulin resistance, "
+        "one of the most common PCOS drivers.":
+            "आपके उत्तर मेटाबोलिक तनाव और इंसुलिन प्रतिरोध की ओर संकेत करते हैं, "
+            "जो PCOS के सबसे आम कारणों में से एक है।",
+        "Despite limited metabolic symptoms, cycle irregularities suggest "
+        "a hormonal imbalance typical of Lean PCOS.":
+            "मेटाबोलिक लक्षण कम होने के बावजूद, मासिक चक्र की अनियमितता "
+            "लीन PCOS जैसे हार्मोनल असंतुलन की ओर संकेत करती है।",
+        "Inflammation, pain, and fatigue dominate your symptom pattern.":
+            "आपके लक्षणों में सूजन, दर्द और थकान प्रमुख हैं।",
+        "No specific pattern detected.": "कोई विशेष पैटर्न नहीं मिला।",
+
+        # Doctor referral reasons
+        "overall high risk pattern": "कुल मिलाकर उच्च जोखिम वाला पैटर्न",
+        "severe pain with cycle irregularity": "मासिक चक्र की अनियमितता के साथ तेज़ दर्द",
+        "strong metabolic indicators": "स्पष्ट मेटाबोलिक संकेत",
+        "prolonged absence of periods": "लंबे समय तक मासिक धर्म न होना",
+        "significant androgen-related symptoms": "एंड्रोजन से जुड़े उल्लेखनीय लक्षण",
+
+        # Questions (sensitivity.FIELD_LABELS)
+        "Cycle regularity": "मासिक चक्र की नियमितता",
+        "Missed periods": "छूटे हुए मासिक धर्म",
+        "Period pain": "मासिक धर्म में दर्द",
+        "Stress level": "तनाव स्तर",
+        "Sleep quality": "नींद की गुणवत्ता",
+        "Mood changes": "मूड में बदलाव",
+        "Anxiety": "चिंता",
+        "Sugar cravings": "मीठा खाने की इच्छा",
+        "Weight changes": "वज़न में बदलाव",
+        "Diet pattern": "आहार पैटर्न",
+        "Activity level": "गतिविधि स्तर",
+        "Facial/body hair": "चेहरे/शरीर पर बाल",
+        "Acne": "मुँहासे",
+        "Hair loss": "बाल झड़ना",
+
+        # Answers (answer_encoding.ANSWER_OPTIONS)
+        "Regular (25–35 days)": "नियमित (२५–३५ दिन)",
+        "Irregular (varies frequently)": "अनियमित (अक्सर बदलता है)",
+        "Absent for months": "महीनों से नहीं हुआ",
+        "Absent or very irregular": "नहीं होता या बहुत अनियमित",
+        "No": "नहीं",
+        "Occasionally (once or twice)": "कभी-कभी (एक या दो बार)",
+        "Occasionally": "कभी-कभी",
+        "Frequently (three or more times)": "अक्सर (तीन या अधिक बार)",
+        "Frequently": "अक्सर",
+        "Haven't had a period": "मासिक धर्म नहीं हुआ",
+        "Sometimes": "कभी-कभी",
+        "Often": "अक्सर",
+        "Good": "अच्छी",
+        "Disturbed": "बाधित",
+        "Insomnia / very poor": "अनिद्रा / बहुत खराब",
+        "Poor/Insomnia": "खराब/अनिद्रा",
+        "Weight gain": "वज़न बढ़ना",
+        "Weight loss": "वज़न घटना",
+        "Fluctuates": "घटता-बढ़ता है",
+        "Balanced": "संतुलित",
+        "High sugar / processed": "अधिक चीनी / प्रोसेस्ड",
+        "Low-carb / controlled": "कम कार्ब / नियंत्रित",
+        "Irregular": "अनियमित",
+        "Sedentary": "निष्क्रिय",
+        "Lightly active": "थोड़ा सक्रिय",
+        "Moderately active": "मध्यम सक्रिय",
+        "Very active": "बहुत सक्रिय",
+        "Mild": "हल्का",
+        "Noticeable": "स्पष्ट",
+        "Significant": "अधिक",
+        "Moderate": "मध्यम",
+        "Severe": "गंभीर",
+    },
+}
+
+# Report text per locale code (see report_generator.LOCALES)
+REPORT_TEXT = {
+    "hi": HINDI,
+}
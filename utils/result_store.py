@@ -0,0 +1,301 @@
+"""
+Stored assessment results, tagged with the rule version that produced them.
+
+Each assessment is one JSON file under data/assessment_results/, holding the
+anonymous questionnaire answers and the result. Records are only written for
+users who opt in on the Health Check page, and never hold identifying details.
+Every result carries a "rule_version" (see decision_engine.current_rule_version()),
+so after a rule change only the stale records need re-scoring. The backfill job does that in
+chunks, saving its position after each chunk so an interrupted run resumes
+where it stopped. Records are replaced atomically (write to a temporary file,
+then rename), so a reader sees the old result until the new one is committed.
+
+Usage:
+    python -m utils.result_store status
+    python -m utils.result_store backfill [--chunk-size N] [--max-chunks N] [--pause SECONDS]
+"""
+
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from datetime import datetime
+
+from utils.decision_engine import current_rule_version, get_scoring_engine
+
+RESULTS_DIR = "data/assessment_results"
+CHECKPOINT_FILE = os.path.join(RESULTS_DIR, "_backfill.json")
+
+DEFAULT_CACHE_SIZE = 4096
+DEFAULT_CHUNK_SIZE = 500
+
+
+# -----------------------------
+# CURRENT-VERSION CACHE
+# -----------------------------
+class ResultCache:
+    """
+    LRU of results for the current rule version, keyed by all the answers given
+    (rule specs may read more than the scored fields, such as age or family_history).
+
+    Results are shared between callers with the same answers; treat them as read-only.
+    """
+
+    def __init__(self, maxsize=DEFAULT_CACHE_SIZE, mode=None):
+        """
+        Args:
+            maxsize: int - Results kept
+            mode: str (optional) - Engine mode, as for decision_engine.get_scoring_engine()
+        """
+        self.maxsize = maxsize
+        self.mode = mode
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._version = None
+        self._lock = threading.Lock()
+
+    def analyze(self, answers):
+        """
+        Result for one set of answers, scored once per rule version.
+
+        Args:
+            answers: dict - Same keys as analyze_pcos_signals() arguments
+
+        Returns:
+            dict: analyze_pcos_signals() result
+        """
+        version = current_rule_version(self.mode)
+        try:
+            key = frozenset(answers.items())
+        except TypeError:
+            return get_scoring_engine(self.mode)(**answers)
+
+        with self._lock:
+            if version != self._version:
+                # Rules changed: nothing cached is current any more
+                self._entries.clear()
+                self._version = version
+            result = self._entries.get(key)
+            if result is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return result
+
+        result = get_scoring_engine(self.mode)(**answers)
+        with self._lock:
+            self.misses += 1
+            if result.get("rule_version") == self._version:
+                self._entries[key] = result
+                if len(self._entries) > self.maxsize:
+                    self._entries.popitem(last=False)
+        return result
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_result_cache():
+    """Process-wide ResultCache for the configured engine mode."""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = ResultCache()
+    return _cache
+
+
+# -----------------------------
+# RECORDS
+# -----------------------------
+def _record_path(record_id):
+    return os.path.join(RESULTS_DIR, f"{record_id}.json")
+
+
+def _write_json(path, data):
+    """Write a JSON file atomically."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+
+def save_result(answers, result):
+    """
+    Store one assessment. Only call this for users who opted in to sharing
+    their anonymous answers.
+
+    Args:
+        answers: dict - Health Check answers
+        result: dict - Its analyze_pcos_signals() result
+
+    Returns:
+        str: Record id (ids sort in creation order)
+    """
+    record_id = f"{time.time_ns():x}-{uuid.uuid4().hex[:8]}"
+    _write_json(_record_path(record_id), {
+        "id": record_id,
+        "timestamp": datetime.now().isoformat(),
+        # Every answer, so the backfill can re-score with rule specs that read more fields
+        "answers": dict(answers),
+        "result": result,
+    })
+    return record_id
+
+
+def load_result(record_id):
+    """Stored record ({"id", "timestamp", "answers", "result"}), or None."""
+    try:
+        with open(_record_path(record_id), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return None
+
+
+def list_record_ids():
+    """All record ids, oldest first."""
+    try:
+        names = os.listdir(RESULTS_DIR)
+    except FileNotFoundError:
+        return []
+    return sorted(
+        name[:-5] for name in names
+        if name.endswith(".json") and not name.startswith("_")
+    )
+
+
+# -----------------------------
+# BACKFILL
+# -----------------------------
+def _load_checkpoint():
+    try:
+        with open(CHECKPOINT_FILE, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return {}
+
+
+def stale_count(version=None):
+    """
+    Count stored records whose result came from another rule version.
+
+    Returns:
+        tuple: (stale records, total records)
+    """
+    version = version or current_rule_version()
+    record_ids = list_record_ids()
+    stale = 0
+    for record_id in record_ids:
+        record = load_result(record_id)
+        if record is not None and record["result"].get("rule_version") != version:
+            stale += 1
+    return stale, len(record_ids)
+
+
+def backfill(chunk_size=DEFAULT_CHUNK_SIZE, max_chunks=None, pause=0.0, mode=None, progress=None):
+    """
+    Re-score stored records whose rule version is stale, one chunk at a time.
+
+    The position reached is saved after every chunk (per target rule version),
+    so a later call continues from there. Each record is replaced atomically.
+
+    Args:
+        chunk_size: int - Records examined per chunk
+        max_chunks: int (optional) - Stop after this many chunks
+        pause: float - Seconds to sleep between chunks, to leave I/O for the app
+        mode: str (optional) - Engine mode used for re-scoring
+        progress: callable (optional) - Called with the stats dict after every chunk
+
+    Returns:
+        dict: rule_version, scanned, rescored, remaining, seconds, records_per_sec, complete
+    """
+    version = current_rule_version(mode)
+    checkpoint = _load_checkpoint()
+    if checkpoint.get("rule_version") != version:
+        checkpoint = {"rule_version": version, "cursor": "", "scanned": 0, "rescored": 0, "seconds": 0.0}
+
+    pending = [record_id for record_id in list_record_ids() if record_id > checkpoint["cursor"]]
+    cache = ResultCache(mode=mode)
+    chunks = 0
+    stats = None
+
+    for start in range(0, len(pending), chunk_size):
+        chunk = pending[start:start + chunk_size]
+        started = time.perf_counter()
+        for record_id in chunk:
+            record = load_result(record_id)
+            if record is None or record["result"].get("rule_version") == version:
+                continue
+            record["result"] = cache.analyze(record["answers"])
+            record["rescored_at"] = datetime.now().isoformat()
+            _write_json(_record_path(record_id), record)
+            checkpoint["rescored"] += 1
+
+        checkpoint["cursor"] = chunk[-1]
+        checkpoint["scanned"] += len(chunk)
+        checkpoint["seconds"] += time.perf_counter() - started
+        _write_json(CHECKPOINT_FILE, checkpoint)
+
+        chunks += 1
+        stats = _backfill_stats(checkpoint, len(pending) - start - len(chunk))
+        if progress:
+            progress(stats)
+        if max_chunks is not None and chunks >= max_chunks:
+            return stats
+        if pause:
+            time.sleep(pause)
+
+    return stats or _backfill_stats(checkpoint, 0)
+
+
+def _backfill_stats(checkpoint, remaining):
+    seconds = checkpoint["seconds"]
+    return {
+        "rule_version": checkpoint["rule_version"],
+        "scanned": checkpoint["scanned"],
+        "rescored": checkpoint["rescored"],
+        "remaining": remaining,
+        "seconds": seconds,
+        "records_per_sec": checkpoint["scanned"] / seconds if seconds else 0.0,
+        "complete": remaining == 0,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="PCOS assessment result store")
+    parser.add_argument("command", choices=["status", "backfill"])
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+    parser.add_argument("--max-chunks", type=int, default=None)
+    parser.add_argument("--pause", type=float, default=0.0, help="seconds between chunks")
+    args = parser.parse_args(argv)
+
+    if args.command == "status":
+        version = current_rule_version()
+        stale, total = stale_count(version)
+        print(f"Rule version {version}: {total} records, {stale} stale")
+        checkpoint = _load_checkpoint()
+        if checkpoint:
+            print(f"Last backfill: version {checkpoint['rule_version']}, {checkpoint['rescored']} re-scored")
+        return 0
+
+    def report(stats):
+        print(
+            f"{stats['scanned']:,} scanned, {stats['rescored']:,} re-scored, "
+            f"{stats['remaining']:,} remaining ({stats['records_per_sec']:,.0f} records/sec)",
+            file=sys.stderr
+        )
+
+    stats = backfill(args.chunk_size, args.max_chunks, args.pause, progress=report)
+    state = "complete" if stats["complete"] else "paused (run again to resume)"
+    print(f"Backfill to {stats['rule_version']} {state}: {stats['rescored']:,} re-scored in {stats['seconds']:.1f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
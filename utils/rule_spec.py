@@ -0,0 +1,566 @@
+"""
+Declarative rule specification for the decision engine.
+
+A JSON rule spec (see utils/decision_rules.json) holds the answer weights,
+stress bands, PCOS subtype rules, risk bands and doctor-referral rules. It is
+compiled once into a generated Python scoring function, and the active rule set
+is swapped atomically when the file changes, so thresholds can be tuned
+without a deploy or a worker restart.
+
+Conditions are lists of [operand, operator, value] triples that must all hold.
+Operands are signal names, "total", "risk_level" or an answer flag such as
+"periods_absent".
+
+Usage:
+    python -m utils.rule_spec show [--path PATH]
+    python -m utils.rule_spec verify [--path PATH] [--sample N]
+    python -m utils.rule_spec bench [--path PATH] [--repeat N]
+"""
+
+import argparse
+import hashlib
+import json
+import logging
+import math
+import os
+import random
+import sys
+import threading
+import time
+from keyword import iskeyword
+
+from utils.answer_encoding import ANSWER_FIELDS, FIELD_WEIGHTS, SIGNAL_NAMES, decode_answer
+from utils.decision_engine import analyze_pcos_signals
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_RULES_PATH = os.path.join(os.path.dirname(__file__), "decision_rules.json")
+
+# Environment variable pointing at a rule spec file
+RULES_PATH_ENV = "PCOS_RULES_PATH"
+
+# How often get_active_rules() looks at the spec file's modification time
+RELOAD_CHECK_SECONDS = 2.0
+
+_OPERATORS = ("<", "<=", ">", ">=", "==", "!=")
+
+# Names used by the generated scoring function, which a field name must not shadow
+# (so are "_"-prefixed names and r0, r1, ...)
+_RESERVED_NAMES = frozenset(
+    ("stress_level", "flags", "total", "pcos_type", "explanation", "risk_level", "doctor_reasons",
+     "RULE_VERSION", "bool", "float", "int", "isinstance", "round", "TypeError")
+    + tuple(f"{name}_signal" for name in SIGNAL_NAMES)
+)
+
+
+class RuleSpecError(ValueError):
+    """Raised when a rule spec is malformed."""
+
+
+# -----------------------------
+# VALIDATION
+# -----------------------------
+def _require(condition, message):
+    if not condition:
+        raise RuleSpecError(message)
+
+
+def _is_number(value):
+    # JSON allows NaN and Infinity, which would compile to undefined names
+    return isinstance(value, (int, float)) and not isinstance(value, bool) and math.isfinite(value)
+
+
+def _check_weights(weights, where):
+    _require(isinstance(weights, dict), f"{where}: weights must be an object")
+    for name, value in weights.items():
+        _require(name in SIGNAL_NAMES, f"{where}: unknown signal '{name}'")
+        _require(isinstance(value, int) and not isinstance(value, bool),
+                 f"{where}: weight for '{name}' must be an integer")
+
+
+def _check_field_name(field):
+    _require(isinstance(field, str) and field.isidentifier() and not iskeyword(field),
+             f"Invalid field name {field!r}")
+    # Field names become parameters of the generated function, next to its own locals
+    _require(field not in _RESERVED_NAMES and not field.startswith("_")
+             and not (field[0] == "r" and field[1:].isdigit()),
+             f"Field name '{field}' is reserved")
+
+
+def _answer_flags(spec):
+    flags = []
+    for field in spec["fields"].values():
+        for answer in field["answers"]:
+            for flag in answer.get("flags", []):
+                if flag not in flags:
+                    flags.append(flag)
+    return flags
+
+
+def _check_conditions(conditions, operands, where):
+    """Check [operand, operator, value] triples; operands maps each operand to its value type."""
+    _require(isinstance(conditions, list) and conditions, f"{where}: 'when' must be a non-empty list")
+    for condition in conditions:
+        _require(isinstance(condition, list) and len(condition) == 3,
+                 f"{where}: each condition must be [operand, operator, value]")
+        operand, operator, value = condition
+        _require(isinstance(operand, str) and operand in operands, f"{where}: unknown operand {operand!r}")
+        _require(isinstance(operator, str) and operator in _OPERATORS, f"{where}: unknown operator {operator!r}")
+        kind = operands[operand]
+        if kind == "number":
+            _require(_is_number(value), f"{where}: '{operand}' must be compared with a number, not {value!r}")
+        elif kind == "flag":
+            _require(isinstance(value, bool), f"{where}: '{operand}' must be compared with true or false")
+        else:
+            _require(isinstance(value, str) and operator in ("==", "!="),
+                     f"{where}: '{operand}' can only be tested with == or != against a string")
+
+
+def validate_spec(spec):
+    """
+    Check a parsed rule spec, raising RuleSpecError on the first problem.
+
+    Args:
+        spec: dict - Parsed rule spec
+    """
+    _require(isinstance(spec, dict), "Rule spec must be a JSON object")
+    for key, kind in (("fields", dict), ("stress_bands", list), ("subtypes", list),
+                      ("default_subtype", dict), ("risk_bands", list), ("doctor_rules", list)):
+        _require(key in spec, f"Rule spec is missing '{key}'")
+        _require(isinstance(spec[key], kind), f"'{key}' must be a JSON {'object' if kind is dict else 'list'}")
+    _require(_is_number(spec.get("max_score", 20)) and spec.get("max_score", 20) > 0,
+             "max_score must be a positive number")
+
+    for field, entry in spec["fields"].items():
+        _check_field_name(field)
+        _require(isinstance(entry, dict), f"{field}: must be an object")
+        _require(isinstance(entry.get("answers"), list), f"{field}: 'answers' must be a list")
+        spellings = set()
+        for answer in entry["answers"]:
+            _require(isinstance(answer, dict), f"{field}: every answer must be an object")
+            _require(isinstance(answer.get("spellings"), list) and answer["spellings"],
+                     f"{field}: every answer needs a list of spellings")
+            for spelling in answer["spellings"]:
+                _require(isinstance(spelling, str), f"{field}: spellings must be strings")
+                _require(spelling not in spellings, f"{field}: duplicate spelling '{spelling}'")
+                spellings.add(spelling)
+            _check_weights(answer.get("weights", {}), field)
+            _require(isinstance(answer.get("flags", []), list), f"{field}: 'flags' must be a list")
+            for flag in answer.get("flags", []):
+                _require(isinstance(flag, str) and flag.isidentifier(), f"{field}: invalid flag {flag!r}")
+        _check_weights(entry.get("unanswered", {}), f"{field} (unanswered)")
+        _require(isinstance(entry.get("keywords", []), list), f"{field}: 'keywords' must be a list")
+        for keyword_rule in entry.get("keywords", []):
+            _require(isinstance(keyword_rule, dict), f"{field}: every keyword rule must be an object")
+            _require(keyword_rule.get("answer") in spellings, f"{field}: keyword answer must be a listed spelling")
+            words = keyword_rule.get("contains", [])
+            _require(isinstance(words, list) and all(isinstance(word, str) and word for word in words),
+                     f"{field}: keyword 'contains' must be a list of non-empty strings")
+
+    minimums = []
+    for band in spec["stress_bands"]:
+        _require(isinstance(band, dict) and _is_number(band.get("min")), "stress_bands: 'min' must be a number")
+        _check_weights(band.get("weights", {}), "stress_bands")
+        minimums.append(band["min"])
+    _require(minimums == sorted(minimums, reverse=True), "stress_bands must be listed highest first")
+
+    flags = _answer_flags(spec)
+    for name in flags:
+        _require(name not in SIGNAL_NAMES and name not in ("total", "risk_level"),
+                 f"Flag '{name}' shadows a signal operand")
+    signal_operands = dict.fromkeys(SIGNAL_NAMES + ("total",), "number")
+    signal_operands.update(dict.fromkeys(flags, "flag"))
+
+    for subtype in spec["subtypes"]:
+        _require(isinstance(subtype, dict) and isinstance(subtype.get("name"), str),
+                 "subtypes: every subtype needs a name")
+        _require(isinstance(subtype.get("explanation"), str), f"{subtype['name']}: missing explanation")
+        _check_conditions(subtype.get("when"), signal_operands, subtype["name"])
+    _require(isinstance(spec["default_subtype"].get("name"), str), "default_subtype needs a name")
+    _require(isinstance(spec["default_subtype"].get("explanation"), str), "default_subtype needs an explanation")
+
+    bands = spec["risk_bands"]
+    _require(bands and all(isinstance(band, dict) for band in bands), "risk_bands must be a list of objects")
+    _require("max_score" not in bands[-1], "The last risk band must have no max_score")
+    for band in bands:
+        _require(isinstance(band.get("level"), str), "risk_bands: every band needs a level")
+    _require(all("max_score" in band for band in bands[:-1]), "Every risk band but the last needs a max_score")
+    caps = [band["max_score"] for band in bands[:-1]]
+    _require(all(_is_number(cap) for cap in caps) and caps == sorted(caps),
+             "risk_bands must be listed in increasing max_score order")
+
+    doctor_operands = dict(signal_operands, risk_level="level")
+    for rule in spec["doctor_rules"]:
+        _require(isinstance(rule, dict) and isinstance(rule.get("reason"), str),
+                 "doctor_rules: every rule needs a reason")
+        _check_conditions(rule.get("when"), doctor_operands, rule["reason"])
+
+
+# -----------------------------
+# COMPILATION
+# -----------------------------
+class CompiledRuleSet:
+    """
+    An immutable, fully compiled rule set. Callers take one reference and use
+    it for a whole assessment, so a concurrent reload can never mix versions.
+    """
+
+    __slots__ = ("version", "fingerprint", "source", "analyze", "spec")
+
+    def __init__(self, version, fingerprint, source, analyze, spec):
+        self.version = version
+        self.fingerprint = fingerprint
+        self.source = source
+        self.analyze = analyze
+        self.spec = spec
+
+    def __repr__(self):
+        return f"CompiledRuleSet(version={self.version!r}, fingerprint={self.fingerprint!r})"
+
+
+def spec_fingerprint(spec):
+    """Stable hash of a rule spec's content."""
+    payload = json.dumps(spec, sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+
+
+def _weight_row(weights, flags, flag_names):
+    mask = 0
+    for flag in flags:
+        mask |= 1 << flag_names.index(flag)
+    return tuple(weights.get(name, 0) for name in SIGNAL_NAMES) + (mask,)
+
+
+def _operand_expression(operand, flag_names):
+    if operand in flag_names:
+        return f"bool(flags & {1 << flag_names.index(operand)})"
+    if operand == "total":
+        return "total"
+    if operand == "risk_level":
+        return "risk_level"
+    return f"{operand}_signal"
+
+
+def _condition_expression(conditions, flag_names):
+    return " and ".join(
+        f"{_operand_expression(operand, flag_names)} {operator} {value!r}"
+        for operand, operator, value in conditions
+    )
+
+
+def _make_fallback(entry, answer_rows, unanswered_row):
+    """Keyword matcher for free-text answers that are not an exact spelling."""
+    keywords = []
+    for keyword in entry.get("keywords", []):
+        case_sensitive = bool(keyword.get("case_sensitive"))
+        words = tuple(word if case_sensitive else word.lower() for word in keyword["contains"])
+        keywords.append((words, case_sensitive, answer_rows[keyword["answer"]]))
+
+    def fallback(value):
+        if keywords and isinstance(value, str) and value:
+            lowered = value.lower()
+            for words, case_sensitive, row in keywords:
+                text = value if case_sensitive else lowered
+                if any(word in text for word in words):
+                    return row
+        return unanswered_row
+
+    return fallback
+
+
+def compile_spec(spec):
+    """
+    Compile a rule spec into a generated scoring function.
+
+    Args:
+        spec: dict - Parsed rule spec
+
+    Returns:
+        CompiledRuleSet: .analyze takes the same keyword arguments as
+            analyze_pcos_signals() and returns the same result dict
+    """
+    validate_spec(spec)
+    flag_names = _answer_flags(spec)
+    fields = list(spec["fields"])
+    namespace = {}
+    lines = []
+    emit = lines.append
+
+    signature = ", ".join(f"{field}=None" for field in fields + ["stress_level"])
+    emit(f"def analyze({signature}, **_unused):")
+
+    # Answer weights: one dict lookup per field, keyword fallback on a miss
+    for i, field in enumerate(fields):
+        entry = spec["fields"][field]
+        unanswered_row = _weight_row(entry.get("unanswered", {}), [], flag_names)
+        answer_rows = {}
+        for answer in entry["answers"]:
+            row = _weight_row(answer.get("weights", {}), answer.get("flags", []), flag_names)
+            for spelling in answer["spellings"]:
+                answer_rows[spelling] = row
+        table = dict(answer_rows)
+        table[None] = unanswered_row
+        namespace[f"_table_{i}"] = table
+        namespace[f"_fallback_{i}"] = _make_fallback(entry, answer_rows, unanswered_row)
+        emit("    try:")
+        emit(f"        r{i} = _table_{i}.get({field})")
+        emit("    except TypeError:")
+        emit("        r{0} = {1!r}".format(i, unanswered_row))
+        emit(f"    if r{i} is None:")
+        emit(f"        r{i} = _fallback_{i}({field})")
+
+    # Stress slider bands
+    zero_row = _weight_row({}, [], flag_names)
+    stress_var = f"r{len(fields)}"
+    emit(f"    {stress_var} = {zero_row!r}")
+    emit("    if isinstance(stress_level, (int, float)):")
+    for j, band in enumerate(spec["stress_bands"]):
+        keyword = "if" if j == 0 else "elif"
+        emit(f"        {keyword} stress_level >= {band['min']!r}:")
+        emit(f"            {stress_var} = {_weight_row(band.get('weights', {}), [], flag_names)!r}")
+    if not spec["stress_bands"]:
+        emit("        pass")
+
+    rows = [f"r{i}" for i in range(len(fields) + 1)]
+    for k, name in enumerate(SIGNAL_NAMES):
+        emit(f"    {name}_signal = " + " + ".join(f"{row}[{k}]" for row in rows))
+    emit("    flags = " + " | ".join(f"{row}[{len(SIGNAL_NAMES)}]" for row in rows))
+    emit("    total = " + " + ".join(f"{name}_signal" for name in SIGNAL_NAMES))
+
+    # PCOS subtype: first matching rule wins
+    default = spec["default_subtype"]
+    for j, subtype in enumerate(spec["subtypes"]):
+        keyword = "if" if j == 0 else "elif"
+        emit(f"    {keyword} {_condition_expression(subtype['when'], flag_names)}:")
+        emit(f"        pcos_type = {subtype['name']!r}")
+        emit(f"        explanation = {subtype['explanation']!r}")
+    if spec["subtypes"]:
+        emit("    else:")
+        emit(f"        pcos_type = {default['name']!r}")
+        emit(f"        explanation = {default['explanation']!r}")
+    else:
+        emit(f"    pcos_type = {default['name']!r}")
+        emit(f"    explanation = {default['explanation']!r}")
+
+    # Risk bands
+    for j, band in enumerate(spec["risk_bands"]):
+        if "max_score" in band:
+            keyword = "if" if j == 0 else "elif"
+            emit(f"    {keyword} total <= {band['max_score']!r}:")
+            emit(f"        risk_level = {band['level']!r}")
+        elif j == 0:
+            emit(f"    risk_level = {band['level']!r}")
+        else:
+            emit("    else:")
+            emit(f"        risk_level = {band['level']!r}")
+
+    # Doctor referral rules, in order
+    emit("    doctor_reasons = []")
+    for rule in spec["doctor_rules"]:
+        emit(f"    if {_condition_expression(rule['when'], flag_names)}:")
+        emit(f"        doctor_reasons.append({rule['reason']!r})")
+
+    max_score = spec.get("max_score", 20)
+    emit("    return {")
+    emit("        'pcos_type': pcos_type,")
+    emit("        'explanation': explanation,")
+    emit("        'risk_score': total,")
+    emit("        'risk_level': risk_level,")
+    emit(f"        'confidence': round((total / {max_score!r}) * 100, 1),")
+    emit("        'signals': {")
+    for name in SIGNAL_NAMES:
+        emit(f"            {name!r}: {name}_signal,")
+    emit("        },")
+    emit("        'doctor_needed': bool(doctor_reasons),")
+    emit("        'doctor_reasons': doctor_reasons,")
+    emit("        'rule_version': RULE_VERSION,")
+    emit("    }")
+
+    source = "\n".join(lines) + "\n"
+    fingerprint = spec_fingerprint(spec)
+    namespace["RULE_VERSION"] = fingerprint
+    exec(compile(source, f"<rule spec {fingerprint}>", "exec"), namespace)
+    return CompiledRuleSet(
+        version=str(spec.get("version", "")),
+        fingerprint=fingerprint,
+        source=source,
+        analyze=namespace["analyze"],
+        spec=spec
+    )
+
+
+def load_spec(path=DEFAULT_RULES_PATH):
+    """Read and compile a rule spec file."""
+    with open(path, "r", encoding="utf-8") as f:
+        spec = json.load(f)
+    return compile_spec(spec)
+
+
+# -----------------------------
+# HOT RELOAD
+# -----------------------------
+_ACTIVE = None
+_ACTIVE_MTIME = None
+_NEXT_CHECK = 0.0
+_RELOAD_LOCK = threading.Lock()
+
+
+def rules_path():
+    """Rule spec file in use (PCOS_RULES_PATH or the bundled default)."""
+    return os.environ.get(RULES_PATH_ENV, DEFAULT_RULES_PATH)
+
+
+def get_active_rules():
+    """
+    Current compiled rule set, reloading it if the spec file changed.
+
+    The returned object is immutable; hold on to it for the duration of one
+    assessment. A spec that fails to parse or validate is logged and the
+    previous rule set stays active.
+    """
+    global _NEXT_CHECK
+    now = time.monotonic()
+    if _ACTIVE is None or now >= _NEXT_CHECK:
+        _NEXT_CHECK = now + RELOAD_CHECK_SECONDS
+        reload_rules()
+    return _ACTIVE
+
+
+def reload_rules(force=False):
+    """
+    Recompile the rule spec if its file changed and swap it in.
+
+    Args:
+        force: bool - Recompile even if the modification time is unchanged
+
+    Returns:
+        CompiledRuleSet: The active rule set after the check
+    """
+    global _ACTIVE, _ACTIVE_MTIME
+    path = rules_path()
+    with _RELOAD_LOCK:
+        try:
+            mtime = os.stat(path).st_mtime_ns
+        except OSError:
+            if _ACTIVE is None:
+                raise
+            logger.warning("Rule spec %s is unreadable; keeping version %s", path, _ACTIVE.version)
+            return _ACTIVE
+
+        if _ACTIVE is not None and mtime == _ACTIVE_MTIME and not force:
+            return _ACTIVE
+
+        try:
+            compiled = load_spec(path)
+            # A rule set that compiles can still fail when called; never swap one in
+            compiled.analyze()
+            compiled.analyze(stress_level=10)
+        except Exception as error:
+            # Anything a bad spec can raise, including while compiling or running the generated code
+            if _ACTIVE is None:
+                raise
+            logger.error("Rule spec %s rejected (%s); keeping version %s", path, error, _ACTIVE.version)
+            return _ACTIVE
+
+        # Single reference assignment: readers see either the old or the new set
+        _ACTIVE = compiled
+        _ACTIVE_MTIME = mtime
+        logger.info("Loaded rule spec %s version %s (%s)", path, compiled.version, compiled.fingerprint)
+        return _ACTIVE
+
+
+# -----------------------------
+# VERIFICATION & BENCHMARK
+# -----------------------------
+def _random_answers(rng):
+    answers = {
+        field: decode_answer(field, rng.randrange(len(FIELD_WEIGHTS[field])))
+        for field in ANSWER_FIELDS
+    }
+    answers["stress_level"] = rng.choice([None, "high", 0, 3, 3.5, 4, 6, 7, 8.5, 10])
+    return answers
+
+
+def verify_rules(rule_set, sample=100000, seed=0):
+    """
+    Compare a compiled rule set with analyze_pcos_signals() on random answers.
+
+    Returns:
+        tuple: (checked count, list of mismatching answer dicts)
+    """
+    rng = random.Random(seed)
+    mismatches = []
+    for _ in range(sample):
+        answers = _random_answers(rng)
+        expected = analyze_pcos_signals(**answers)
+        actual = rule_set.analyze(**answers)
+        # The spec covers the rules only, and tags results with its own version
+        expected.pop("ml_probability", None)
+        expected.pop("rule_version")
+        actual.pop("rule_version")
+        if actual != expected:
+            mismatches.append(answers)
+    return sample, mismatches
+
+
+def benchmark(rule_set, repeat=100000, seed=0):
+    """
+    Time the compiled rule set against analyze_pcos_signals().
+
+    Returns:
+        dict: Microseconds per call for each path, plus compile time in ms
+    """
+    rng = random.Random(seed)
+    answer_sets = [_random_answers(rng) for _ in range(1000)]
+    rounds = max(1, repeat // len(answer_sets))
+
+    def timed(fn):
+        start = time.perf_counter()
+        for _ in range(rounds):
+            for answers in answer_sets:
+                fn(**answers)
+        return (time.perf_counter() - start) / (rounds * len(answer_sets)) * 1e6
+
+    start = time.perf_counter()
+    compile_spec(rule_set.spec)
+    compile_ms = (time.perf_counter() - start) * 1e3
+
+    return {
+        "rules_us": timed(analyze_pcos_signals),
+        "compiled_us": timed(rule_set.analyze),
+        "compile_ms": compile_ms,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="PCOS decision rule spec")
+    parser.add_argument("command", choices=["show", "verify", "bench"])
+    parser.add_argument("--path", default=None, help="rule spec file (default: PCOS_RULES_PATH or bundled spec)")
+    parser.add_argument("--sample", type=int, default=100000)
+    parser.add_argument("--repeat", type=int, default=100000)
+    args = parser.parse_args(argv)
+
+    rule_set = load_spec(args.path or rules_path())
+
+    if args.command == "show":
+        print(f"# version {rule_set.version}, fingerprint {rule_set.fingerprint}")
+        print(rule_set.source)
+        return 0
+
+    if args.command == "verify":
+        checked, mismatches = verify_rules(rule_set, sample=args.sample)
+        for answers in mismatches[:10]:
+            print(f"MISMATCH: {answers}")
+        print(f"Checked {checked} answer sets, {len(mismatches)} mismatches")
+        return 1 if mismatches else 0
+
+    timings = benchmark(rule_set, repeat=args.repeat)
+    print(f"{'rules_us':>12}: {timings['rules_us']:.2f} µs/call")
+    print(f"{'compiled_us':>12}: {timings['compiled_us']:.2f} µs/call")
+    print(f"{'speedup':>12}: {timings['rules_us'] / timings['compiled_us']:.1f}x")
+    print(f"{'compile_ms':>12}: {timings['compile_ms']:.2f} ms")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,101 @@
+"""
+Incremental scoring for the Health Check live risk preview.
+
+A ScoringSession remembers the last answer, code and signal weights of every
+field. When an answer changes, only that field is re-encoded and only the
+signals its old and new answers touch are adjusted; the full result is rebuilt
+from the running totals the next time it is asked for.
+"""
+
+from utils.answer_encoding import (
+    ANSWER_FIELDS,
+    FIELD_WEIGHTS,
+    SIGNAL_NAMES,
+    encode_answer,
+)
+from utils.decision_engine import analyze_encoded_answers
+
+_FIELD_INDEX = {field: index for index, field in enumerate(ANSWER_FIELDS)}
+_MISSING = object()
+
+
+class ScoringSession:
+    """Running signal totals for one respondent, updated one field at a time."""
+
+    __slots__ = ("_answers", "_codes", "_signals", "_result")
+
+    def __init__(self, answers=None):
+        """
+        Args:
+            answers: dict (optional) - Initial answers; fields left out count as unanswered
+        """
+        self._answers = [_MISSING] * len(ANSWER_FIELDS)
+        self._codes = [0] * len(ANSWER_FIELDS)
+        self._signals = [0] * len(SIGNAL_NAMES)
+        for field in ANSWER_FIELDS:
+            row = FIELD_WEIGHTS[field][0]
+            for k, weight in enumerate(row):
+                self._signals[k] += weight
+        self._result = None
+        if answers:
+            self.update_many(answers)
+
+    def update(self, field, value):
+        """
+        Record one answer.
+
+        Args:
+            field: str - Questionnaire field; fields the engine does not score are ignored
+            value: str/int/float/None - The new answer
+
+        Returns:
+            tuple: Names of the signals whose score changed (empty if none)
+        """
+        index = _FIELD_INDEX.get(field)
+        if index is None or self._answers[index] == value:
+            return ()
+        self._answers[index] = value
+
+        code = encode_answer(field, value)
+        old_code = self._codes[index]
+        if code == old_code:
+            return ()
+        self._codes[index] = code
+
+        table = FIELD_WEIGHTS[field]
+        old_row, new_row = table[old_code], table[code]
+        changed = []
+        for k, (old, new) in enumerate(zip(old_row, new_row)):
+            if old != new:
+                self._signals[k] += new - old
+                changed.append(SIGNAL_NAMES[k])
+        if changed:
+            self._result = None
+        return tuple(changed)
+
+    def update_many(self, answers):
+        """
+        Record a full or partial answer dict, touching only fields whose answer differs.
+
+        Returns:
+            tuple: Names of the signals whose score changed
+        """
+        changed = set()
+        for field, value in answers.items():
+            changed.update(self.update(field, value))
+        return tuple(name for name in SIGNAL_NAMES if name in changed)
+
+    @property
+    def signals(self):
+        """Current signal scores by name."""
+        return dict(zip(SIGNAL_NAMES, self._signals))
+
+    def result(self):
+        """
+        The analyze_pcos_signals() result for the current answers (cached until a signal changes).
+
+        The result dict is shared between calls; copy it before modifying it.
+        """
+        if self._result is None:
+            self._result = analyze_encoded_answers(tuple(self._codes), tuple(self._signals))
+        return self._result
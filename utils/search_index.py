@@ -0,0 +1,540 @@
+"""
+BM25 search over the app's educational content.
+
+Passages come from the Learn Conditions, Resources & FAQ and Lifestyle Plan
+pages (read from their source, so the pages stay the single copy of the text)
+and from the prompt library. The index is built offline into a directory:
+index.json (terms, passages, parameters) and three .npy arrays holding the
+postings, each stored with its precomputed BM25 impact. At startup the
+arrays are memory-mapped; a query sums the impacts of its terms' postings,
+which takes a few NumPy operations per term and no network access.
+
+Every build goes into a new version directory under the index path, and the
+CURRENT file is then switched to it with an atomic rename, so files another
+process has memory-mapped are never overwritten. If no index can be loaded
+or built, the failure is logged and searches return no passages.
+
+Usage:
+    python -m utils.search_index build [--path DIR]
+    python -m utils.search_index query TEXT [--path DIR] [--limit N]
+    python -m utils.search_index bench [--path DIR] [--repeat N]
+"""
+
+import argparse
+import ast
+import hashlib
+import inspect
+import json
+import logging
+import math
+import os
+import re
+import shutil
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+from utils.prompt_library import PROMPTS
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_INDEX_PATH = "data/search_index"
+INDEX_FILE = "index.json"
+# Names the version directory in use, relative to the index path
+CURRENT_FILE = "CURRENT"
+# Version directories kept after a build (the current one and the one before it)
+KEEP_VERSIONS = 2
+INDEX_ARRAYS = ("offsets", "docs", "impacts")
+INDEX_FORMAT_VERSION = 1
+
+# BM25 term-frequency saturation and length normalization
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+_PAGES_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "pages")
+
+# (source name, page file) of the pages whose text is indexed
+PAGE_SOURCES = (
+    ("Learn Conditions", "4_📚_Learn_Conditions.py"),
+    ("Resources & FAQ", "9_📖_Resources_FAQ.py"),
+    ("Lifestyle Plan", "5_🌱_Lifestyle_Plan.py"),
+)
+PROMPT_SOURCE = "AI Assistant"
+
+_STOPWORDS = frozenset("""
+a about after all also am an and any are as at be been before being but by can could do does
+during each for from had has have how i if in into is it its just me more most my no not of on
+or other our over should so some such than that the their them then there these they this to
+too up very was we were what when where which while who why will with you your
+""".split())
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+_HTML_TAG = re.compile(r"<[^>]+>")
+_LEADING_SYMBOLS = re.compile(r"^[\W_]+")
+
+# st.* calls whose first argument is page text
+_TEXT_CALLS = frozenset(["markdown", "write", "success", "info", "warning", "error", "caption"])
+
+
+class SearchIndexError(ValueError):
+    """Raised when an index directory is missing, malformed or built from other content."""
+
+
+# -----------------------------
+# TOKENIZING
+# -----------------------------
+def _stem(token):
+    # Plurals only; enough to match "periods" with "period" without a stemmer library
+    if len(token) > 4 and token.endswith("ies"):
+        return token[:-3] + "y"
+    if len(token) > 3 and token.endswith("s") and not token.endswith(("ss", "us", "is")):
+        return token[:-1]
+    return token
+
+
+def tokenize(text):
+    """Lowercased, stemmed search terms of a text, stopwords removed."""
+    return [_stem(token) for token in _TOKEN.findall(text.lower()) if token not in _STOPWORDS]
+
+
+# -----------------------------
+# PASSAGES
+# -----------------------------
+def _clean_title(text):
+    return _LEADING_SYMBOLS.sub("", text.strip().lstrip("#")).strip().replace("**", "")
+
+
+def _page_passages(source, path):
+    """
+    Passages of one page: the text under each heading, with the enclosing
+    expander label in the title, plus literal lists and dicts of content
+    (FAQ items, tips, glossary terms).
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        tree = ast.parse(f.read())
+
+    passages = []
+    current = {"title": source, "lines": []}
+
+    def flush():
+        text = "\n".join(current["lines"]).strip()
+        if text:
+            passages.append({"title": current["title"], "text": text, "source": source})
+        current["lines"] = []
+
+    def heading(title, expander):
+        flush()
+        current["title"] = f"{expander} - {title}" if expander and title != expander else title
+
+    def add_text(text, expander):
+        text = inspect.cleandoc(text)
+        text = _HTML_TAG.sub("", text.replace("<li>", "- ").replace("<h3", "\n### <h3"))
+        for line in text.splitlines():
+            line = line.strip()
+            if line.startswith("#"):
+                heading(_clean_title(line), expander)
+            elif line == "---":
+                # A divider ends the section; text after it stands on its own
+                heading(expander or source, None)
+            elif line:
+                current["lines"].append(line)
+
+    def add_literal(value):
+        if isinstance(value, list) and value and all(isinstance(item, dict) for item in value):
+            for item in value:
+                if "question" in item and "answer" in item:
+                    passages.append({"title": item["question"], "text": item["answer"], "source": source})
+        elif isinstance(value, list) and all(isinstance(item, str) for item in value):
+            current["lines"].extend(f"- {item}" for item in value)
+        elif isinstance(value, dict) and all(isinstance(item, str) for item in value.values()):
+            for term, definition in value.items():
+                passages.append({"title": term, "text": definition, "source": source})
+
+    def expander_label(node):
+        for item in node.items:
+            call = item.context_expr
+            if (isinstance(call, ast.Call) and getattr(call.func, "attr", None) == "expander"
+                    and call.args and isinstance(call.args[0], ast.Constant)):
+                return _clean_title(call.args[0].value)
+        return None
+
+    def visit(statements, expander):
+        for node in statements:
+            if isinstance(node, ast.Assign):
+                try:
+                    add_literal(ast.literal_eval(node.value))
+                except ValueError:
+                    pass
+            elif isinstance(node, ast.With):
+                label = expander_label(node)
+                if label:
+                    outer_title = current["title"]
+                    heading(label, None)
+                    visit(node.body, label)
+                    heading(outer_title, None)
+                else:
+                    visit(node.body, expander)
+            elif isinstance(node, (ast.If, ast.For)):
+                visit(node.body, expander)
+                visit(node.orelse, expander)
+            elif isinstance(node, ast.Expr) and isinstance(node.value, ast.Call):
+                call = node.value
+                if (getattr(call.func, "attr", None) in _TEXT_CALLS and call.args
+                        and isinstance(call.args[0], ast.Constant) and isinstance(call.args[0].value, str)):
+                    add_text(call.args[0].value, expander)
+
+    visit(tree.body, None)
+    flush()
+    return passages
+
+
+def _prompt_passages():
+    """One passage per distinct prompt-library question, with its answer options and concern category."""
+    passages = []
+    seen = set()
+    for categories in PROMPTS.values():
+        for questions in categories.values():
+            for question in questions:
+                options = question.get("options") or []
+                key = (question["text"], tuple(map(str, options)))
+                # Slider options are its range, not answers worth matching
+                if key in seen or not options or question.get("type") == "slider":
+                    continue
+                seen.add(key)
+                passages.append({
+                    "title": question["text"],
+                    "text": "\n".join(f"- {option}" for option in key[1]),
+                    "source": PROMPT_SOURCE,
+                    "category": question.get("category"),
+                })
+    return passages
+
+
+def collect_passages(pages_dir=_PAGES_DIR):
+    """Every indexed passage, in index order."""
+    passages = []
+    for source, filename in PAGE_SOURCES:
+        passages.extend(_page_passages(source, os.path.join(pages_dir, filename)))
+    passages.extend(_prompt_passages())
+    return passages
+
+
+def content_fingerprint(pages_dir=_PAGES_DIR):
+    """Hash of the indexed content and index settings; a changed page or prompt means a rebuild."""
+    digest = hashlib.sha256()
+    digest.update(json.dumps([INDEX_FORMAT_VERSION, BM25_K1, BM25_B]).encode("utf-8"))
+    for _, filename in PAGE_SOURCES:
+        with open(os.path.join(pages_dir, filename), "rb") as f:
+            digest.update(f.read())
+    digest.update(json.dumps(PROMPTS, sort_keys=True, default=dict).encode("utf-8"))
+    return digest.hexdigest()[:16]
+
+
+# -----------------------------
+# BUILD
+# -----------------------------
+def build_index(passages):
+    """
+    Postings with precomputed BM25 impacts.
+
+    Returns:
+        tuple: (terms, arrays) - Sorted term list, and "offsets" (term i's
+            postings are docs/impacts[offsets[i]:offsets[i + 1]]), "docs" and "impacts"
+    """
+    documents = [tokenize(f"{passage['title']} {passage['text']}") for passage in passages]
+    n_docs = len(documents)
+    avg_length = sum(map(len, documents)) / n_docs if n_docs else 0.0
+
+    postings = {}
+    for doc, tokens in enumerate(documents):
+        counts = {}
+        for token in tokens:
+            counts[token] = counts.get(token, 0) + 1
+        norm = BM25_K1 * (1 - BM25_B + BM25_B * len(tokens) / avg_length) if avg_length else BM25_K1
+        for token, tf in counts.items():
+            postings.setdefault(token, []).append((doc, tf * (BM25_K1 + 1) / (tf + norm)))
+
+    terms = sorted(postings)
+    offsets = [0]
+    docs = []
+    impacts = []
+    for term in terms:
+        entries = postings[term]
+        idf = math.log(1 + (n_docs - len(entries) + 0.5) / (len(entries) + 0.5))
+        for doc, weight in entries:
+            docs.append(doc)
+            impacts.append(idf * weight)
+        offsets.append(len(docs))
+
+    return terms, {
+        "offsets": np.array(offsets, dtype=np.int32),
+        "docs": np.array(docs, dtype=np.int32),
+        "impacts": np.array(impacts, dtype=np.float32),
+    }
+
+
+def save_index(path, terms, arrays, passages, fingerprint):
+    """
+    Write an index into a new version directory under path and make it current.
+
+    The files are complete before CURRENT is switched to the new directory
+    (written to a temporary file, then renamed), so readers see either the old
+    or the new index, and the old files are never modified in place.
+
+    Returns:
+        str: The new version directory
+    """
+    os.makedirs(path, exist_ok=True)
+    build_dir = tempfile.mkdtemp(prefix="build-", dir=path)
+    try:
+        for name in INDEX_ARRAYS:
+            np.save(os.path.join(build_dir, f"{name}.npy"), np.ascontiguousarray(arrays[name]))
+        meta = {
+            "format_version": INDEX_FORMAT_VERSION,
+            "fingerprint": fingerprint,
+            "terms": terms,
+            "passages": passages,
+        }
+        with open(os.path.join(build_dir, INDEX_FILE), "w", encoding="utf-8") as f:
+            json.dump(meta, f, ensure_ascii=False)
+
+        version = f"v-{fingerprint}-{time.time_ns():x}"
+        os.replace(build_dir, os.path.join(path, version))
+    except BaseException:
+        shutil.rmtree(build_dir, ignore_errors=True)
+        raise
+
+    fd, tmp_path = tempfile.mkstemp(prefix=CURRENT_FILE + ".", suffix=".tmp", dir=path)
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        f.write(version)
+    os.replace(tmp_path, os.path.join(path, CURRENT_FILE))
+    _prune_versions(path, version)
+    return os.path.join(path, version)
+
+
+def _prune_versions(path, current):
+    """Delete all but the KEEP_VERSIONS newest version directories (never the current one)."""
+    versions = sorted(
+        (name for name in os.listdir(path) if name.startswith("v-") and name != current),
+        key=lambda name: name.rsplit("-", 1)[-1].rjust(20, "0"),
+        reverse=True
+    )
+    for name in versions[KEEP_VERSIONS - 1:]:
+        shutil.rmtree(os.path.join(path, name), ignore_errors=True)
+
+
+def _current_dir(path):
+    """Version directory CURRENT points at; path itself for an index saved before versioning."""
+    try:
+        with open(os.path.join(path, CURRENT_FILE), "r", encoding="utf-8") as f:
+            version = f.read().strip()
+    except FileNotFoundError:
+        return path
+    except OSError as e:
+        raise SearchIndexError(f"Cannot read {CURRENT_FILE} in {path}: {e}") from e
+    return os.path.join(path, version)
+
+
+# -----------------------------
+# SEARCH
+# -----------------------------
+class SearchIndex:
+    """Memory-mapped BM25 index over the collected passages."""
+
+    def __init__(self, terms, arrays, passages, fingerprint=None):
+        self.fingerprint = fingerprint
+        self.passages = tuple(passages)
+        self._term_ids = {term: i for i, term in enumerate(terms)}
+        self._offsets = arrays["offsets"].tolist()
+        self._docs = arrays["docs"]
+        self._impacts = arrays["impacts"]
+
+    def __len__(self):
+        return len(self.passages)
+
+    def scores(self, query):
+        """BM25 score of every passage for a free-text query (float32 array)."""
+        scores = np.zeros(len(self.passages), dtype=np.float32)
+        offsets = self._offsets
+        for term_id in {self._term_ids.get(token) for token in tokenize(query)}:
+            if term_id is not None:
+                start, end = offsets[term_id], offsets[term_id + 1]
+                scores[self._docs[start:end]] += self._impacts[start:end]
+        return scores
+
+    def search(self, query, limit=3):
+        """
+        The passages most relevant to a free-text query.
+
+        Args:
+            query: str - Free text, e.g. the answer to "What's your main concern?"
+            limit: int - Maximum number of passages
+
+        Returns:
+            list: [{"title", "text", "source", "score"}] best first; empty if nothing matches
+        """
+        scores = self.scores(query)
+        if limit < len(scores):
+            candidates = np.argpartition(-scores, limit)[:limit]
+        else:
+            candidates = np.arange(len(scores))
+        ranked = sorted(candidates.tolist(), key=lambda doc: (-scores[doc], doc))
+        return [
+            dict(self.passages[doc], score=float(scores[doc]))
+            for doc in ranked if scores[doc] > 0
+        ]
+
+
+def load_index(path=DEFAULT_INDEX_PATH):
+    """
+    Memory-map the current index under an index path.
+
+    Raises:
+        SearchIndexError: If the directory is missing or malformed
+    """
+    path = _current_dir(path)
+    try:
+        with open(os.path.join(path, INDEX_FILE), "r", encoding="utf-8") as f:
+            meta = json.load(f)
+    except (OSError, ValueError) as e:
+        raise SearchIndexError(f"Cannot read search index at {path}: {e}") from e
+    if meta.get("format_version") != INDEX_FORMAT_VERSION:
+        raise SearchIndexError(f"Search index at {path} has an unsupported format")
+
+    arrays = {}
+    for name in INDEX_ARRAYS:
+        try:
+            arrays[name] = np.load(os.path.join(path, f"{name}.npy"), mmap_mode="r")
+        except (OSError, ValueError) as e:
+            raise SearchIndexError(f"Cannot read {name}.npy in {path}: {e}") from e
+
+    return SearchIndex(meta["terms"], arrays, meta["passages"], fingerprint=meta.get("fingerprint"))
+
+
+def rebuild_index(path=DEFAULT_INDEX_PATH):
+    """Collect the passages, build the index and make it the current one under path."""
+    passages = collect_passages()
+    terms, arrays = build_index(passages)
+    save_index(path, terms, arrays, passages, content_fingerprint())
+    return load_index(path)
+
+
+def empty_index():
+    """An index without passages; every search returns []."""
+    arrays = {
+        "offsets": np.zeros(1, dtype=np.int32),
+        "docs": np.zeros(0, dtype=np.int32),
+        "impacts": np.zeros(0, dtype=np.float32),
+    }
+    return SearchIndex([], arrays, [])
+
+
+# Seconds before an unavailable index is loaded or built again
+RETRY_AFTER = 60.0
+
+_INDEX = None
+_INDEX_GENERATION = 0
+_RETRY_AT = None
+
+
+def get_search_index(path=DEFAULT_INDEX_PATH):
+    """
+    Process-wide search index. Memory-maps it from disk, or builds and swaps
+    in a new version when it is missing or was built from different content.
+    Any failure is logged and leaves an empty index, so callers still work;
+    it is tried again after RETRY_AFTER seconds.
+    """
+    global _INDEX, _INDEX_GENERATION, _RETRY_AT
+    if _INDEX is None or (_RETRY_AT is not None and time.monotonic() >= _RETRY_AT):
+        _RETRY_AT = None
+        try:
+            index = load_index(path)
+            if index.fingerprint != content_fingerprint():
+                raise SearchIndexError("Search index was built from different content")
+        except SearchIndexError as error:
+            logger.info("Rebuilding the search index at %s (%s)", path, error)
+            try:
+                index = rebuild_index(path)
+            except Exception:
+                logger.exception("Search index at %s unavailable; searches return no passages", path)
+                index = empty_index()
+                _RETRY_AT = time.monotonic() + RETRY_AFTER
+        except Exception:
+            logger.exception("Search index at %s unavailable; searches return no passages", path)
+            index = empty_index()
+            _RETRY_AT = time.monotonic() + RETRY_AFTER
+        _INDEX = index
+        _INDEX_GENERATION += 1
+    return _INDEX
+
+
+def index_generation():
+    """
+    Number that changes whenever get_search_index() loads or swaps in an index;
+    part of the key of any cache holding search results.
+    """
+    return _INDEX_GENERATION
+
+
+def search(query, limit=3):
+    """The passages most relevant to a free-text query (see SearchIndex.search())."""
+    return get_search_index().search(query, limit)
+
+
+# -----------------------------
+# CLI
+# -----------------------------
+BENCH_QUERIES = (
+    "my periods are irregular and I have acne",
+    "severe pain during periods, is that endometriosis?",
+    "how much sleep do I need and does stress matter",
+    "is my data stored",
+    "sugar cravings and weight gain",
+    "hair thinning",
+)
+
+
+def benchmark(index, repeat=20000):
+    """Mean query time in µs over BENCH_QUERIES."""
+    start = time.perf_counter()
+    for i in range(repeat):
+        index.search(BENCH_QUERIES[i % len(BENCH_QUERIES)])
+    return (time.perf_counter() - start) / repeat * 1e6
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="BM25 search index over the app's educational content")
+    parser.add_argument("command", choices=["build", "query", "bench"])
+    parser.add_argument("text", nargs="?", help="query: free text to search for")
+    parser.add_argument("--path", default=DEFAULT_INDEX_PATH)
+    parser.add_argument("--limit", type=int, default=3)
+    parser.add_argument("--repeat", type=int, default=20000)
+    args = parser.parse_args(argv)
+
+    if args.command == "build":
+        start = time.perf_counter()
+        index = rebuild_index(args.path)
+        print(
+            f"Indexed {len(index)} passages / {len(index._term_ids)} terms "
+            f"in {(time.perf_counter() - start) * 1000:.0f} ms -> {args.path}"
+        )
+        return 0
+
+    index = get_search_index(args.path)
+
+    if args.command == "query":
+        if not args.text:
+            parser.error("query needs text")
+        for passage in index.search(args.text, args.limit):
+            print(f"{passage['score']:6.2f}  [{passage['source']}] {passage['title']}")
+            print("        " + passage["text"].replace("\n", "\n        "))
+        return 0
+
+    print(f"query: {benchmark(index, args.repeat):.1f} µs")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,126 @@
+"""
+What-if sensitivity analysis for a single assessment.
+
+Answers "which single answer change would move this result?" by building
+every one-field perturbation of a respondent's answers, scoring them all in
+one vectorized batch and ranking them by how much they lower the risk.
+"""
+
+import numpy as np
+
+from utils.answer_encoding import (
+    ANSWER_FIELDS,
+    FIELD_OPTIONS,
+    STRESS_BANDS,
+    encode_answers,
+)
+from utils.batch_engine import analyze_codes_batch
+from utils.decision_engine import analyze_encoded_answers
+
+# Plain-language name of each scored field, for tables and reports
+FIELD_LABELS = {
+    "cycle_length": "Cycle regularity",
+    "missed_periods": "Missed periods",
+    "period_pain": "Period pain",
+    "stress_level": "Stress level",
+    "sleep_quality": "Sleep quality",
+    "mood_changes": "Mood changes",
+    "anxiety": "Anxiety",
+    "sugar_cravings": "Sugar cravings",
+    "weight_change": "Weight changes",
+    "diet_pattern": "Diet pattern",
+    "activity_level": "Activity level",
+    "facial_hair": "Facial/body hair",
+    "acne": "Acne",
+    "hair_loss": "Hair loss",
+}
+
+RISK_LEVEL_ORDER = {"Low Risk": 0, "Moderate Risk": 1, "High Risk": 2}
+
+
+def _stress_labels():
+    # Stress codes 1.. are "below the lowest band", then each band lowest first
+    minima = sorted(minimum for minimum, _ in STRESS_BANDS)
+    bounds = [0] + minima + [11]
+    return (None,) + tuple(
+        f"{low}–{high - 1}" if high - 1 > low else str(low)
+        for low, high in zip(bounds, bounds[1:])
+    )
+
+
+_STRESS_LABELS = _stress_labels()
+
+
+def answer_label(field, code):
+    """Display text for an answer code (stress codes are shown as ranges)."""
+    if field == "stress_level":
+        return _STRESS_LABELS[code]
+    return FIELD_OPTIONS[field][code]
+
+
+def _perturbations(codes, fields):
+    """(field index, new code) for every other recognised answer of every field."""
+    candidates = []
+    for field_index, field in enumerate(ANSWER_FIELDS):
+        if fields is not None and field not in fields:
+            continue
+        for code in range(1, len(FIELD_OPTIONS[field])):
+            if code != codes[field_index]:
+                candidates.append((field_index, code))
+    return candidates
+
+
+def analyze_sensitivity(answers, fields=None):
+    """
+    Score every single-field change to a set of answers.
+
+    Args:
+        answers: dict - Health Check answers (same keys as analyze_pcos_signals arguments)
+        fields: iterable (optional) - Only perturb these fields (default: every scored field)
+
+    Returns:
+        list[dict]: One row per alternative answer, most risk-reducing first:
+            field, label, current_answer, new_answer (a value analyze_pcos_signals accepts),
+            new_label, risk_score, score_change, risk_level, level_change (steps, negative
+            is lower risk), pcos_type, type_changed
+    """
+    base_codes = encode_answers(answers)
+    baseline = analyze_encoded_answers(base_codes)
+    fields = None if fields is None else frozenset(fields)
+
+    candidates = _perturbations(base_codes, fields)
+    if not candidates:
+        return []
+
+    field_indices = np.array([field_index for field_index, _ in candidates], dtype=np.intp)
+    new_codes = np.array([code for _, code in candidates], dtype=np.intp)
+    matrix = np.tile(np.array(base_codes, dtype=np.intp), (len(candidates), 1))
+    matrix[np.arange(len(candidates)), field_indices] = new_codes
+    batch = analyze_codes_batch(matrix)
+
+    base_score = baseline["risk_score"]
+    base_level = RISK_LEVEL_ORDER.get(baseline["risk_level"], 0)
+    base_type = baseline["pcos_type"]
+
+    rows = []
+    scores = batch["risk_score"].tolist()
+    for i, (field_index, code) in enumerate(candidates):
+        field = ANSWER_FIELDS[field_index]
+        risk_level = batch["risk_level"][i]
+        pcos_type = batch["pcos_type"][i]
+        rows.append({
+            "field": field,
+            "label": FIELD_LABELS[field],
+            "current_answer": answers.get(field),
+            "new_answer": FIELD_OPTIONS[field][code],
+            "new_label": answer_label(field, code),
+            "risk_score": scores[i],
+            "score_change": scores[i] - base_score,
+            "risk_level": risk_level,
+            "level_change": RISK_LEVEL_ORDER.get(risk_level, 0) - base_level,
+            "pcos_type": pcos_type,
+            "type_changed": pcos_type != base_type,
+        })
+
+    rows.sort(key=lambda row: (row["level_change"], row["score_change"], not row["type_changed"]))
+    return rows
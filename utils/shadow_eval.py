@@ -0,0 +1,250 @@
+"""
+Shadow evaluation of a candidate rule spec on live Health Check submissions.
+
+Production results are computed and shown exactly as before. A sample of
+submissions is handed to a background thread through a bounded queue; when the
+queue is full the submission is dropped, so the user's rerun never waits. The
+worker scores each one with the candidate rules and counts where the candidate
+disagrees with production: PCOS type flips, risk band changes and doctor-flag
+changes. Statistics are periodically written to a JSON file.
+
+Enable by pointing PCOS_SHADOW_RULES_PATH at a candidate spec file.
+
+Usage:
+    python -m utils.shadow_eval show [--path STATS_FILE]
+"""
+
+import argparse
+import json
+import logging
+import os
+import queue
+import random
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+
+from utils.rule_spec import load_spec
+
+logger = logging.getLogger(__name__)
+
+# Candidate spec file; shadow mode is off when unset
+SHADOW_RULES_ENV = "PCOS_SHADOW_RULES_PATH"
+# Fraction of submissions evaluated (default 1.0)
+SHADOW_SAMPLE_RATE_ENV = "PCOS_SHADOW_SAMPLE_RATE"
+
+DEFAULT_STATS_PATH = "data/shadow_stats.json"
+DEFAULT_QUEUE_SIZE = 1000
+
+# Statistics are written to disk after this many evaluations
+DUMP_EVERY = 100
+
+
+class ShadowEvaluator:
+    """Background comparison of a candidate rule set against production results."""
+
+    def __init__(self, candidate, sample_rate=1.0, queue_size=DEFAULT_QUEUE_SIZE,
+                 stats_path=DEFAULT_STATS_PATH):
+        """
+        Args:
+            candidate: rule_spec.CompiledRuleSet - Rules under evaluation
+            sample_rate: float - Fraction of submissions to evaluate
+            queue_size: int - Pending submissions held before new ones are dropped
+            stats_path: str (optional) - JSON file the statistics are written to
+        """
+        self.candidate = candidate
+        self.sample_rate = sample_rate
+        self.stats_path = stats_path
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._lock = threading.Lock()
+        self._started = time.time()
+
+        self._submitted = 0
+        self._sampled = 0
+        self._dropped = 0
+        self._evaluated = 0
+        self._errors = 0
+        self._agreements = 0
+        self._type_flips = Counter()
+        self._risk_changes = Counter()
+        self._doctor_changes = Counter()
+        self._score_delta_total = 0
+
+        self._thread = threading.Thread(target=self._run, name="shadow-evaluator", daemon=True)
+        self._thread.start()
+
+    def submit(self, answers, production_result):
+        """
+        Offer one submission for shadow scoring. Never blocks.
+
+        Args:
+            answers: dict - The answers production scored
+            production_result: dict - The result production returned
+
+        Returns:
+            bool: True if the submission was queued
+        """
+        # Counters updated here without the lock are best-effort; a lost
+        # increment under contention is preferable to making the caller wait
+        self._submitted += 1
+        if self.sample_rate < 1.0 and random.random() >= self.sample_rate:
+            return False
+        self._sampled += 1
+        try:
+            self._queue.put_nowait((dict(answers), production_result))
+        except queue.Full:
+            self._dropped += 1
+            return False
+        return True
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                break
+            answers, production = item
+            try:
+                shadow = self.candidate.analyze(**answers)
+            except Exception:
+                logger.exception("Shadow rules %s failed on a submission", self.candidate.version)
+                with self._lock:
+                    self._errors += 1
+                continue
+            self._record(production, shadow)
+            if self.stats_path and self._evaluated % DUMP_EVERY == 0:
+                self._dump_logged()
+
+    def _record(self, production, shadow):
+        with self._lock:
+            self._evaluated += 1
+            agree = True
+            if shadow["pcos_type"] != production["pcos_type"]:
+                self._type_flips[f"{production['pcos_type']} -> {shadow['pcos_type']}"] += 1
+                agree = False
+            if shadow["risk_level"] != production["risk_level"]:
+                self._risk_changes[f"{production['risk_level']} -> {shadow['risk_level']}"] += 1
+                agree = False
+            if shadow["doctor_needed"] != production["doctor_needed"]:
+                self._doctor_changes["turned on" if shadow["doctor_needed"] else "turned off"] += 1
+                agree = False
+            self._score_delta_total += shadow["risk_score"] - production["risk_score"]
+            if agree:
+                self._agreements += 1
+
+    def stats(self):
+        """Snapshot of the disagreement statistics."""
+        with self._lock:
+            evaluated = self._evaluated
+            return {
+                "candidate_version": self.candidate.version,
+                "candidate_fingerprint": self.candidate.fingerprint,
+                "started": datetime.fromtimestamp(self._started).isoformat(timespec="seconds"),
+                "updated": datetime.now().isoformat(timespec="seconds"),
+                "submitted": self._submitted,
+                "sampled": self._sampled,
+                "dropped": self._dropped,
+                "pending": self._queue.qsize(),
+                "evaluated": evaluated,
+                "errors": self._errors,
+                "agreement_rate": self._agreements / evaluated if evaluated else None,
+                "type_flips": dict(self._type_flips.most_common()),
+                "risk_band_changes": dict(self._risk_changes.most_common()),
+                "doctor_flag_changes": dict(self._doctor_changes),
+                "mean_score_delta": self._score_delta_total / evaluated if evaluated else None,
+            }
+
+    def dump(self, path=None):
+        """Write stats() to a JSON file atomically."""
+        path = path or self.stats_path
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.stats(), f, indent=2)
+        os.replace(tmp_path, path)
+
+    def _dump_logged(self):
+        """dump() for the worker and stop(): a failed write is logged, never raised."""
+        try:
+            self.dump()
+        except Exception:
+            logger.exception("Writing shadow statistics to %s failed", self.stats_path)
+
+    def stop(self, timeout=5.0):
+        """Finish queued submissions (up to timeout), stop the worker and write the stats."""
+        try:
+            self._queue.put(None, timeout=timeout)
+        except queue.Full:
+            pass
+        self._thread.join(timeout)
+        if self.stats_path:
+            self._dump_logged()
+
+
+_evaluator = None
+_evaluator_loaded = False
+_evaluator_lock = threading.Lock()
+
+
+def get_shadow_evaluator():
+    """
+    The process-wide shadow evaluator, or None when shadow mode is off.
+
+    A candidate spec or setting that fails to load is logged and shadow mode
+    stays off; production scoring is never affected.
+    """
+    global _evaluator, _evaluator_loaded
+    if _evaluator_loaded:
+        return _evaluator
+    with _evaluator_lock:
+        if not _evaluator_loaded:
+            path = os.environ.get(SHADOW_RULES_ENV)
+            if path:
+                try:
+                    candidate = load_spec(path)
+                    sample_rate = float(os.environ.get(SHADOW_SAMPLE_RATE_ENV, "1.0"))
+                    _evaluator = ShadowEvaluator(candidate, sample_rate=sample_rate)
+                    logger.info("Shadow evaluation of %s (version %s) enabled", path, candidate.version)
+                except Exception:
+                    # Whatever goes wrong, shadow mode stays off and is not retried per request
+                    logger.exception("Shadow rule spec %s rejected; shadow mode off", path)
+            _evaluator_loaded = True
+    return _evaluator
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="PCOS shadow rule evaluation")
+    parser.add_argument("command", choices=["show"])
+    parser.add_argument("--path", default=DEFAULT_STATS_PATH, help="statistics file")
+    args = parser.parse_args(argv)
+
+    try:
+        with open(args.path, "r", encoding="utf-8") as f:
+            stats = json.load(f)
+    except OSError:
+        print(f"No shadow statistics at {args.path}")
+        return 1
+
+    print(f"Candidate version {stats['candidate_version']} ({stats['candidate_fingerprint']})")
+    print(f"Since {stats['started']}, updated {stats['updated']}")
+    print(
+        f"Submitted {stats['submitted']}, sampled {stats['sampled']}, dropped {stats['dropped']}, "
+        f"evaluated {stats['evaluated']}, errors {stats['errors']}"
+    )
+    if stats["agreement_rate"] is not None:
+        print(f"Agreement: {stats['agreement_rate']:.1%}, mean score delta {stats['mean_score_delta']:+.2f}")
+    for title, key in (
+        ("Type flips", "type_flips"),
+        ("Risk band changes", "risk_band_changes"),
+        ("Doctor flag changes", "doctor_flag_changes"),
+    ):
+        if stats[key]:
+            print(f"\n{title}:")
+            for change, count in stats[key].items():
+                print(f"  {count:>6}  {change}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,333 @@
+"""
+Streaming export of doctor summaries into a ZIP or tar.gz archive.
+
+Partner clinics send questionnaire dumps (CSV or JSONL, as for bulk_scoring)
+and get back one doctor summary per patient. Records are read in chunks; each
+chunk is scored and rendered in a worker process, which also does the
+expensive part of archiving: deflating every summary (ZIP) or building and
+gzip-compressing the chunk's tar blocks (tar.gz, one gzip member per chunk).
+The parent process only appends the finished bytes to the output in order, so
+the output can be any writable stream (a file, stdout, an HTTP response body)
+and is never seeked. Memory stays flat: a bounded window of chunks is in
+flight, and the ZIP central directory is spooled to a temporary file rather
+than held in memory.
+
+Usage:
+    python -m utils.summary_export INPUT OUTPUT.zip|OUTPUT.tar.gz [--workers N]
+                                   [--chunk-size N] [--id-column COLUMN]
+    (OUTPUT "-" writes to stdout; pass --archive-format)
+"""
+
+import argparse
+import gzip
+import os
+import re
+import shutil
+import struct
+import sys
+import tarfile
+import tempfile
+import time
+import zlib
+
+from utils.batch_engine import analyze_pcos_signals_batch, batch_result_row
+from utils.bulk_scoring import detect_format, iter_chunks, ordered_results, parse_columns, read_header
+from utils.report_generator import generate_summaries_batch
+
+ARCHIVE_FORMATS = ("zip", "tar.gz")
+
+DEFAULT_CHUNK_SIZE = 500
+
+COMPRESS_LEVEL = 6
+
+# ZIP record layouts (APPNOTE.TXT); sizes and offsets past these limits need ZIP64
+_ZIP_LOCAL_HEADER = struct.Struct("<4s2B4HL2L2H")
+_ZIP_CENTRAL_HEADER = struct.Struct("<4s4B4HL2L5H2L")
+_ZIP_END = struct.Struct("<4s4H2LH")
+_ZIP64_END = struct.Struct("<4sQ2H2L4Q")
+_ZIP64_LOCATOR = struct.Struct("<4sLQL")
+_ZIP_MAX_COUNT = 0xFFFF
+_ZIP_MAX_OFFSET = 0xFFFFFFFF
+_ZIP_UTF8_FLAG = 0x800
+_ZIP_FILE_MODE = 0o100644 << 16
+
+_UNSAFE_NAME_CHARS = re.compile(r"[^A-Za-z0-9._-]+")
+
+
+def _archive_format(path, archive_format=None):
+    if archive_format:
+        return archive_format
+    lowered = path.lower() if isinstance(path, str) else ""
+    if lowered.endswith(".zip"):
+        return "zip"
+    if lowered.endswith((".tar.gz", ".tgz")):
+        return "tar.gz"
+    raise ValueError(f"Cannot tell the archive format of {path}; pass --archive-format")
+
+
+def _entry_name(row, patient_id=None):
+    """Archive member name; rows keep names unique when ids repeat."""
+    if patient_id in (None, ""):
+        return f"doctor_summary_{row + 1:06d}.txt"
+    safe_id = _UNSAFE_NAME_CHARS.sub("_", str(patient_id)).strip("._")[:64]
+    return f"doctor_summary_{row + 1:06d}_{safe_id}.txt"
+
+
+# -----------------------------
+# WORKER
+# -----------------------------
+def render_chunk(task):
+    """
+    Score and render one chunk and encode it for the archive (runs in a worker process).
+
+    Args:
+        task: tuple - (first_row, lines, input_format, header, archive_format, id_column, mtime)
+
+    Returns:
+        tuple: (number of records, payload) - payload is a list of
+            (name, crc32, size, deflated bytes) for ZIP, one gzip member for tar.gz
+    """
+    first_row, lines, input_format, header, archive_format, id_column, mtime = task
+    n_rows, columns = parse_columns(lines, input_format, header)
+    batch = analyze_pcos_signals_batch(columns)
+
+    records = (
+        {name: None if values[i] == "" else values[i] for name, values in columns.items()}
+        for i in range(n_rows)
+    )
+    reports = generate_summaries_batch(
+        (batch_result_row(batch, i) for i in range(n_rows)), records, kinds=("doctor_summary",)
+    )
+    ids = columns.get(id_column) if id_column else None
+    entries = (
+        (_entry_name(first_row + i, ids[i] if ids else None), report["doctor_summary"].encode("utf-8"))
+        for i, report in enumerate(reports)
+    )
+
+    if archive_format == "zip":
+        payload = []
+        for name, data in entries:
+            compressor = zlib.compressobj(COMPRESS_LEVEL, zlib.DEFLATED, -zlib.MAX_WBITS)
+            payload.append((name, zlib.crc32(data), len(data), compressor.compress(data) + compressor.flush()))
+        return n_rows, payload
+
+    blocks = []
+    for name, data in entries:
+        info = tarfile.TarInfo(name)
+        info.size = len(data)
+        info.mtime = mtime
+        info.mode = 0o644
+        blocks.append(info.tobuf(tarfile.PAX_FORMAT, "utf-8", "surrogateescape"))
+        blocks.append(data)
+        padding = -len(data) % tarfile.BLOCKSIZE
+        if padding:
+            blocks.append(tarfile.NUL * padding)
+    # Concatenated gzip members form one valid gzip stream
+    return n_rows, gzip.compress(b"".join(blocks), COMPRESS_LEVEL, mtime=mtime)
+
+
+# -----------------------------
+# ARCHIVE WRITERS
+# -----------------------------
+class _ZipWriter:
+    """Writes pre-deflated members sequentially; the central directory is spooled to a temp file."""
+
+    def __init__(self, out, mtime):
+        self.out = out
+        self.offset = 0
+        self.count = 0
+        local = time.localtime(mtime)
+        self.dos_time = (local.tm_hour << 11) | (local.tm_min << 5) | (local.tm_sec // 2)
+        self.dos_date = ((max(local.tm_year, 1980) - 1980) << 9) | (local.tm_mon << 5) | local.tm_mday
+        self.central = tempfile.SpooledTemporaryFile(max_size=1 << 20)
+
+    def write_chunk(self, payload):
+        parts = []
+        for name, crc, size, compressed in payload:
+            encoded_name = name.encode("utf-8")
+            header = _ZIP_LOCAL_HEADER.pack(
+                b"PK\003\004", 20, 0, _ZIP_UTF8_FLAG, zlib.DEFLATED, self.dos_time, self.dos_date,
+                crc, len(compressed), size, len(encoded_name), 0
+            )
+            self._add_central_entry(encoded_name, crc, size, len(compressed))
+            parts += (header, encoded_name, compressed)
+            self.offset += len(header) + len(encoded_name) + len(compressed)
+            self.count += 1
+        self.out.write(b"".join(parts))
+
+    def _add_central_entry(self, encoded_name, crc, size, compressed_size):
+        extra = b""
+        offset = self.offset
+        version = 20
+        if offset >= _ZIP_MAX_OFFSET:
+            extra = struct.pack("<HHQ", 1, 8, offset)
+            offset = _ZIP_MAX_OFFSET
+            version = 45
+        self.central.write(_ZIP_CENTRAL_HEADER.pack(
+            b"PK\001\002", version, 3, version, 0, _ZIP_UTF8_FLAG, zlib.DEFLATED,
+            self.dos_time, self.dos_date, crc, compressed_size, size,
+            len(encoded_name), len(extra), 0, 0, 0, _ZIP_FILE_MODE, offset
+        ))
+        self.central.write(encoded_name)
+        self.central.write(extra)
+
+    def close(self):
+        central_offset = self.offset
+        central_size = self.central.tell()
+        self.central.seek(0)
+        shutil.copyfileobj(self.central, self.out)
+        self.central.close()
+
+        count, size, offset = self.count, central_size, central_offset
+        if count >= _ZIP_MAX_COUNT or size >= _ZIP_MAX_OFFSET or offset >= _ZIP_MAX_OFFSET:
+            zip64_end_offset = central_offset + central_size
+            self.out.write(_ZIP64_END.pack(
+                b"PK\006\006", _ZIP64_END.size - 12, 45, 45, 0, 0, count, count, size, offset
+            ))
+            self.out.write(_ZIP64_LOCATOR.pack(b"PK\006\007", 0, zip64_end_offset, 1))
+            count = min(count, _ZIP_MAX_COUNT)
+            size = min(size, _ZIP_MAX_OFFSET)
+            offset = min(offset, _ZIP_MAX_OFFSET)
+        self.out.write(_ZIP_END.pack(b"PK\005\006", 0, 0, count, count, size, offset, 0))
+
+
+class _TarGzWriter:
+    """Appends the workers' gzip members, then a member holding the end-of-archive blocks."""
+
+    def __init__(self, out, mtime):
+        self.out = out
+        self.mtime = mtime
+
+    def write_chunk(self, payload):
+        self.out.write(payload)
+
+    def close(self):
+        self.out.write(gzip.compress(tarfile.NUL * (2 * tarfile.BLOCKSIZE), COMPRESS_LEVEL, mtime=self.mtime))
+
+
+# -----------------------------
+# DRIVER
+# -----------------------------
+def export_summaries(input_path, output, archive_format=None, workers=None,
+                     chunk_size=DEFAULT_CHUNK_SIZE, id_column=None, input_format=None,
+                     progress=None):
+    """
+    Render a doctor summary per input record into a ZIP or tar.gz archive.
+
+    Args:
+        input_path: str - CSV or JSONL questionnaire records
+        output: str or binary stream - Archive path, or any object with write(bytes)
+        archive_format: str (optional) - "zip" or "tar.gz" (default: from the output path)
+        workers: int (optional) - Worker processes (default: CPU count; 1 = in-process)
+        chunk_size: int - Records per chunk
+        id_column: str (optional) - Input column added to member names
+        input_format: str (optional) - "csv" or "jsonl" (default: from extension)
+        progress: callable (optional) - Called with (summaries done, summaries/sec) after each chunk
+
+    Returns:
+        dict: {"summaries": total written, "bytes": archive size, "seconds": elapsed,
+               "summaries_per_sec": throughput}
+    """
+    archive_format = _archive_format(output, archive_format)
+    if archive_format not in ARCHIVE_FORMATS:
+        raise ValueError(f"Unknown archive format: {archive_format}")
+    input_format = detect_format(input_path, input_format)
+    workers = workers or os.cpu_count() or 1
+    mtime = int(time.time())
+
+    if isinstance(output, str):
+        with open(output, "wb") as out:
+            return _export(input_path, out, archive_format, workers, chunk_size, id_column,
+                           input_format, mtime, progress)
+    return _export(input_path, output, archive_format, workers, chunk_size, id_column,
+                   input_format, mtime, progress)
+
+
+def _export(input_path, out, archive_format, workers, chunk_size, id_column, input_format, mtime, progress):
+    counting = _CountingWriter(out)
+    writer = (_ZipWriter if archive_format == "zip" else _TarGzWriter)(counting, mtime)
+
+    with open(input_path, "rb") as source:
+        header, data_offset = read_header(source, input_format)
+        tasks = (
+            (first_row, lines, input_format, header, archive_format, id_column, mtime)
+            for first_row, _, _, lines in iter_chunks(source, data_offset, chunk_size)
+        )
+
+        start = time.perf_counter()
+        done = 0
+        for n_rows, payload in ordered_results(render_chunk, tasks, workers):
+            writer.write_chunk(payload)
+            done += n_rows
+            if progress:
+                elapsed = time.perf_counter() - start
+                progress(done, done / elapsed if elapsed else 0.0)
+        writer.close()
+
+    elapsed = time.perf_counter() - start
+    return {
+        "summaries": done,
+        "bytes": counting.written,
+        "seconds": elapsed,
+        "summaries_per_sec": done / elapsed if elapsed else 0.0,
+    }
+
+
+class _CountingWriter:
+    """Pass-through writer that counts bytes (the output may not support tell())."""
+
+    __slots__ = ("out", "written")
+
+    def __init__(self, out):
+        self.out = out
+        self.written = 0
+
+    def write(self, data):
+        self.out.write(data)
+        self.written += len(data)
+        return len(data)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Export PCOS doctor summaries into an archive")
+    parser.add_argument("input", help="CSV or JSONL input file")
+    parser.add_argument("output", help=".zip or .tar.gz output file, or - for stdout")
+    parser.add_argument("--archive-format", choices=ARCHIVE_FORMATS, default=None)
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: CPU count)")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE, help="records per chunk")
+    parser.add_argument("--id-column", default=None, help="input column added to file names")
+    parser.add_argument("--input-format", choices=["csv", "jsonl"], default=None)
+    args = parser.parse_args(argv)
+
+    if args.output == "-" and not args.archive_format:
+        parser.error("--archive-format is required when writing to stdout")
+    output = sys.stdout.buffer if args.output == "-" else args.output
+
+    last_report = [0.0]
+
+    def progress(done, rate):
+        now = time.monotonic()
+        if now - last_report[0] >= 1.0:
+            last_report[0] = now
+            print(f"{done} summaries exported ({rate:,.0f}/sec)", file=sys.stderr)
+
+    stats = export_summaries(
+        args.input,
+        output,
+        archive_format=args.archive_format,
+        workers=args.workers,
+        chunk_size=args.chunk_size,
+        id_column=args.id_column,
+        input_format=args.input_format,
+        progress=progress
+    )
+    print(
+        f"Done: {stats['summaries']} summaries, {stats['bytes'] / 1024:,.0f} KiB "
+        f"in {stats['seconds']:.1f}s ({stats['summaries_per_sec']:,.0f}/sec)",
+        file=sys.stderr
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
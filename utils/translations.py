@@ -0,0 +1,39 @@
+"""
+Interface text in the languages offered by the language switcher.
+The chosen language is kept in the Streamlit session; reports use the same
+codes (see report_generator.LOCALES).
+"""
+
+import streamlit as st
+
+LANGUAGES = ("en", "hi")
+DEFAULT_LANGUAGE = "en"
+
+TRANSLATIONS = {
+    "en": {
+        "welcome": "Welcome",
+        "login": "Login",
+        "logout": "Logout",
+    },
+    "hi": {
+        "welcome": "स्वागत है",
+        "login": "लॉग इन",
+        "logout": "लॉग आउट",
+    },
+}
+
+
+def get_language():
+    """Language code chosen in this session."""
+    language = st.session_state.get("language", DEFAULT_LANGUAGE)
+    return language if language in LANGUAGES else DEFAULT_LANGUAGE
+
+
+def set_language(language):
+    """Choose the session language; unknown codes fall back to English."""
+    st.session_state["language"] = language if language in LANGUAGES else DEFAULT_LANGUAGE
+
+
+def t(key):
+    """Interface text for a key in the session language (English, then the key itself, if missing)."""
+    return TRANSLATIONS[get_language()].get(key) or TRANSLATIONS[DEFAULT_LANGUAGE].get(key, key)